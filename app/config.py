@@ -54,6 +54,9 @@ class Settings(BaseSettings):
     PDL_API_KEY: str = ""
     GOOGLE_MAPS_SERVER_KEY: str = "" # Formerly "GOOGLE_MAPS_SERVER_KEY", map to existing env var
 
+    # Liveness Gate: reuse a persisted verdict for this long before re-checking Serper
+    LIVENESS_TTL_HOURS: int = 72
+
     # Safety Latch (P0.3)
     # If False, EmailEngine returns "Simulated success" and calls to Graph are blocked.
     ALLOW_REAL_SEND: bool = False
@@ -7,6 +7,7 @@ import google.generativeai as genai
 from app.config import settings
 from app.domain.product_facts import PRODUCT_FACTS, get_product_context_str
 from app.utils.logger import get_logger
+from utils.cassette import wrap_gemini
 
 logger = get_logger("draft_engine")
 
@@ -78,10 +79,10 @@ class DraftEngine:
         # 01-11-2026: Updated to Standardized Gemini 2.0 Flash
         # Note: SCOUT_CONSTITUTION is defined globally.
         # We bind it here so the model treats it as authoritative.
-        self.model = genai.GenerativeModel(
+        self.model = wrap_gemini(genai.GenerativeModel(
             settings.GEMINI_MODEL_NAME,
             system_instruction=SCOUT_CONSTITUTION
-        )
+        ))
 
     def generate_draft_atomic(self, dossier_id: str, force_regenerate: bool = False, user_comments: str = "") -> DraftOutput:
         """
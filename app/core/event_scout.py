@@ -1,11 +1,100 @@
 import datetime
-from typing import List, Dict, Any
+import re
+import threading
+import time
+from typing import List, Dict, Any, Optional
 from app.utils.logger import get_logger
 from app.config import settings
 from supabase import create_client
 
 logger = get_logger("event_scout")
 
+TRIBE_FIRM_KEYWORDS = ("rosetta", "advisors")
+EXECUTIVE_TITLE_KEYWORDS = ("ceo", "president", "principal", "founder", "partner")
+
+
+def _normalize_key(value: Optional[str]) -> str:
+    """'St. Louis ' -> 'st louis'"""
+    return " ".join(re.sub(r"[^\w\s]", " ", (value or "").lower()).split())
+
+
+class EventIndex:
+    """
+    In-memory index over industry_events, built from one table read.
+    - by_city: normalized city -> events (Geo hook)
+    - by_tag:  match tag (ROSETTA, EXECUTIVE, ...) -> events (Tribe / Peer hooks)
+    Events that already ended before `today` are dropped at build time.
+    """
+
+    def __init__(self, events: List[Dict[str, Any]], today: Optional[datetime.date] = None):
+        today = today or datetime.date.today()
+        self.events: List[Dict[str, Any]] = []
+        self.by_city: Dict[str, List[int]] = {}
+        self.by_tag: Dict[str, List[int]] = {}
+
+        for event in events:
+            if not self._is_current(event, today):
+                continue
+            pos = len(self.events)
+            self.events.append(event)
+
+            city_key = _normalize_key(event.get("city"))
+            if city_key:
+                self.by_city.setdefault(city_key, []).append(pos)
+            for tag in event.get("match_tags") or []:
+                self.by_tag.setdefault(tag, []).append(pos)
+
+    @staticmethod
+    def _is_current(event: Dict[str, Any], today: datetime.date) -> bool:
+        last_day = event.get("end_date") or event.get("start_date")
+        if not last_day:
+            return True
+        try:
+            return datetime.date.fromisoformat(str(last_day)[:10]) >= today
+        except ValueError:
+            return True
+
+    def match(self, candidate: Dict[str, Any]) -> List[Dict[str, Any]]:
+        cand_city = _normalize_key(candidate.get("city"))
+        cand_title = (candidate.get("title") or "").lower()
+        cand_firm = (candidate.get("firm") or "").lower()
+
+        local = set(self.by_city.get(cand_city, [])) if cand_city else set()
+        tribe = set()
+        if any(k in cand_firm for k in TRIBE_FIRM_KEYWORDS):
+            tribe = set(self.by_tag.get("ROSETTA", []))
+        peer = set()
+        if any(role in cand_title for role in EXECUTIVE_TITLE_KEYWORDS):
+            peer = set(self.by_tag.get("EXECUTIVE", []))
+
+        hooks = []
+        # Keep table order; one hook per event with Geo > Tribe > Peer precedence.
+        for pos in sorted(local | tribe | peer):
+            event = self.events[pos]
+
+            # --- LOGIC GATE 1: GEO LOOP (The "Local" Hook) ---
+            if pos in local:
+                match_reason = "LOCAL_HOST"
+                hook_text = f"Since you're based in {event['city']}, are you planning to stop by {event['name']}?"
+            # --- LOGIC GATE 2: TRIBE LOOP (The "Affiliation" Hook) ---
+            elif pos in tribe:
+                match_reason = "TRIBE_MEMBER"
+                hook_text = f"Will you be joining the other Health Rosetta advisors at {event['name']}?"
+            # --- LOGIC GATE 3: EXECUTIVE LOOP (The "Peer" Hook) ---
+            else:
+                match_reason = "PEER_LEADER"
+                hook_text = f"Are you heading to {event['venue']} for {event['name']} this year?"
+
+            hooks.append({
+                "event_name": event["name"],
+                "match_reason": match_reason,
+                "hook_text": hook_text,
+                "event_date": event["start_date"],
+                "venue": event["venue"]
+            })
+        return hooks
+
+
 class EventScout:
     """
     The Proactive Context Engine.
@@ -13,70 +102,47 @@ class EventScout:
     1. Geography (Local Hook)
     2. Tribe (Affiliation Hook)
     3. Role (Executive Hook)
+
+    The industry_events table is read once into an EventIndex that is shared
+    by every EventScout in the process and refreshed after INDEX_TTL_SECONDS,
+    so the overnight run does one read instead of one per candidate.
     """
-    
+
+    INDEX_TTL_SECONDS = 900
+
+    _shared_index: Optional[EventIndex] = None
+    _shared_loaded_at = 0.0
+    _index_lock = threading.Lock()
+
     def __init__(self):
         # Initialize Supabase client for reading the industry_events table
         self.supabase = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
 
+    def refresh_index(self) -> EventIndex:
+        """Forces a reload of the shared index (one full read of industry_events)."""
+        res = self.supabase.table("industry_events").select("*").execute()
+        index = EventIndex(res.data or [])
+        cls = type(self)
+        cls._shared_index = index
+        cls._shared_loaded_at = time.monotonic()
+        logger.info(f"EventScout: Indexed {len(index.events)} upcoming events.")
+        return index
+
+    def _get_index(self) -> EventIndex:
+        cls = type(self)
+        if cls._shared_index is not None and time.monotonic() - cls._shared_loaded_at < self.INDEX_TTL_SECONDS:
+            return cls._shared_index
+        with cls._index_lock:
+            if cls._shared_index is not None and time.monotonic() - cls._shared_loaded_at < self.INDEX_TTL_SECONDS:
+                return cls._shared_index
+            return self.refresh_index()
+
     def check_events(self, candidate: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Returns a list of 'Hooks' (Events + Why it matters).
         """
-        hooks = []
-        
         try:
-            # 1. Fetch Future Events
-            # We only care about events in the future (or very recent past if we want to say 'Hope you enjoyed...')
-            # For now, let's just fetch all from our small 2026 table.
-            res = self.supabase.table("industry_events").select("*").execute()
-            events = res.data
-            
-            if not events:
-                return []
-
-            cand_city = (candidate.get("city") or "").lower()
-            cand_state = (candidate.get("state") or "").lower()
-            cand_title = (candidate.get("title") or "").lower()
-            cand_firm = (candidate.get("firm") or "").lower()
-            
-            # 2. Iterate and Triangulate
-            for event in events:
-                match_reason = None
-                hook_text = None
-                
-                event_tags = event.get("match_tags", [])
-                
-                # --- LOGIC GATE 1: GEO LOOP (The "Local" Hook) ---
-                # Exact City Match (Simple for now)
-                # TODO: add distance calc later
-                if event.get("city", "").lower() == cand_city:
-                    match_reason = "LOCAL_HOST"
-                    hook_text = f"Since you're based in {event['city']}, are you planning to stop by {event['name']}?"
-                
-                # --- LOGIC GATE 2: TRIBE LOOP (The "Affiliation" Hook) ---
-                # Health Rosetta
-                elif "ROSETTA" in event_tags and ("rosetta" in cand_firm or "advisors" in cand_firm):
-                    match_reason = "TRIBE_MEMBER"
-                    hook_text = f"Will you be joining the other Health Rosetta advisors at {event['name']}?"
-                
-                # --- LOGIC GATE 3: EXECUTIVE LOOP (The "Peer" Hook) ---
-                # CIAB / Executive events
-                elif "EXECUTIVE" in event_tags and any(role in cand_title for role in ["ceo", "president", "principal", "founder", "partner"]):
-                    match_reason = "PEER_LEADER"
-                    hook_text = f"Are you heading to {event['venue']} for {event['name']} this year?"
-
-                # If matched, add to hooks
-                if match_reason:
-                    hooks.append({
-                        "event_name": event["name"],
-                        "match_reason": match_reason,
-                        "hook_text": hook_text,
-                        "event_date": event["start_date"],
-                        "venue": event["venue"]
-                    })
-                    
+            return self._get_index().match(candidate)
         except Exception as e:
             logger.error(f"EventScout Check Failed: {e}")
-            
-        return hooks
+            return []
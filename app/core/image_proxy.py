@@ -2,14 +2,16 @@ import requests
 from typing import Optional, Dict, Any
 from app.config import settings
 from app.utils.logger import get_logger
+from utils.serper import SerperClient
 
 logger = get_logger("image_proxy")
 
 class ImageProxyEngine:
-    SERPER_URL = "https://google.serper.dev/images" # Phase 3: Image Search (Production Safe)
+    # Phase 3: Image Search (Production Safe), via the shared Serper client + response cache
 
     def __init__(self):
         self.api_key = settings.SERPER_API_KEY
+        self.serper = SerperClient(api_key=self.api_key, timeout=5)
 
     
     def verify_accessibility(self, url: str) -> bool:
@@ -59,16 +61,10 @@ class ImageProxyEngine:
             "hl": "en",
             "autocorrect": True
         }
-        
-        headers = {
-            "X-API-KEY": self.api_key,
-            "Content-Type": "application/json"
-        }
+
 
         try:
-            response = requests.post(self.SERPER_URL, headers=headers, json=payload, timeout=5)
-            response.raise_for_status()
-            data = response.json()
+            data = self.serper.request("images", payload)
             
             images = data.get("images", [])
             
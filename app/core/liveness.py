@@ -1,10 +1,88 @@
-import requests
 import re
+import copy
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
 from app.config import settings
+from utils.serper import SerperClient
 from app.utils.logger import get_logger
 
 logger = get_logger("liveness")
 
+
+def candidate_key(name: str, firm: str) -> str:
+    """'Scott  Wood', 'Alera Group' -> 'scott wood|alera group'"""
+    return f"{' '.join((name or '').lower().split())}|{' '.join((firm or '').lower().split())}"
+
+
+class LivenessVerdictCache:
+    """
+    Persisted liveness verdicts (liveness_verdicts table, migration 016),
+    with an in-process copy. A verdict is reused while younger than ttl_hours.
+    """
+    TABLE = "liveness_verdicts"
+
+    def __init__(self, db=None, ttl_hours: float = None):
+        self.db = db
+        hours = settings.LIVENESS_TTL_HOURS if ttl_hours is None else ttl_hours
+        self.ttl = datetime.timedelta(hours=hours)
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self._absent = set()  # keys the table had no row for (until we put one)
+        self._lock = threading.Lock()
+
+    def is_fresh(self, row: Dict[str, Any]) -> bool:
+        try:
+            checked_at = datetime.datetime.fromisoformat(str(row["checked_at"]).replace("Z", "+00:00"))
+        except (KeyError, ValueError):
+            return False
+        return datetime.datetime.now(datetime.timezone.utc) - checked_at < self.ttl
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if key in self._memory:
+                return copy.deepcopy(self._memory[key])
+            if key in self._absent:
+                return None
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """One round trip for every key not already held in memory."""
+        with self._lock:
+            found = {k: copy.deepcopy(self._memory[k]) for k in keys if k in self._memory}
+            missing = [k for k in dict.fromkeys(keys) if k not in found and k not in self._absent]
+        if missing and self.db:
+            try:
+                res = self.db.table(self.TABLE).select("*").in_("candidate_key", missing).execute()
+                with self._lock:
+                    for row in res.data or []:
+                        self._memory[row["candidate_key"]] = row
+                        found[row["candidate_key"]] = copy.deepcopy(row)
+                    self._absent.update(k for k in missing if k not in found)
+            except Exception as e:
+                logger.warning(f"Liveness cache read failed: {e}")
+        return found
+
+    def put(self, key: str, name: str, firm: str, verdict: Dict[str, Any], evidence: str):
+        row = {
+            "candidate_key": key,
+            "full_name": name,
+            "firm": firm,
+            "is_departure": verdict["is_departure"],
+            "risk_reason": verdict["risk_reason"],
+            "evidence": (evidence or "")[:500],
+            "checked_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        }
+        with self._lock:
+            self._memory[key] = row
+            self._absent.discard(key)
+        if not self.db:
+            return
+        try:
+            self.db.table(self.TABLE).upsert(row, on_conflict="candidate_key").execute()
+        except Exception as e:
+            logger.warning(f"Liveness cache write failed for {key}: {e}")
+
 class EmploymentLivenessCheck:
     """
     The Liveness Gate (Bounce Protection).
@@ -13,19 +91,49 @@ class EmploymentLivenessCheck:
     Logic:
     Query: site:linkedin.com/in/ "{Name}" "{Firm}"
     Negative Lookbehind: If snippet contains 'Former', 'Past', 'Ex-', 'Previous' near the firm name -> BLOCK.
+
+    Verdicts are cached for LIVENESS_TTL_HOURS (LivenessVerdictCache).
+    check_batch() runs the cache misses concurrently under a Serper rate limit.
     """
     
-    SERPER_URL = "https://google.serper.dev/search"
-    
-    def __init__(self):
+    def __init__(self, db=None, ttl_hours: float = None):
         self.api_key = settings.SERPER_API_KEY
+        self.serper = SerperClient(api_key=self.api_key, timeout=5)
+        if db is None:
+            try:
+                from supabase import create_client
+                db = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY or settings.SUPABASE_KEY)
+            except Exception as e:
+                logger.warning(f"Liveness cache running in memory only: {e}")
+                db = None
+        self.cache = LivenessVerdictCache(db, ttl_hours)
+
+    def warm_cache(self, candidates: List[dict]):
+        """Loads cached verdicts for a page of candidates in one read."""
+        keys = [candidate_key(c.get("full_name"), c.get("firm")) for c in candidates
+                if c.get("full_name") and c.get("firm")]
+        if keys:
+            self.cache.get_many(keys)
+
+    def check_batch(self, candidates: List[dict], max_workers: int = 4) -> List[dict]:
+        """
+        check_status for many candidates (results in input order).
+        Cached verdicts are read in one query; misses run concurrently
+        (SerperClient keeps them under the shared Serper rate limit).
+        """
+        self.warm_cache(candidates)
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            return list(pool.map(self.check_status, candidates))
         
-    def check_status(self, candidate: dict) -> dict:
+    def check_status(self, candidate: dict, force: bool = False) -> dict:
         """
         Returns:
         {
             "is_departure": bool,
-            "risk_reason": str | None
+            "risk_reason": str | None,
+            "evidence": str,          # snippet the verdict was based on
+            "checked_at": str | None, # ISO time of the Serper check
+            "cached": bool
         }
         """
         result = {
@@ -42,23 +150,41 @@ class EmploymentLivenessCheck:
         if not self.api_key:
             logger.warning("No SERPER_API_KEY. Skipping Liveness Check.")
             return result
+
+        key = candidate_key(name, firm)
+        cached = None if force else self.cache.get(key)
+        if cached and self.cache.is_fresh(cached):
+            return {
+                "is_departure": cached["is_departure"],
+                "risk_reason": cached["risk_reason"],
+                "evidence": cached.get("evidence") or "",
+                "checked_at": cached["checked_at"],
+                "cached": True
+            }
+
+        # A forced re-check must not be answered from the response cache either
+        verdict, evidence, ok = self._check_remote(name, firm, max_age=0 if force else self.cache.ttl.total_seconds())
+        if ok:
+            self.cache.put(key, name, firm, verdict, evidence)
+        return {**verdict, "evidence": evidence, "checked_at": None, "cached": False}
+
+    def _check_remote(self, name: str, firm: str, max_age: Optional[float] = None):
+        """
+        One Serper lookup (responses younger than max_age seconds come from the
+        shared response cache). Returns (verdict, evidence, ok); ok=False if the call failed.
+        """
+        result = {
+            "is_departure": False,
+            "risk_reason": None
+        }
+        evidence = ""
             
         # 1. Strict Triangulation Query
         # Relaxing quotes to improve hit rate.
         query = f'site:linkedin.com/in/ {name} {firm}'
         
         try:
-            payload = {
-                "q": query,
-                "num": 3 
-            }
-            headers = {
-                'X-API-KEY': self.api_key,
-                'Content-Type': 'application/json'
-            }
-            
-            response = requests.post(self.SERPER_URL, headers=headers, json=payload, timeout=5)
-            data = response.json()
+            data = self.serper.request("search", {"q": query, "num": 3}, ttl=max_age)
             organic = data.get("organic", [])
             
             if not organic:
@@ -67,7 +193,7 @@ class EmploymentLivenessCheck:
                 # Per directive: "If the snippet contains the firm name..."
                 # So if no result, we can't perform the check.
                 logger.info(f"Liveness: No results for {query}")
-                return result 
+                return result, evidence, True
                 
             # 2. Analyze the Top Result
             top_hit = organic[0]
@@ -76,9 +202,7 @@ class EmploymentLivenessCheck:
             
             # Combine for analysis
             full_text = f"{title} {snippet}"
-            
-            # Combine for analysis
-            full_text = f"{title} {snippet}"
+            evidence = full_text
             
             # 3. Anchor Check: Does it actually mention the Firm?
             # If the firm is NOT in the snippet, we cannot confirm they are there.
@@ -91,7 +215,7 @@ class EmploymentLivenessCheck:
                 logger.warning(f"Liveness: Firm '{firm}' NOT found in snippet for {name}. Risk.")
                 result["is_departure"] = True
                 result["risk_reason"] = f"Firm '{firm}' not found in verification snippet. Possible Misalignment."
-                return result
+                return result, evidence, True
                 
             # 4. NEGATIVE LOOKBEHIND (The Hard Gate)
             # Scan for "Former", "Past", "Ex-", "Previous"
@@ -127,9 +251,10 @@ class EmploymentLivenessCheck:
                 logger.warning(f"Liveness: DEPARTURE DETECTED for {name} ({firm}). Found '{detected_trigger}'.")
                 result["is_departure"] = True
                 result["risk_reason"] = f"Departure Detected (Found '{detected_trigger}' near firm name)"
-                return result
+                return result, evidence, True
                 
         except Exception as e:
             logger.error(f"Liveness Check Failed: {e}")
+            return result, evidence, False
             
-        return result
+        return result, evidence, True
@@ -3,6 +3,7 @@ import json
 from typing import Dict, Any, Optional
 import google.generativeai as genai
 from app.utils.logger import get_logger
+from utils.cassette import wrap_gemini
 
 logger = get_logger("llm_core")
 
@@ -15,7 +16,7 @@ class LLMClient:
         else:
             genai.configure(api_key=self.api_key)
             # Use a model that supports JSON mode if possible, or standard
-            self.model = genai.GenerativeModel('gemini-2.0-flash')
+            self.model = wrap_gemini(genai.GenerativeModel('gemini-2.0-flash'))
 
     def analyze_text(self, system_prompt: str, user_text: str, json_schema: Optional[Dict] = None) -> Dict[str, Any]:
         """
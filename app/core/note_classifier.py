@@ -12,6 +12,7 @@ from pydantic import BaseModel
 import google.generativeai as genai
 from app.config import settings
 from app.utils.logger import get_logger
+from utils.cassette import wrap_gemini
 
 logger = get_logger("note_classifier")
 
@@ -74,10 +75,10 @@ class NoteIntentClassifier:
     """
     
     def __init__(self):
-        self.model = genai.GenerativeModel(
+        self.model = wrap_gemini(genai.GenerativeModel(
             settings.GEMINI_MODEL_NAME,
             system_instruction=CLASSIFIER_SYSTEM_INSTRUCTION
-        )
+        ))
     
     def classify(self, note_text: str) -> Optional[NoteIntent]:
         """
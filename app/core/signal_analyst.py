@@ -1,13 +1,105 @@
 import os
-import json
-import requests
+import re
+import copy
+import time
+import hashlib
+import datetime
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 from tavily import TavilyClient
 from app.core.llm import LLMClient
+from utils.serper import SerperClient
+from utils.single_flight import SingleFlight
+from utils.rate_limiter import get_limiter
 from app.utils.logger import get_logger
 
 logger = get_logger("signal_analyst")
 
+SIGNAL_CACHE_FRESH_HOURS = float(os.environ.get("SIGNAL_CACHE_FRESH_HOURS", 20))
+# Per process: concurrent scan_and_analyze calls for one firm (baker, API) share one run
+analyst_flight = SingleFlight("signal_analyst")
+
+TAVILY_EXTRACT_BATCH = 20      # URLs per Tavily extract call
+PREFETCH_WAIT_SECONDS = 60     # how long scan_and_analyze waits on an in-flight prefetch
+PREFETCH_KEEP_SECONDS = 1800   # prefetched scans never taken (e.g. blocked candidates) are dropped after this
+CONTENT_TTL_SECONDS = 6 * 3600 # extracted article text
+CONTENT_FAILED_TTL_SECONDS = 300  # failed/empty extracts: retried after this
+CONTENT_MAX_ENTRIES = 500      # LRU bound on extracted text held per process
+
+
+class FirmSignalCache:
+    """
+    Per-firm memo of judged signals (firm_signal_cache table, migration 015).
+    Always keeps an in-process copy; persists to Supabase when a client is given.
+
+    Entry: {"firm_key", "firm_name", "url_set_hash", "signals", "scanned_at", "analyzed_at"}
+    - Fresh (scanned within freshness_hours): served without any upstream call.
+    - Stale but same url_set_hash after a re-scan: served without Tavily/LLM.
+    """
+    TABLE = "firm_signal_cache"
+
+    def __init__(self, db=None, freshness_hours: float = SIGNAL_CACHE_FRESH_HOURS):
+        self.db = db
+        self.freshness = datetime.timedelta(hours=freshness_hours)
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _now() -> datetime.datetime:
+        return datetime.datetime.now(datetime.timezone.utc)
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        try:
+            scanned_at = datetime.datetime.fromisoformat(str(entry["scanned_at"]).replace("Z", "+00:00"))
+        except (KeyError, ValueError):
+            return False
+        return self._now() - scanned_at < self.freshness
+
+    def get(self, firm_key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if firm_key in self._memory:
+                return copy.deepcopy(self._memory[firm_key])
+        if not self.db:
+            return None
+        try:
+            res = self.db.table(self.TABLE).select("*").eq("firm_key", firm_key).limit(1).execute()
+        except Exception as e:
+            logger.warning(f"Signal cache read failed for {firm_key}: {e}")
+            return None
+        if not res.data:
+            return None
+        with self._lock:
+            self._memory[firm_key] = res.data[0]
+        return copy.deepcopy(res.data[0])
+
+    def put(self, firm_key: str, firm_name: str, url_set_hash: str, signals: List[Dict[str, Any]]):
+        now = self._now().isoformat()
+        self._write({
+            "firm_key": firm_key,
+            "firm_name": firm_name,
+            "url_set_hash": url_set_hash,
+            "signals": signals,
+            "scanned_at": now,
+            "analyzed_at": now,
+        })
+
+    def touch(self, entry: Dict[str, Any]):
+        """Same articles as last time: re-arm the freshness window, keep the judgement."""
+        self._write({**entry, "scanned_at": self._now().isoformat()})
+
+    def _write(self, entry: Dict[str, Any]):
+        with self._lock:
+            self._memory[entry["firm_key"]] = copy.deepcopy(entry)
+        if not self.db:
+            return
+        try:
+            self.db.table(self.TABLE).upsert(entry, on_conflict="firm_key").execute()
+        except Exception as e:
+            logger.warning(f"Signal cache write failed for {entry['firm_key']}: {e}")
+
+
 class SignalAnalyst:
     """
     The Newsroom Orchestrator.
@@ -15,13 +107,59 @@ class SignalAnalyst:
     1. Serper (Scanner) -> "Is there volume?"
     2. Tavily (Researcher) -> "Get the text." (Only if volume found)
     3. LLM (Analyst) -> "What does it mean?"
+
+    Results are cached per firm (FirmSignalCache). Concurrent calls for the
+    same firm are coalesced (analyst_flight) and share one result.
+
+    prefetch() is the batch collection phase: it scans a set of firms up front
+    and extracts all their article URLs (deduped across firms) in multi-URL
+    Tavily calls. Extracted text is cached by URL hash (LRU, CONTENT_TTL_SECONDS;
+    failed extracts only for CONTENT_FAILED_TTL_SECONDS).
     """
     
-    def __init__(self):
+    def __init__(self, cache: Optional[FirmSignalCache] = None):
         self.serper_key = os.environ.get("SERPER_API_KEY")
         self.tavily_key = os.environ.get("TAVILY_API_KEY")
         self.llm = LLMClient()
         self.tavily = TavilyClient(api_key=self.tavily_key) if self.tavily_key else None
+        self.serper = SerperClient(api_key=self.serper_key)
+        self.cache = cache or FirmSignalCache()
+        self._content = OrderedDict()  # url hash -> (extracted text or None = failed, expires_at)
+        self._content_lock = threading.Lock()
+        self._prefetched: Dict[str, Dict[str, Any]] = {}  # firm key -> {"ready": Event, "results": scan, "at": t}
+        self._prefetch_guard = threading.Lock()
+
+    @staticmethod
+    def firm_key(firm_name: str) -> str:
+        return " ".join(re.sub(r"[^\w\s]", " ", (firm_name or "").lower()).split())
+
+    @staticmethod
+    def url_set_hash(urls: List[str]) -> str:
+        return hashlib.sha256("\n".join(sorted(set(urls))).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def url_key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _cached_content(self, url_key: str):
+        """(True, text or None) for a live cache entry, else (False, None)."""
+        with self._content_lock:
+            entry = self._content.get(url_key)
+            if entry is None:
+                return False, None
+            if entry[1] <= time.monotonic():
+                del self._content[url_key]
+                return False, None
+            self._content.move_to_end(url_key)
+            return True, entry[0]
+
+    def _store_content(self, url_key: str, text: Optional[str]):
+        ttl = CONTENT_TTL_SECONDS if text else CONTENT_FAILED_TTL_SECONDS
+        with self._content_lock:
+            self._content[url_key] = (text or None, time.monotonic() + ttl)
+            self._content.move_to_end(url_key)
+            while len(self._content) > CONTENT_MAX_ENTRIES:
+                self._content.popitem(last=False)
 
     def scan_and_analyze(self, firm_name: str) -> List[Dict[str, Any]]:
         """
@@ -35,40 +173,176 @@ class SignalAnalyst:
             logger.warning("No SERPER_API_KEY. Skipping Scan.")
             return []
 
+        key = self.firm_key(firm_name)
+        # Concurrent calls for the same firm share one scan/judgement
+        signals = analyst_flight.do(key, lambda: self._scan_and_analyze_firm(key, firm_name))
+        return copy.deepcopy(signals)
+
+    def _scan_and_analyze_firm(self, key: str, firm_name: str) -> List[Dict[str, Any]]:
+        # 0. CACHE (Fresh -> no upstream calls at all)
+        cached = self.cache.get(key)
+        if cached and self.cache.is_fresh(cached):
+            logger.info(f"SignalAnalyst: Cache hit for {firm_name}.")
+            return cached["signals"]
+
+        prefetched, results = self._take_prefetched(key)
+        if not prefetched:
+            results = self._scan_news(firm_name)
+        if results is None:
+            return []
+
+        articles = self._select_articles(results)
+        url_hash = self.url_set_hash([item["link"] for item in articles])
+
+        # Same articles as the last judgement -> skip Tavily + LLM
+        if cached and cached.get("url_set_hash") == url_hash:
+            logger.info(f"SignalAnalyst: No new articles for {firm_name}. Reusing judgement.")
+            self.cache.touch(cached)
+            return cached["signals"]
+
+        signals, complete = self._analyze_articles(firm_name, articles)
+        if complete:
+            # Don't pin a failed LLM judgement for the whole freshness window
+            self.cache.put(key, firm_name, url_hash, signals)
+        return signals
+
+    def prefetch(self, firm_names: List[str], scan_workers: int = 4) -> int:
+        """
+        Collection phase for a batch of firms.
+        Scans every firm without a fresh cache entry, then extracts the selected
+        article URLs of all of them (deduped, minus already extracted ones) in
+        as few Tavily calls as possible. scan_and_analyze() for these firms
+        reuses the scans and the text. Returns the number of extract calls made.
+        """
+        if not self.serper_key:
+            return 0
+
+        wanted: Dict[str, str] = {}
+        for name in firm_names:
+            key = self.firm_key(name)
+            if not key or key in wanted:
+                continue
+            cached = self.cache.get(key)
+            if not (cached and self.cache.is_fresh(cached)):
+                wanted[key] = name
+
+        now = time.monotonic()
+        with self._prefetch_guard:
+            # Scans for firms that were never analysed (blocked, skipped) don't linger
+            for key in [k for k, e in self._prefetched.items()
+                        if e["ready"].is_set() and now - e["at"] > PREFETCH_KEEP_SECONDS]:
+                del self._prefetched[key]
+            # Local handles: _take_prefetched may pop an entry (wait timeout) while we work
+            claimed = {}
+            for key, name in wanted.items():
+                if key not in self._prefetched:
+                    claimed[key] = self._prefetched[key] = {
+                        "name": name, "ready": threading.Event(), "results": None, "at": now}
+        if not claimed:
+            return 0
+
+        def scan(entry):
+            entry["results"] = self._scan_news(entry["name"])
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, scan_workers)) as pool:
+                list(pool.map(scan, claimed.values()))
+
+            urls = []
+            for entry in claimed.values():
+                for item in self._select_articles(entry["results"] or []):
+                    if item["link"] not in urls and not self._cached_content(self.url_key(item["link"]))[0]:
+                        urls.append(item["link"])
+            calls = self._extract_many(urls)
+        finally:
+            for entry in claimed.values():
+                entry["ready"].set()
+
+        logger.info(f"SignalAnalyst: Prefetched {len(claimed)} firms, {len(urls)} URLs in {calls} extract calls.")
+        return calls
+
+    def _take_prefetched(self, firm_key: str):
+        """(True, scan results) if prefetch() covered this firm, else (False, None)."""
+        with self._prefetch_guard:
+            entry = self._prefetched.get(firm_key)
+        if entry is None:
+            return False, None
+        entry["ready"].wait(PREFETCH_WAIT_SECONDS)
+        with self._prefetch_guard:
+            self._prefetched.pop(firm_key, None)
+        if not entry["ready"].is_set():
+            return False, None
+        return True, entry["results"]
+
+    def _extract_many(self, urls: List[str]) -> int:
+        """Tavily extract in chunks of TAVILY_EXTRACT_BATCH; fills the content cache."""
+        if not self.tavily or not urls:
+            return 0
+        calls = 0
+        for i in range(0, len(urls), TAVILY_EXTRACT_BATCH):
+            chunk = urls[i:i + TAVILY_EXTRACT_BATCH]
+            get_limiter("tavily").acquire()
+            calls += 1
+            try:
+                response = self.tavily.extract(urls=chunk)
+            except Exception as e:
+                # Left uncached: scan_and_analyze falls back to single-URL extracts
+                logger.warning(f"Tavily Batch Extract Failed ({len(chunk)} URLs): {e}")
+                continue
+            for result in response.get("results", []):
+                if result.get("url") and result.get("raw_content"):
+                    self._store_content(self.url_key(result["url"]), result["raw_content"])
+            for failed in response.get("failed_results", []):
+                if failed.get("url") and not self._cached_content(self.url_key(failed["url"]))[0]:
+                    self._store_content(self.url_key(failed["url"]), None)
+        return calls
+
+    def _scan_news(self, firm_name: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Serper news scan. Returns [] when there is no noise, None on failure.
+        """
         # Query optimized for business impact
         query = f"{firm_name} insurance acquisition funding merger regulatory lawsuit"
         
         try:
-            # Short timeout, we want speed
-            url = "https://google.serper.dev/news"
-            payload = json.dumps({"q": query, "num": 5, "tbs": "qdr:m"}) # qdr:m = past month
-            headers = {'X-API-KEY': self.serper_key, 'Content-Type': 'application/json'}
-            
-            response = requests.request("POST", url, headers=headers, data=payload)
-            results = response.json().get("news", [])
+            data = self.serper.request("news", {"q": query, "num": 5, "tbs": "qdr:m"}) # qdr:m = past month
+            results = data.get("news", [])
             
             if not results:
                 logger.info("SignalAnalyst: No noise found on Serper. Stopping early.")
-                return []
+            return results
                 
         except Exception as e:
             logger.error(f"Serper Scan Failed: {e}")
-            return []
+            return None
+
+    @staticmethod
+    def _select_articles(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        articles = []
+        for item in results[:2]: # Limit to top 2 to save costs/time
+            link = item.get("link") or ""
+            # Filter dumb stuff
+            if not link or "linkedin.com" in link or "facebook.com" in link:
+                continue
+            articles.append(item)
+        return articles
 
+    def _analyze_articles(self, firm_name: str, articles: List[Dict[str, Any]]):
+        """
+        Tavily + LLM judge over the selected articles.
+        Returns (signals, complete). complete=False if the LLM errored on any article.
+        """
         # 2. RESEARCH (Tavily)
         # If we got here, we have potential/noise.
         # We pass the BEST URL to Tavily to extract content, OR we ask Tavily to search specifically if Serper was vague.
         # Strategy: Use Tavily search directly on the most interesting Headline to get context.
         
         valid_signals = []
+        complete = True
         
-        for item in results[:2]: # Limit to top 2 to save costs/time
+        for item in articles:
             title = item.get("title")
             link = item.get("link")
-            
-            # Filter dumb stuff
-            if "linkedin.com" in link or "facebook.com" in link:
-                continue
 
             # 3. ANALYZE (LLM)
             # Fetch content via Tavily extract (or search context)
@@ -78,6 +352,8 @@ class SignalAnalyst:
                 continue
                 
             intelligence = self._consult_llm(firm_name, title, content_text)
+            if intelligence.get("error"):
+                complete = False
             
             if intelligence.get("impact_rating", "IGNORE") != "IGNORE":
                 valid_signals.append({
@@ -93,7 +369,7 @@ class SignalAnalyst:
                     "raw_content": content_text[:1000] # Truncate for storage
                 })
 
-        return valid_signals
+        return valid_signals, complete
 
     def _get_context_from_tavily(self, url: str, query: str) -> Optional[str]:
         """
@@ -102,6 +378,11 @@ class SignalAnalyst:
         """
         if not self.tavily:
             return None
+
+        url_key = self.url_key(url)
+        hit, content = self._cached_content(url_key)
+        if hit:
+            return content
             
         try:
             # "extract" is cheaper/faster if we trust the URL
@@ -110,13 +391,13 @@ class SignalAnalyst:
             
             # Using the extract feature of Tavily is best for "Reading"
             # Assuming SDK supports extract, otherwise we use search(url)
+            get_limiter("tavily").acquire()
             response = self.tavily.extract(urls=[url])
             
             results = response.get("results", [])
-            if results and results[0].get("raw_content"):
-                 return results[0].get("raw_content")
-                 
-            return None
+            content = results[0].get("raw_content") if results else None
+            self._store_content(url_key, content)
+            return content or None
             
         except Exception as e:
             logger.warning(f"Tavily Extract Failed: {e}")
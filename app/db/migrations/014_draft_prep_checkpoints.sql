@@ -0,0 +1,19 @@
+-- Migration 014: Overnight Baker Checkpoints
+-- Date: 2026-01-21
+-- Purpose: Make run_draft_prep resumable. One row per candidate per run date holding
+-- the output of every completed stage (image, liveness, signals, events, draft),
+-- so a restarted run never pays for the same Serper/Tavily/Gemini work twice.
+CREATE TABLE IF NOT EXISTS draft_prep_checkpoints (
+    run_date DATE NOT NULL,
+    candidate_id UUID NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+    -- {"image": {...}, "liveness": {...}, "signals": {...}, "events": {...}, "draft": {...}}
+    stages JSONB NOT NULL DEFAULT '{}'::jsonb,
+    -- Set once the candidate is written to morning_briefing_queue
+    committed BOOLEAN NOT NULL DEFAULT FALSE,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (run_date, candidate_id)
+);
+-- Resume lookup: "what is still open for today?"
+CREATE INDEX IF NOT EXISTS idx_dpc_run_date_open ON draft_prep_checkpoints(run_date)
+WHERE committed = FALSE;
+ALTER TABLE draft_prep_checkpoints ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,18 @@
+-- Migration 015: Firm Signal Cache
+-- Date: 2026-01-21
+-- Purpose: SignalAnalyst runs Serper -> Tavily -> LLM judge per firm. Cache the judged
+-- signals per firm so repeat firms (same night or consecutive days) skip the paid chain.
+-- url_set_hash fingerprints the article URLs that were judged: the LLM only runs again
+-- when Serper surfaces a different set of articles.
+CREATE TABLE IF NOT EXISTS firm_signal_cache (
+    firm_key TEXT PRIMARY KEY,
+    -- normalized firm name ("alera group")
+    firm_name TEXT,
+    url_set_hash TEXT NOT NULL,
+    signals JSONB NOT NULL DEFAULT '[]'::jsonb,
+    -- Last Serper scan (freshness window) and last LLM judgement
+    scanned_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    analyzed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_fsc_scanned_at ON firm_signal_cache(scanned_at);
+ALTER TABLE firm_signal_cache ENABLE ROW LEVEL SECURITY;
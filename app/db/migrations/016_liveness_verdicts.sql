@@ -0,0 +1,17 @@
+-- Migration 016: Liveness Verdict Cache
+-- Date: 2026-01-21
+-- Purpose: EmploymentLivenessCheck costs one Serper call per candidate. Persist each
+-- verdict with the evidence snippet so checks inside LIVENESS_TTL_HOURS reuse it.
+CREATE TABLE IF NOT EXISTS liveness_verdicts (
+    -- normalized "full name|firm" (the verdict depends on nothing else)
+    candidate_key TEXT PRIMARY KEY,
+    full_name TEXT,
+    firm TEXT,
+    is_departure BOOLEAN NOT NULL DEFAULT FALSE,
+    risk_reason TEXT,
+    -- Title + snippet of the top Serper hit the verdict was based on
+    evidence TEXT,
+    checked_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_lv_checked_at ON liveness_verdicts(checked_at);
+ALTER TABLE liveness_verdicts ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,48 @@
+-- Migration 017: Bulk Writes for the Overnight Baker
+-- Date: 2026-01-22
+-- Purpose: The baker flushed target_brokers / candidates one UPDATE per candidate.
+-- These functions apply a whole batch in one call (one statement each).
+-- p_rows is a JSON array of row objects keyed by "id".
+-- 1. target_brokers mirror (draft + image)
+CREATE OR REPLACE FUNCTION bake_flush_target_brokers(p_rows JSONB) RETURNS INTEGER LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public AS $$
+DECLARE updated INTEGER;
+BEGIN
+UPDATE target_brokers tb
+SET llm_email_body = r.llm_email_body,
+    llm_email_subject = r.llm_email_subject,
+    profile_image = r.profile_image
+FROM jsonb_to_recordset(p_rows) AS r(
+        id TEXT,
+        llm_email_body TEXT,
+        llm_email_subject TEXT,
+        profile_image TEXT
+    )
+WHERE tb.id::text = r.id;
+GET DIAGNOSTICS updated = ROW_COUNT;
+RETURN updated;
+END;
+$$;
+-- 2. candidates (master) state transition
+CREATE OR REPLACE FUNCTION bake_flush_candidates(p_rows JSONB) RETURNS INTEGER LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public AS $$
+DECLARE updated INTEGER;
+BEGIN
+UPDATE candidates c
+SET status = r.status,
+    draft_body = r.draft_body,
+    linkedin_image_url = r.linkedin_image_url,
+    updated_at = NOW()
+FROM jsonb_to_recordset(p_rows) AS r(
+        id UUID,
+        status TEXT,
+        draft_body TEXT,
+        linkedin_image_url TEXT
+    )
+WHERE c.id = r.id;
+GET DIAGNOSTICS updated = ROW_COUNT;
+RETURN updated;
+END;
+$$;
+GRANT EXECUTE ON FUNCTION bake_flush_target_brokers(JSONB) TO service_role;
+GRANT EXECUTE ON FUNCTION bake_flush_candidates(JSONB) TO service_role;
@@ -0,0 +1,73 @@
+-- Migration 018: Server-Side Pool Sampling
+-- Date: 2026-01-22
+-- Purpose: The baker paged POOL with OFFSET, shuffled in Python and applied the firm cap
+-- locally, reading far more rows than it used (and deeper offsets get slower).
+-- sample_pool_candidates() returns exactly the rows needed in one indexed query:
+-- random start on sample_key, firm cap applied server-side, recent attempts skipped.
+-- 1. Sampling columns
+-- sample_key: random position in the pool (re-rolled on every attempt)
+ALTER TABLE candidates
+ADD COLUMN IF NOT EXISTS sample_key DOUBLE PRECISION NOT NULL DEFAULT random();
+ALTER TABLE candidates
+ADD COLUMN IF NOT EXISTS last_attempted_at TIMESTAMP WITH TIME ZONE;
+CREATE INDEX IF NOT EXISTS idx_candidates_pool_sample ON candidates(sample_key)
+WHERE status = 'POOL';
+-- 2. Sampler
+-- p_firm_counts: {"Firm Name": n} already baked/in flight this run (counts toward the cap)
+-- p_exclude_ids: candidates this run has already seen
+CREATE OR REPLACE FUNCTION sample_pool_candidates(
+        p_needed INTEGER,
+        p_max_per_firm INTEGER DEFAULT 2,
+        p_firm_counts JSONB DEFAULT '{}'::jsonb,
+        p_exclude_ids UUID [] DEFAULT '{}'::uuid [],
+        p_retry_after INTERVAL DEFAULT INTERVAL '20 hours',
+        p_scan_limit INTEGER DEFAULT 500
+    ) RETURNS SETOF candidates LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public AS $$
+DECLARE v_start DOUBLE PRECISION := random();
+BEGIN RETURN QUERY WITH scan AS (
+    -- Walk the partial index from a random point, wrapping around once
+    (
+        SELECT c.id, c.firm, c.sample_key, 0 AS lap
+        FROM candidates c
+        WHERE c.status = 'POOL'
+            AND c.sample_key >= v_start
+            AND NOT (c.id = ANY(p_exclude_ids))
+            AND (c.last_attempted_at IS NULL OR c.last_attempted_at < NOW() - p_retry_after)
+        ORDER BY c.sample_key
+        LIMIT p_scan_limit
+    )
+    UNION ALL
+    (
+        SELECT c.id, c.firm, c.sample_key, 1 AS lap
+        FROM candidates c
+        WHERE c.status = 'POOL'
+            AND c.sample_key < v_start
+            AND NOT (c.id = ANY(p_exclude_ids))
+            AND (c.last_attempted_at IS NULL OR c.last_attempted_at < NOW() - p_retry_after)
+        ORDER BY c.sample_key
+        LIMIT p_scan_limit
+    )
+),
+ranked AS (
+    SELECT s.id, s.lap, s.sample_key,
+        ROW_NUMBER() OVER (PARTITION BY s.firm ORDER BY s.lap, s.sample_key)
+            + COALESCE((p_firm_counts->>s.firm)::INTEGER, 0) AS firm_rank
+    FROM scan s
+),
+picked AS (
+    SELECT r.id
+    FROM ranked r
+    WHERE r.firm_rank <= p_max_per_firm
+    ORDER BY r.lap, r.sample_key
+    LIMIT p_needed
+)
+UPDATE candidates c
+SET last_attempted_at = NOW(),
+    sample_key = random()
+FROM picked
+WHERE c.id = picked.id
+RETURNING c.*;
+END;
+$$;
+GRANT EXECUTE ON FUNCTION sample_pool_candidates(INTEGER, INTEGER, JSONB, UUID [], INTERVAL, INTEGER) TO service_role;
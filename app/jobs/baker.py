@@ -0,0 +1,446 @@
+"""
+Overnight Baker (Morning Briefing Generator).
+
+Pulls POOL candidates, runs each one through the intelligence stages
+(image -> liveness -> signals/events -> draft) on a StagedExecutor and writes
+the results into the morning_briefing_queue.
+
+Admission control stays on the calling thread so the business rules hold
+exactly under concurrency:
+- TARGET_DAILY_TOTAL: never more candidates in flight than slots still open.
+- Firm diversity: a firm slot is reserved on admission and released if the
+  candidate drops out, so at most `max_per_firm` per firm are ever baked.
+
+Every finished stage is checkpointed (see app/jobs/checkpoints.py). A restarted
+run re-admits today's unfinished candidates first and replays their saved
+stage outputs, so paid calls are never repeated for the same candidate/day.
+
+POOL is sampled server-side (sample_pool_candidates, migration 018): each
+refill returns only the rows still needed, already diversity-capped. The old
+offset scan stays as a fallback when the RPC is unavailable.
+
+Signals for each admitted group are prefetched in the background
+(SignalAnalyst.prefetch): one Serper scan per firm and multi-URL Tavily
+extracts for the whole group, ready by the time the intel stage runs.
+
+Finished candidates are written per batch through a BakeWriteBuffer
+(app/jobs/write_buffer.py): one bulk call per table instead of one per row.
+"""
+import datetime
+import queue
+import random
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.jobs.checkpoints import BakeCheckpointStore
+from app.jobs.pipeline import Stage, StagedExecutor
+from app.jobs.write_buffer import BakeWriteBuffer
+from utils.rate_limiter import get_limiter
+from app.lib.safety import sanitize_external_string_for_db
+
+DEFAULT_STAGE_WORKERS = {"image": 8, "liveness": 4, "intel": 4, "draft": 4}
+
+
+@dataclass
+class BakeJob:
+    cand: Dict[str, Any]
+    img_url: Optional[str] = None
+    is_blocked: bool = False
+    blocked_reason: str = ""
+    signals: List[Dict[str, Any]] = field(default_factory=list)
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    subject: str = "Subject: Connect"
+    body: str = ""
+
+    @property
+    def firm(self) -> str:
+        return self.cand.get("firm", "Unknown")
+
+
+class OvernightBaker:
+    def __init__(self, db, ghostwriter, image_proxy, signals_engine, event_scout, liveness_checker,
+                 target_total: int = 50, batch_size: int = 10, max_per_firm: int = 2,
+                 page_size: int = 200, max_attempts: int = 50,
+                 stage_workers: Optional[Dict[str, int]] = None,
+                 use_checkpoints: bool = True,
+                 flush_retries: int = 3, flush_backoff: float = 0.5):
+        self.db = db
+        self.ghostwriter = ghostwriter
+        self.image_proxy = image_proxy
+        self.signals_engine = signals_engine
+        self.event_scout = event_scout
+        self.liveness_checker = liveness_checker
+
+        self.target_total = target_total
+        self.batch_size = batch_size
+        self.max_per_firm = max_per_firm
+        self.page_size = page_size
+        self.max_attempts = max_attempts
+
+        self.stage_workers = {**DEFAULT_STAGE_WORKERS, **(stage_workers or {})}
+        # Shared per-upstream token buckets (utils/rate_limiter.py), read only: their
+        # rates are process-wide and set by the entry point. Serper and Tavily are
+        # drawn inside SerperClient / SignalAnalyst; the baker draws Gemini itself.
+        self.limiters = {name: get_limiter(name) for name in ("serper", "tavily", "gemini")}
+
+        self.use_checkpoints = use_checkpoints
+        self.checkpoints: Optional[BakeCheckpointStore] = None
+        self.flush_retries = flush_retries
+        self.use_sampling = True
+        self.flush_backoff = flush_backoff
+
+    # ------------------------------------------------------------------
+    # Run Loop
+    # ------------------------------------------------------------------
+
+    def run(self, today_str: Optional[str] = None) -> int:
+        """
+        Bakes the queue for `today_str` up to target_total. Returns the queue size.
+        """
+        today_str = today_str or datetime.date.today().isoformat()
+
+        # 1. Check if already populated
+        try:
+            q_res = self.db.table("morning_briefing_queue").select("id", count="exact", head=True) \
+                .eq("selected_for_date", today_str).execute()
+            if q_res.count and q_res.count >= self.target_total:
+                print(f"✅ Morning Briefing already fully baked for {today_str} ({q_res.count} items). Exiting.")
+                return q_res.count
+        except Exception as e:
+            print(f"Queue check failed: {e}")
+            return 0
+
+        current_count = q_res.count or 0
+        print(f"Need {self.target_total - current_count} fresh candidates to reach {self.target_total}...")
+
+        pending = deque()
+        seen_ids = set()
+
+        # RESUME: unfinished candidates from an earlier run today go first
+        self.checkpoints = BakeCheckpointStore(self.db, today_str) if self.use_checkpoints else None
+        if self.checkpoints and self.checkpoints.load():
+            resumed = self._fetch_resumable(self.checkpoints.open_candidate_ids())
+            if resumed:
+                print(f"  [Checkpoint] Resuming {len(resumed)} unfinished candidates from an earlier run.")
+                pending.extend(resumed)
+
+        done_q = queue.Queue()
+        buffer = BakeWriteBuffer(self.db, today_str, retries=self.flush_retries, backoff=self.flush_backoff)
+        firm_reserved: Dict[str, int] = {}  # baked + buffered + in flight, across all pages
+        in_flight = 0
+        attempts = 0
+        pool_exhausted = False
+
+        executor = StagedExecutor([
+            Stage("image", self._stage_image, self.stage_workers["image"]),
+            Stage("liveness", self._stage_liveness, self.stage_workers["liveness"]),
+            Stage("intel", self._stage_intel, self.stage_workers["intel"]),
+            Stage("draft", self._stage_draft, self.stage_workers["draft"]),
+        ])
+
+        # Batch signal collection runs beside the stages (one worker, in admission order)
+        prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="signals-prefetch") \
+            if hasattr(self.signals_engine, "prefetch") else None
+
+        def on_done(job, err):
+            done_q.put((job, err))
+
+        try:
+            while current_count < self.target_total:
+                open_slots = self.target_total - current_count - len(buffer) - in_flight
+
+                # ADMISSION (Diversity + Exact Target)
+                invalid_ids = []
+                admitted_firms = []
+                while pending and open_slots > 0:
+                    cand = pending.popleft()
+                    if cand['id'] in seen_ids:
+                        continue
+                    seen_ids.add(cand['id'])
+                    firm = cand.get("firm", "Unknown")
+                    if firm_reserved.get(firm, 0) >= self.max_per_firm:
+                        # Skip locally (the sampler already caps firms; resumed rows and the
+                        # offset fallback do not). We won't see it again this run.
+                        continue
+
+                    missing = self._missing_fields(cand)
+                    if missing:
+                        print(f"  [Skip] {cand.get('full_name')} missing: {missing}")
+                        invalid_ids.append(cand['id'])
+                        continue
+
+                    firm_reserved[firm] = firm_reserved.get(firm, 0) + 1
+                    if not (self.checkpoints and self.checkpoints.get(cand['id'], "signals") is not None):
+                        admitted_firms.append(firm)
+                    in_flight += 1
+                    open_slots -= 1
+                    executor.submit(BakeJob(cand=cand), on_done)
+
+                if invalid_ids:
+                    self.db.table("candidates").update({"status": "FAILED"}).in_("id", invalid_ids).execute()
+                if prefetcher and admitted_firms:
+                    prefetcher.submit(self._prefetch_signals, admitted_firms)
+
+                # REFILL (Keep the pipeline full while slots remain)
+                if not pending and open_slots > 0 and not pool_exhausted:
+                    if attempts >= self.max_attempts:
+                        pool_exhausted = True
+                    else:
+                        attempts += 1
+                        page = self._sample_pool(attempts, open_slots, firm_reserved, seen_ids)
+                        if page:
+                            pending.extend(page)
+                        else:
+                            pool_exhausted = True
+                        continue
+
+                if in_flight == 0:
+                    if not len(buffer):
+                        break
+                    current_count += self._flush(buffer, firm_reserved)
+                    continue
+
+                # COLLECT
+                job, err = done_q.get()
+                in_flight -= 1
+
+                if err is not None:
+                    print(f"  [❌] Processing Failed {job.cand.get('full_name')}: {err}")
+                    firm_reserved[job.firm] -= 1
+                    continue
+
+                batch_num = ((current_count + len(buffer)) // self.batch_size) + 1
+                buffer.add(job, batch_num)
+
+                # FLUSH on every batch boundary (and whenever the pipeline drains)
+                if (current_count + len(buffer)) % self.batch_size == 0 or in_flight == 0:
+                    current_count += self._flush(buffer, firm_reserved)
+        finally:
+            if prefetcher:
+                prefetcher.shutdown(wait=True)
+            executor.shutdown()
+            if len(buffer):
+                current_count += self._flush(buffer, firm_reserved)
+
+        print(f"Baking Complete. Queue Size: {current_count}")
+        return current_count
+
+    def _prefetch_signals(self, firms: List[str]):
+        try:
+            self.signals_engine.prefetch(firms)
+        except Exception as e:
+            print(f"  [Intel] Signal prefetch failed ({e}). Falling back to per-firm scans.")
+
+    def _sample_pool(self, attempt: int, needed: int, firm_reserved: Dict[str, int],
+                     seen_ids: set) -> List[Dict[str, Any]]:
+        if not self.use_sampling:
+            return self._fetch_pool_page(attempt)
+        print(f"--- Hunt Batch {attempt} ---")
+        try:
+            res = self.db.rpc("sample_pool_candidates", {
+                "p_needed": needed,
+                "p_max_per_firm": self.max_per_firm,
+                "p_firm_counts": {firm: n for firm, n in firm_reserved.items() if n > 0},
+                "p_exclude_ids": list(seen_ids),
+            }).execute()
+        except Exception as e:
+            print(f"  Pool sampling failed ({e}). Falling back to offset scan for this run.")
+            self.use_sampling = False
+            return self._fetch_pool_page(attempt)
+
+        candidates = res.data or []
+        print(f"  Sampled {len(candidates)} POOL candidates (needed {needed}).")
+        if not candidates:
+            print("Pool Exhausted.")
+        self._warm_liveness(candidates)
+        return candidates
+
+    def _fetch_pool_page(self, attempt: int) -> List[Dict[str, Any]]:
+        # Fetch from POOL with Offset to traverse inventory
+        offset_val = (attempt - 1) * self.page_size
+        print(f"--- Hunt Batch {attempt} ---")
+        print(f"  Fetching POOL offset {offset_val}...")
+        try:
+            pool_res = self.db.table("candidates").select("*").eq("status", "POOL") \
+                .range(offset_val, offset_val + self.page_size - 1).execute()
+            candidates = pool_res.data or []
+        except Exception as e:
+            print(f"Pool fetch failed: {e}")
+            return []
+
+        if not candidates:
+            print("Pool Exhausted.")
+        random.shuffle(candidates)
+        self._warm_liveness(candidates)
+        return candidates
+
+    def _fetch_resumable(self, candidate_ids: List[str]) -> List[Dict[str, Any]]:
+        if not candidate_ids:
+            return []
+        try:
+            res = self.db.table("candidates").select("*").in_("id", candidate_ids) \
+                .eq("status", "POOL").execute()
+        except Exception as e:
+            print(f"  [Checkpoint] Resume fetch failed: {e}")
+            return []
+        self._warm_liveness(res.data or [])
+        return res.data or []
+
+    def _warm_liveness(self, candidates: List[Dict[str, Any]]):
+        # One verdict-cache read per page instead of one per candidate.
+        if not candidates or not hasattr(self.liveness_checker, "warm_cache"):
+            return
+        try:
+            self.liveness_checker.warm_cache(candidates)
+        except Exception as e:
+            print(f"  [GATE] Liveness cache warm-up failed: {e}")
+
+    @staticmethod
+    def _missing_fields(cand: Dict[str, Any]) -> List[str]:
+        missing = []
+        if not cand.get("full_name"): missing.append("name")
+        if not cand.get("firm"): missing.append("firm")
+        if not cand.get("email") and not cand.get("work_email"): missing.append("email")
+        return missing
+
+    # ------------------------------------------------------------------
+    # Checkpoints
+    # ------------------------------------------------------------------
+
+    def _restore(self, job: BakeJob, stage: str) -> bool:
+        """Applies a saved stage output to the job. True if the stage can be skipped."""
+        saved = self.checkpoints.get(job.cand['id'], stage) if self.checkpoints else None
+        if saved is None:
+            return False
+        for attr, value in saved.items():
+            setattr(job, attr, value)
+        print(f"  [Checkpoint] {job.cand.get('full_name')}: reusing '{stage}'")
+        return True
+
+    def _save(self, job: BakeJob, stage: str, *attrs: str):
+        if self.checkpoints:
+            self.checkpoints.save(job.cand['id'], stage, {a: getattr(job, a) for a in attrs})
+
+    # ------------------------------------------------------------------
+    # Stages (run on worker threads, no queue writes here)
+    # ------------------------------------------------------------------
+
+    def _stage_image(self, job: BakeJob):
+        if self._restore(job, "image"):
+            return
+        cand = job.cand
+
+        # SANITIZE existing URLs first (Blast Radius Defense)
+        raw_img_url = cand.get("linkedin_image_url") or cand.get("profile_image")
+        img_url = sanitize_external_string_for_db(raw_img_url)
+
+        # FORCE VALIDATION OF EXISTING URL
+        if img_url and not self.image_proxy.verify_accessibility(img_url):
+            print(f"  [Img] Existing URL blocked (403): {img_url}")
+            img_url = None  # Force re-fetch
+
+        # Attempt Image Fetch if missing or broken
+        if not img_url:
+            print(f"  [Img] Fetching for {cand.get('full_name')}...")
+            try:
+                img_res = self.image_proxy.fetch_image(
+                    name=cand.get('full_name'),
+                    company=cand.get('firm'),
+                    linkedin_url=cand.get('linkedin_url')
+                )
+                img_url = sanitize_external_string_for_db(img_res.get("imageUrl"))
+                cand['linkedin_image_url'] = img_url
+
+                if img_url and not self.image_proxy.verify_accessibility(img_url):
+                    print(f"  [Img] New fetch produced broken URL: {img_url}")
+                    img_url = None
+            except Exception:
+                img_url = None
+
+        # POLICY: Do not skip candidate if image is missing. Proceed with Initials.
+        if not img_url:
+            print(f"  [Warn] No valid image for {cand.get('full_name')}. Proceeding with Initials.")
+
+        job.img_url = img_url
+        self._save(job, "image", "img_url")
+
+    def _stage_liveness(self, job: BakeJob):
+        if self._restore(job, "liveness"):
+            return
+
+        # === LIVENESS GATE (Hard Block) ===
+        liveness = self.liveness_checker.check_status(job.cand)
+        if liveness["is_departure"]:
+            print(f"  [GATE] BLOCKED: {job.cand.get('full_name')} - {liveness['risk_reason']}")
+            job.is_blocked = True
+            job.blocked_reason = liveness["risk_reason"]
+        self._save(job, "liveness", "is_blocked", "blocked_reason")
+
+    def _stage_intel(self, job: BakeJob):
+        # SKIP if blocked to save tokens/time
+        if job.is_blocked:
+            return
+
+        print(f"  [Intel] Scanning Signals & Events for {job.firm}...")
+
+        # A. Signals (Reactive)
+        if not self._restore(job, "signals"):
+            job.signals = self.signals_engine.scan_and_analyze(job.cand.get("firm")) or []
+            self._save(job, "signals", "signals")
+        if job.signals:
+            print(f"       -> Found {len(job.signals)} Signals.")
+
+        # B. Events (Proactive)
+        if not self._restore(job, "events"):
+            job.events = self.event_scout.check_events(job.cand) or []
+            self._save(job, "events", "events")
+        if job.events:
+            print(f"       -> Found {len(job.events)} Event Hooks.")
+
+    def _stage_draft(self, job: BakeJob):
+        if self._restore(job, "draft"):
+            return
+        if job.is_blocked:
+            job.body = f"BLOCKED: {job.blocked_reason}"
+            job.subject = "Alert: High Bounce Risk"
+            return
+
+        print(f"  [Draft] Generating for {job.cand.get('full_name')}...")
+        context_lines = [
+            f"SIGNAL: {sig['signal_type']} - {sig['title']} ({sig['analysis']})" for sig in job.signals
+        ] + [
+            f"EVENT: {evt['event_name']} ({evt['match_reason']}) - Hook: '{evt['hook_text']}'" for evt in job.events
+        ]
+
+        self.limiters["gemini"].acquire()
+        draft_body = self.ghostwriter.generate_draft(job.cand, context="\n".join(context_lines))
+
+        job.body = draft_body
+        if "\n" in draft_body:
+            parts = draft_body.split("\n", 1)
+            if parts[0].lower().startswith("subject:"):
+                job.subject = parts[0]
+                job.body = parts[1].strip()
+        self._save(job, "draft", "subject", "body")
+
+    # ------------------------------------------------------------------
+    # Writes (calling thread only)
+    # ------------------------------------------------------------------
+
+    def _flush(self, buffer: BakeWriteBuffer, firm_reserved: Dict[str, int]) -> int:
+        """Writes the buffered batch. Returns how many candidates made it into the queue."""
+        report = buffer.flush()
+        for job in report.failed:
+            print(f"  [❌] Queue write failed, left in POOL: {job.cand.get('full_name')}")
+            firm_reserved[job.firm] -= 1
+        if report.committed and self.checkpoints:
+            self.checkpoints.mark_committed_many([job.cand['id'] for job in report.committed])
+        for job in report.committed:
+            print(f"  [✅] Baked: {job.cand.get('full_name')}")
+        for table, err in report.errors.items():
+            print(f"  [Flush] PARTIAL: {table} not written for this batch ({err})")
+        print(f"  [Flush] {len(report.committed)} queued, {len(report.failed)} failed, "
+              f"{report.round_trips} round trips")
+        return len(report.committed)
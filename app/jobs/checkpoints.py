@@ -0,0 +1,100 @@
+"""
+Overnight Baker Checkpoints.
+
+Records, per run date and candidate, the output of every stage that finished.
+A restarted run loads the open checkpoints once, re-admits those candidates
+first and replays their saved outputs instead of calling Serper/Tavily/Gemini
+again.
+
+Backed by the `draft_prep_checkpoints` table (migration 014). If the table is
+unreachable the store disables itself and the baker runs without resume.
+"""
+import copy
+import datetime
+import threading
+from typing import Any, Dict, List
+
+
+class BakeCheckpointStore:
+    TABLE = "draft_prep_checkpoints"
+
+    def __init__(self, db, run_date: str):
+        self.db = db
+        self.run_date = run_date
+        self.enabled = True
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._committed = set()
+        self._lock = threading.Lock()
+
+    def load(self) -> int:
+        """
+        Reads every checkpoint for run_date (one query). Returns the number loaded.
+        """
+        try:
+            res = self.db.table(self.TABLE).select("candidate_id, stages, committed") \
+                .eq("run_date", self.run_date).execute()
+        except Exception as e:
+            print(f"  [Checkpoint] Load failed ({e}). Running without resume.")
+            self.enabled = False
+            return 0
+
+        with self._lock:
+            for row in res.data or []:
+                cid = row["candidate_id"]
+                self._stages[cid] = row.get("stages") or {}
+                if row.get("committed"):
+                    self._committed.add(cid)
+        return len(self._stages)
+
+    def open_candidate_ids(self) -> List[str]:
+        """Candidates with finished stages that never made it into the queue."""
+        with self._lock:
+            return [cid for cid, stages in self._stages.items() if stages and cid not in self._committed]
+
+    def get(self, candidate_id: str, stage: str):
+        with self._lock:
+            saved = self._stages.get(candidate_id, {}).get(stage)
+            return copy.deepcopy(saved)
+
+    def save(self, candidate_id: str, stage: str, output: Dict[str, Any]):
+        with self._lock:
+            stages = self._stages.setdefault(candidate_id, {})
+            stages[stage] = copy.deepcopy(output)
+            snapshot = copy.deepcopy(stages)
+        self._write({"stages": snapshot}, candidate_id)
+
+    def mark_committed(self, candidate_id: str):
+        with self._lock:
+            self._committed.add(candidate_id)
+            snapshot = copy.deepcopy(self._stages.get(candidate_id, {}))
+        self._write({"stages": snapshot, "committed": True}, candidate_id)
+
+    def mark_committed_many(self, candidate_ids: List[str]):
+        """mark_committed for a whole flushed batch, in one upsert."""
+        with self._lock:
+            self._committed.update(candidate_ids)
+            snapshots = {cid: copy.deepcopy(self._stages.get(cid, {})) for cid in candidate_ids}
+        if not self.enabled or not candidate_ids:
+            return
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        rows = [{"run_date": self.run_date, "candidate_id": cid, "updated_at": now,
+                 "stages": stages, "committed": True} for cid, stages in snapshots.items()]
+        try:
+            self.db.table(self.TABLE).upsert(rows, on_conflict="run_date,candidate_id").execute()
+        except Exception as e:
+            print(f"  [Checkpoint] Commit mark failed for {len(rows)} candidates: {e}")
+
+    def _write(self, fields: Dict[str, Any], candidate_id: str):
+        if not self.enabled:
+            return
+        row = {
+            "run_date": self.run_date,
+            "candidate_id": candidate_id,
+            "updated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            **fields,
+        }
+        try:
+            self.db.table(self.TABLE).upsert(row, on_conflict="run_date,candidate_id").execute()
+        except Exception as e:
+            # Losing a checkpoint only costs a re-run of that stage later.
+            print(f"  [Checkpoint] Save failed for {candidate_id}: {e}")
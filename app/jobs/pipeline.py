@@ -0,0 +1,57 @@
+"""
+Staged Concurrent Executor (Overnight Baker).
+
+Items flow through an ordered list of stages. Every stage owns its own bounded
+worker pool, so a slow upstream (Serper, Tavily, Gemini) can only tie up the
+workers assigned to it while the other stages keep moving.
+
+Items leave the pipeline through a single completion callback, either after
+the last stage or as soon as a stage returns False (early drop).
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[[Any], Optional[bool]]  # Return False to drop the item early
+    workers: int = 4
+
+
+class StagedExecutor:
+    """
+    Runs each submitted item through `stages` in order.
+    on_done(item, error) is called exactly once per item, from a worker thread.
+    """
+
+    def __init__(self, stages: List[Stage]):
+        if not stages:
+            raise ValueError("StagedExecutor needs at least one stage")
+        self.stages = stages
+        self._pools = [
+            ThreadPoolExecutor(max_workers=max(1, s.workers), thread_name_prefix=f"stage-{s.name}")
+            for s in stages
+        ]
+
+    def submit(self, item: Any, on_done: Callable[[Any, Optional[BaseException]], None]):
+        self._pools[0].submit(self._run, 0, item, on_done)
+
+    def _run(self, idx: int, item: Any, on_done):
+        try:
+            keep_going = self.stages[idx].fn(item)
+        except Exception as e:
+            on_done(item, e)
+            return
+
+        if keep_going is False or idx == len(self.stages) - 1:
+            on_done(item, None)
+            return
+
+        self._pools[idx + 1].submit(self._run, idx + 1, item, on_done)
+
+    def shutdown(self):
+        # Upstream pools hand work downstream, so drain them in stage order.
+        for pool in self._pools:
+            pool.shutdown(wait=True)
@@ -0,0 +1,104 @@
+"""
+Overnight Baker Write Buffer.
+
+Finished candidates are buffered per batch and written with one bulk call per
+table instead of 3+ round trips per candidate:
+
+1. morning_briefing_queue  bulk upsert (on candidate_id, selected_for_date)
+2. candidates              bake_flush_candidates RPC (migration 017)
+3. target_brokers          bake_flush_target_brokers RPC (legacy mirror)
+4. candidate_signals       bulk insert
+
+The queue goes first and gates the rest: if it cannot be written after the
+retries, nothing else is touched and every candidate in the batch stays in
+POOL (and its checkpoints stay open for the next run). Later steps only
+affect mirrors, so their failures are reported but do not undo the batch.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+
+@dataclass
+class FlushReport:
+    committed: List[Any] = field(default_factory=list)  # jobs with a queue row
+    failed: List[Any] = field(default_factory=list)     # jobs left in POOL
+    errors: Dict[str, str] = field(default_factory=dict)  # table -> error it gave up on
+    round_trips: int = 0
+
+
+class BakeWriteBuffer:
+    def __init__(self, db, today_str: str, retries: int = 3, backoff: float = 0.5):
+        self.db = db
+        self.today_str = today_str
+        self.retries = max(1, retries)
+        self.backoff = backoff
+        self._entries: List[tuple] = []  # (job, batch_num)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, job, batch_num: int):
+        self._entries.append((job, batch_num))
+
+    def flush(self) -> FlushReport:
+        entries, self._entries = self._entries, []
+        report = FlushReport()
+        if not entries:
+            return report
+        jobs = [job for job, _ in entries]
+
+        queue_rows = [{
+            "candidate_id": job.cand['id'],
+            "status": "pending",
+            "selected_for_date": self.today_str,
+            "priority_score": batch_num,
+            "ranking_reason": f"Batch {batch_num}",
+            "draft_preview": job.body,
+        } for job, batch_num in entries]
+        if not self._write(report, "morning_briefing_queue", lambda: self.db.table("morning_briefing_queue")
+                           .upsert(queue_rows, on_conflict="candidate_id,selected_for_date").execute()):
+            report.failed = jobs
+            return report
+        report.committed = jobs
+
+        # Blocked candidates are queued too (with the bounce-risk alert as their body)
+        candidate_rows = [{
+            "id": job.cand['id'],
+            "status": "QUEUED",
+            "draft_body": job.body,
+            "linkedin_image_url": job.img_url,
+        } for job in jobs]
+        self._write(report, "candidates", lambda: self.db.rpc(
+            "bake_flush_candidates", {"p_rows": candidate_rows}).execute())
+
+        broker_rows = [{
+            "id": job.cand['id'],
+            "llm_email_body": job.body,
+            "llm_email_subject": job.subject,
+            "profile_image": job.img_url,
+        } for job in jobs]
+        self._write(report, "target_brokers", lambda: self.db.rpc(
+            "bake_flush_target_brokers", {"p_rows": broker_rows}).execute())
+
+        signal_rows = [{**sig, "candidate_id": job.cand['id']} for job in jobs for sig in job.signals]
+        if signal_rows:
+            self._write(report, "candidate_signals", lambda: self.db.table("candidate_signals")
+                        .insert(signal_rows).execute())
+
+        return report
+
+    def _write(self, report: FlushReport, table: str, call: Callable[[], Any]) -> bool:
+        for attempt in range(1, self.retries + 1):
+            report.round_trips += 1
+            try:
+                call()
+                report.errors.pop(table, None)
+                return True
+            except Exception as e:
+                report.errors[table] = str(e)
+                if attempt < self.retries:
+                    print(f"  [Flush] {table} failed (attempt {attempt}/{self.retries}): {e}")
+                    time.sleep(self.backoff * (2 ** (attempt - 1)))
+        print(f"  [Flush] {table} gave up after {self.retries} attempts: {report.errors[table]}")
+        return False
@@ -2,19 +2,20 @@ import os
 import requests
 import json
 from dotenv import load_dotenv
+from utils.pdl import get_pdl_client
 
 load_dotenv()
 
 PDL_API_KEY = os.getenv("PDL_API_KEY")
-PDL_COMPANY_ENRICH_URL = "https://api.peopledatalabs.com/v5/company/enrich"
-PDL_SEARCH_URL = "https://api.peopledatalabs.com/v5/person/search"
-PDL_PERSON_ENRICH_URL = "https://api.peopledatalabs.com/v5/person/enrich"
 
 class EnrichmentService:
     def __init__(self):
         if not PDL_API_KEY:
             raise ValueError("PDL_API_KEY not found in environment")
         self.api_key = PDL_API_KEY
+        # Shared client: pooled session, "pdl" rate bucket, single-flight and a
+        # TTL response cache, so repeat company/person lookups cost no credits.
+        self.pdl = get_pdl_client()
 
     def find_person(self, company_name=None, website=None, location=None, title_keywords=None):
         """
@@ -24,6 +25,27 @@ class EnrichmentService:
         
         Returns the single best match.
         """
+        result = self._search_person(company_name, website, location, title_keywords)
+        if "_hydrate_id" in result:
+            return self._enrich_by_id(result["_hydrate_id"])
+        return result
+
+    def find_people(self, queries):
+        """
+        find_person for many targets. queries: list of find_person kwargs dicts.
+        Masked search hits are hydrated together via PDL bulk enrichment instead
+        of one person/enrich call each. Returns results in query order.
+        """
+        results = [self._search_person(**q) for q in queries]
+        pending = [i for i, r in enumerate(results) if "_hydrate_id" in r]
+        if pending:
+            hydrated = self._enrich_by_ids([results[i]["_hydrate_id"] for i in pending])
+            for i, person in zip(pending, hydrated):
+                results[i] = person
+        return results
+
+    def _search_person(self, company_name=None, website=None, location=None, title_keywords=None):
+        """Steps 1-2 of find_person. Masked hits come back as {"_hydrate_id": pdl_id}."""
         if not (company_name or website) or not title_keywords:
             return {"error": "Missing usage criteria"}
 
@@ -61,15 +83,12 @@ class EnrichmentService:
             "pretty": True
         }
         
-        headers = {
-            "X-Api-Key": self.api_key,
-            "Content-Type": "application/json"
-        }
-        
         try:
-            response = requests.get(PDL_SEARCH_URL, headers=headers, params=params)
-            response.raise_for_status()
-            data = response.json()
+            status, data = self.pdl.get("person/search", params)
+            if status == 404:
+                return {"success": False, "error": "No person match found"}
+            if status != 200:
+                return {"success": False, "error": f"PDL search error {status}: {data.get('error')}"}
             
             if data['status'] == 200:
                 if data['data']:
@@ -81,7 +100,7 @@ class EnrichmentService:
                     
                     if pdl_id and (work_email_raw is True or work_email_raw is None):
                         print(f"🔄 Search found {person.get('full_name')} but emails are masked. Enriching ID: {pdl_id}...")
-                        return self._enrich_by_id(pdl_id)
+                        return {"_hydrate_id": pdl_id}
 
                     # Return as is if data looks real
                     return self._format_person(person)
@@ -107,20 +126,18 @@ class EnrichmentService:
             
         # print(f"🔎 DEBUG: Enriching Company: {json.dumps(params)}")
         
-        headers = {"X-Api-Key": self.api_key}
-        
         try:
-            response = requests.get(PDL_COMPANY_ENRICH_URL, headers=headers, params=params)
+            status, data = self.pdl.get("company/enrich", params)
             
-            # print(f"🔎 DEBUG: Response Code: {response.status_code}")
+            # print(f"🔎 DEBUG: Response Code: {status}")
             
-            if response.status_code == 200:
-                # print(f"✅ DEBUG: Match Found: {response.json().get('name')}")
-                return response.json()
-            elif response.status_code == 404:
+            if status == 200:
+                # print(f"✅ DEBUG: Match Found: {data.get('name')}")
+                return data
+            elif status == 404:
                 return None
             else:
-                print(f"⚠️ Company Enrich Error: {response.text}")
+                print(f"⚠️ Company Enrich Error: {data}")
                 return None
         except Exception as e:
             print(f"⚠️ Company Enrich Exception: {e}")
@@ -128,12 +145,11 @@ class EnrichmentService:
 
     def _enrich_by_id(self, pdl_id):
         params = {"pdl_id": pdl_id, "pretty": True}
-        headers = {"X-Api-Key": self.api_key}
         
         try:
-            response = requests.get(PDL_PERSON_ENRICH_URL, headers=headers, params=params)
-            response.raise_for_status()
-            data = response.json()
+            status, data = self.pdl.get("person/enrich", params)
+            if status != 200:
+                return {"success": False, "error": f"Enrichment failed for ID {pdl_id}"}
             
             if data['status'] == 200 and data['data']:
                 return self._format_person(data['data'])
@@ -142,6 +158,20 @@ class EnrichmentService:
         except Exception as e:
             return {"success": False, "error": f"Enrichment error: {str(e)}"}
 
+    def _enrich_by_ids(self, pdl_ids):
+        try:
+            responses = self.pdl.bulk_enrich([{"pdl_id": pdl_id} for pdl_id in pdl_ids])
+        except Exception as e:
+            return [{"success": False, "error": f"Enrichment error: {str(e)}"} for _ in pdl_ids]
+
+        people = []
+        for pdl_id, (status, data) in zip(pdl_ids, responses):
+            if status == 200 and data.get('data'):
+                people.append(self._format_person(data['data']))
+            else:
+                people.append({"success": False, "error": f"Enrichment failed for ID {pdl_id}"})
+        return people
+
     def _format_person(self, person):
         # Safely extract emails handling potential list/bool weirdness if still present
         personal_emails = person.get('personal_emails', [])
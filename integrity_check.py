@@ -1,11 +1,12 @@
 import os
-import time
 import json
 import re
 import gspread
 from google.oauth2.service_account import Credentials
 from dotenv import load_dotenv
 from recon_agent import generate_content_with_retry, search_serper, get_google_sheet_client, GOOGLE_SHEET_NAME, WORKSHEET_NAME
+from utils.gsheets import SheetWriteBuffer
+from utils.audit_store import AuditStore, row_fingerprint
 
 # Load environment variables
 load_dotenv()
@@ -55,13 +56,18 @@ def verify_current_role(name, target_firm, linkedin_url):
         
     return False, "Unknown", "Verification failed"
 
-def run_integrity_audit():
+def run_integrity_audit(full=False):
+    """
+    Incremental: rows unchanged (name, firm, LinkedIn, email) since an audit within
+    the re-verify age keep their stored verdict. full=True re-verifies every row.
+    """
     print("--- 🛡️ Starting Data Integrity Audit ---")
     
     client = get_google_sheet_client()
     if not client: return
     
-    sheet = client.open(GOOGLE_SHEET_NAME).worksheet(WORKSHEET_NAME)
+    store = AuditStore("integrity")
+    sheet = SheetWriteBuffer(client.open(GOOGLE_SHEET_NAME).worksheet(WORKSHEET_NAME))
     data = sheet.get_all_records()
     headers = sheet.row_values(1)
     
@@ -73,31 +79,49 @@ def run_integrity_audit():
     status_col = headers.index("Integrity Status") + 1
     
     issues_found = 0
+    fingerprints = [
+        row_fingerprint(f"{row.get('First Name', '')} {row.get('Last Name', '')}", row.get('Firm', ''),
+                        row.get('LinkedIn URL', ''), row.get('Found Email', ''))
+        for row in data
+    ]
+    fresh = {} if full else store.fresh_verdicts(fingerprints)
+    verdicts = []
+    skipped = 0
     
-    for i, row in enumerate(data, start=2):
-        name = f"{row.get('First Name', '')} {row.get('Last Name', '')}"
-        firm = row.get('Firm', '')
-        linkedin = row.get('LinkedIn URL', '')
+    try:
+        for i, row in enumerate(data, start=2):
+            name = f"{row.get('First Name', '')} {row.get('Last Name', '')}"
+            firm = row.get('Firm', '')
+            linkedin = row.get('LinkedIn URL', '')
+            fingerprint = fingerprints[i - 2]
         
-        # Skip if already verified (optional, but good for speed)
-        # current_status = row.get('Integrity Status', '')
-        # if current_status == "Verified": continue
+            # Skip rows unchanged since a recent audit (their status is already in the sheet)
+            if fingerprint in fresh:
+                skipped += 1
+                if fresh[fingerprint] != "Verified":
+                    issues_found += 1
+                continue
         
-        is_match, detected_firm, reason = verify_current_role(name, firm, linkedin)
+            is_match, detected_firm, reason = verify_current_role(name, firm, linkedin)
         
-        if is_match:
-            status = "Verified"
-            print(f"   ✅ {name}: Verified at {firm}")
-        else:
-            status = f"MISMATCH: Found at {detected_firm}"
-            issues_found += 1
-            print(f"   ❌ {name}: Mismatch! Found at {detected_firm}. Reason: {reason}")
+            if is_match:
+                status = "Verified"
+                print(f"   ✅ {name}: Verified at {firm}")
+            else:
+                status = f"MISMATCH: Found at {detected_firm}"
+                issues_found += 1
+                print(f"   ❌ {name}: Mismatch! Found at {detected_firm}. Reason: {reason}")
             
-        # Update Sheet
-        sheet.update_cell(i, status_col, status)
-        time.sleep(1) # Rate limit
-        
-    print(f"\n🏁 Audit Complete. Issues Found: {issues_found}")
+            # Update Sheet (buffered; Gemini calls are paced by the shared bucket)
+            sheet.update_cell(i, status_col, status)
+            if reason != "Verification failed":  # transient errors are retried next run
+                verdicts.append((fingerprint, status))
+    finally:
+        # Flush even after an error; verdicts are only kept once their writes landed
+        sheet.flush()
+        store.record_many(verdicts)
+
+    print(f"\n🏁 Audit Complete. Re-verified {len(data) - skipped}, skipped {skipped} unchanged. Issues Found: {issues_found}")
     return issues_found
 
 if __name__ == "__main__":
@@ -2,7 +2,9 @@ import json
 import os
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 from utils.serper import search_google
+from modules.roster_index import RosterIndex
 
 # Import Vertex AI
 try:
@@ -16,9 +18,19 @@ except ImportError:
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Validation / triangulation searches for one employer are independent: run them
+# side by side (the shared "serper" bucket still paces the calls).
+SEARCH_WORKERS = 8
+_search_pool = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="attribution")
+
+# Snippets the Gemini prompt uses; once the ordered results hold this many,
+# later searches cannot change the prompt.
+GEMINI_SNIPPETS = 10
+
 class AttributionEngine:
     def __init__(self, roster_path="biz_dev_roster.json"):
         self.roster = self._load_roster(roster_path)
+        self.roster_index = RosterIndex(self.roster)
         
         # Init Vertex if available
         if VERTEX_AVAILABLE:
@@ -98,121 +110,110 @@ class AttributionEngine:
         return result
 
     def _lookup_internal(self, firm, city, state):
+        # 1. Exact City / State Match, 2. Regional Fallback ("West Region" leaders)
         if not firm: return None
-        firm_lower = firm.lower()
-        city_lower = city.lower() if city else ""
-        
-        # 1. Exact Match Try
-        for entry in self.roster:
-            if entry['firm'].lower() in firm_lower:
-                e_city = entry['city'].lower()
-                # A. Exact City
-                if city_lower and e_city == city_lower:
-                    return entry
-                # B. State Match (if city not specific in roster)
-                if state and entry['state'] == state and e_city != "west region":
-                    return entry
-        
-        # 2. Regional Fallback (e.g. "West Region" leaders cover all Western States)
-        # Western States List
-        west_states = ['CA', 'WA', 'OR', 'ID', 'UT', 'CO', 'AZ', 'NV', 'NM']
-        if state in west_states:
-            for entry in self.roster:
-                 if entry['firm'].lower() in firm_lower:
-                     if entry['city'].lower() == "west region" or entry['state'].lower() == "west":
-                         return entry
-                         
-        return None
+        return self.roster_index.lookup(firm, city, state)
 
     def _validate_enhanced(self, name, firm, state):
         """
         Checks 3 signals: Firm Website, License, Press.
+        The searches run concurrently; the checks are read in priority order, so the
+        first decisive hit returns (outstanding searches are cancelled) with the
+        same method the sequential checks would report.
         """
-        # 1. Firm Website Check (Highest Authority)
-        q_site = f'site:{firm.replace(" ", "").lower()}.com "{name}" "Team"'
-        res_site = search_google(q_site)
-        if self._check_serp_hits(res_site, [name, "team", "people"]):
-            return True, {'method': 'Firm_Website_Match'}
-
-        # 2. State License Check (Keyword proxy)
-        q_license = f'"{name}" "{firm}" "{state}" insurance license producer'
-        res_license = search_google(q_license)
-        if self._check_serp_hits(res_license, ["license", "producer", "active"]):
-             return True, {'method': 'License_Check_Match'}
-             
-        # 3. Press/News
-        q_press = f'"{name}" "{firm}" after:2023-01-01'
-        res_press = search_google(q_press)
-        if self._check_serp_hits(res_press, [firm, "appointed", "joined", "promoted"]):
-            return True, {'method': 'Press_Match'}
-            
-        return False, {}
+        checks = [
+            # 1. Firm Website Check (Highest Authority)
+            (f'site:{firm.replace(" ", "").lower()}.com "{name}" "Team"',
+             [name, "team", "people"], 'Firm_Website_Match'),
+            # 2. State License Check (Keyword proxy)
+            (f'"{name}" "{firm}" "{state}" insurance license producer',
+             ["license", "producer", "active"], 'License_Check_Match'),
+            # 3. Press/News
+            (f'"{name}" "{firm}" after:2023-01-01',
+             [firm, "appointed", "joined", "promoted"], 'Press_Match'),
+        ]
+        futures = [_search_pool.submit(search_google, q) for q, _, _ in checks]
+        try:
+            for future, (_, keywords, method) in zip(futures, checks):
+                if self._check_serp_hits(future.result(), keywords):
+                    return True, {'method': method}
+            return False, {}
+        finally:
+            for future in futures:
+                future.cancel()
 
     def _triangulate_deep(self, employer, state, firm, city):
         """
         Scrapes Stop-Loss, Conferences, and Deep LinkedIn - then asks Gemini to parse.
+        All searches are in flight at once; Gemini starts as soon as the results so
+        far (in query order) hold the GEMINI_SNIPPETS it reads.
         """
         best_candidate = {'name': None, 'role': None, 'method': None, 'tags': [], 'reasoning': ''}
         
         # 1. Collect Signals (Raw Text)
-        search_results = []
-        
-        # A. Stop-Loss / Elite Partner Signals
-        if firm:
-            q_sl = f'"{firm}" "Stop Loss" "Elite Partner" "{state}"'
-            res_sl = search_google(q_sl)
-            search_results.extend(self._extract_snippets(res_sl))
-
-        # B. Conference Speaker
-        q_conf = f'"{firm}" "Self-Funded" "Speaker" "{state}"'
-        res_conf = search_google(q_conf)
-        search_results.extend(self._extract_snippets(res_conf))
-        
-        # C. LinkedIn Deep (Targeted)
-        q_li = f'"{firm}" "{city}" ("VP" OR "Principal" OR "Consultant") "Self-Funded" -job site:linkedin.com'
-        res_li = search_google(q_li)
-        search_results.extend(self._extract_snippets(res_li))
+        queries = []
+        if self.model:
+            # A. Stop-Loss / Elite Partner Signals
+            if firm:
+                queries.append(f'"{firm}" "Stop Loss" "Elite Partner" "{state}"')
+            # B. Conference Speaker
+            queries.append(f'"{firm}" "Self-Funded" "Speaker" "{state}"')
+        # C. LinkedIn Deep (Targeted) -- also feeds the heuristic fallback
+        queries.append(f'"{firm}" "{city}" ("VP" OR "Principal" OR "Consultant") "Self-Funded" -job site:linkedin.com')
+        futures = [_search_pool.submit(search_google, q) for q in queries]
+        li_future = futures[-1]
 
-        # 2. Analyze with Gemini (if available)
-        if self.model and search_results:
-            try:
-                 analysis = self._analyze_with_gemini(firm, city, search_results)
-                 if analysis and analysis.get('confidence_score', 0) > 40:
-                     best_candidate['name'] = analysis.get('best_match_name')
-                     best_candidate['role'] = analysis.get('job_title')
-                     best_candidate['method'] = "Gemini_AI_Analysis"
-                     best_candidate['reasoning'] = analysis.get('reasoning')
-                     best_candidate['tags'] = ["AI_Extracted"]
-                     if "Self-Funded" in analysis.get('specialty_evidence', ''):
-                         best_candidate['tags'].append("Self-Funded")
-                     return best_candidate
-            except Exception as e:
-                logger.error(f"Gemini Analysis Failed: {e}")
+        try:
+            # 2. Analyze with Gemini (if available)
+            if self.model:
+                search_results = []
+                for future in futures:
+                    search_results.extend(self._extract_snippets(future.result()))
+                    if len(search_results) >= GEMINI_SNIPPETS:
+                        break
+                if search_results:
+                    try:
+                         analysis = self._analyze_with_gemini(firm, city, search_results)
+                         if analysis and analysis.get('confidence_score', 0) > 40:
+                             best_candidate['name'] = analysis.get('best_match_name')
+                             best_candidate['role'] = analysis.get('job_title')
+                             best_candidate['method'] = "Gemini_AI_Analysis"
+                             best_candidate['reasoning'] = analysis.get('reasoning')
+                             best_candidate['tags'] = ["AI_Extracted"]
+                             if "Self-Funded" in analysis.get('specialty_evidence', ''):
+                                 best_candidate['tags'].append("Self-Funded")
+                             return best_candidate
+                    except Exception as e:
+                        logger.error(f"Gemini Analysis Failed: {e}")
 
-        # 3. Fallback Heuristic (If Gemini fails or not avail)
-        # Using the LinkedIn results from C
-        if 'organic' in res_li:
-             for item in res_li['organic'][:3]:
-                title = item.get('title', '')
-                snippet = item.get('snippet', '').lower()
-                if " - " in title:
-                    parts = title.split(" - ")
-                    if len(parts) > 0:
-                        potential_name = parts[0]
-                        if len(potential_name.split()) in [2, 3]:
-                            best_candidate['name'] = potential_name
-                            best_candidate['role'] = "Principal/VP" 
-                            best_candidate['method'] = "Heuristic_Fallback"
-                            if "self-funded" in snippet: best_candidate['tags'].append("Self-Funded")
-                            return best_candidate
-                            
-        return best_candidate
+            # 3. Fallback Heuristic (If Gemini fails or not avail)
+            # Using the LinkedIn results from C
+            res_li = li_future.result()
+            if 'organic' in res_li:
+                 for item in res_li['organic'][:3]:
+                    title = item.get('title', '')
+                    snippet = item.get('snippet', '').lower()
+                    if " - " in title:
+                        parts = title.split(" - ")
+                        if len(parts) > 0:
+                            potential_name = parts[0]
+                            if len(potential_name.split()) in [2, 3]:
+                                best_candidate['name'] = potential_name
+                                best_candidate['role'] = "Principal/VP" 
+                                best_candidate['method'] = "Heuristic_Fallback"
+                                if "self-funded" in snippet: best_candidate['tags'].append("Self-Funded")
+                                return best_candidate
+                                
+            return best_candidate
+        finally:
+            for future in futures:
+                future.cancel()
 
     def _analyze_with_gemini(self, firm, city, snippets):
         """
         Sends raw snippets to Gemini Pro/Flash for structured extraction.
         """
-        snippet_text = "\n".join([f"- {s}" for s in snippets[:10]]) # Limit context
+        snippet_text = "\n".join([f"- {s}" for s in snippets[:GEMINI_SNIPPETS]]) # Limit context
         
         prompt = f"""
         **Role:** You are an expert Insurance Data Analyst.
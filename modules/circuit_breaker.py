@@ -1,5 +1,7 @@
 import os
 import json
+import sqlite3
+import threading
 from datetime import datetime, date
 import logging
 
@@ -7,52 +9,178 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-COST_FILE = "cost_tracker.json"
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+LEDGER_PATH = os.getenv("SCOUT_COST_DB", os.path.join(PROJECT_ROOT, ".cache", "cost_ledger.sqlite3"))
+COST_FILE = "cost_tracker.json"  # Legacy JSON tracker, imported into the ledger once
 DAILY_SOFT_CAP = 15.0
 MONTHLY_HARD_CAP = 200.0
 
+# Amounts are stored as integer micro-dollars so concurrent increments add up exactly
+MICROS = 1_000_000
+
+
 class CircuitBreaker:
-    def __init__(self):
-        self.cost_file = COST_FILE
-        self._load_costs()
+    """
+    API spend ledger. Every charge is a single atomic UPSERT into a per-day,
+    per-provider row of a SQLite WAL database, so threads and separate processes
+    can charge concurrently without losing increments or rewriting a file.
+    """
+
+    def __init__(self, path=LEDGER_PATH, legacy_file=COST_FILE,
+                 daily_soft_cap=DAILY_SOFT_CAP, monthly_hard_cap=MONTHLY_HARD_CAP):
+        self.path = path
+        self.legacy_file = legacy_file
+        self.daily_soft_cap = daily_soft_cap
+        self.monthly_hard_cap = monthly_hard_cap
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
 
-    def _load_costs(self):
-        if os.path.exists(self.cost_file):
-            with open(self.cost_file, 'r') as f:
-                self.costs = json.load(f)
-        else:
-            self.costs = {"daily": {}, "monthly": {}}
+    def _connect(self):
+        # Connections are opened lazily and never carried across a fork
+        if self._conn is not None and self._pid == os.getpid():
+            return self._conn
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cost_ledger (
+                day TEXT NOT NULL,
+                provider TEXT NOT NULL,
+                amount_micros INTEGER NOT NULL DEFAULT 0,
+                calls INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, provider)
+            )
+        """)
+        self._conn, self._pid = conn, os.getpid()
+        self._migrate_legacy(conn)
+        return conn
 
-    def _save_costs(self):
-        with open(self.cost_file, 'w') as f:
-            json.dump(self.costs, f)
+    def _migrate_legacy(self, conn):
+        """Imports the old cost_tracker.json daily totals once, then renames the file."""
+        if not self.legacy_file or not os.path.exists(self.legacy_file):
+            return
+        try:
+            with open(self.legacy_file, 'r') as f:
+                daily = json.load(f).get("daily", {})
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR IGNORE INTO cost_ledger (day, provider, amount_micros, calls) VALUES (?, 'legacy', ?, 0)",
+                [(day, round(amount * MICROS)) for day, amount in daily.items()],
+            )
+            conn.execute("COMMIT")
+            os.replace(self.legacy_file, self.legacy_file + ".migrated")
+            logger.info(f"Imported {len(daily)} days from {self.legacy_file} into the cost ledger.")
+        except FileNotFoundError:
+            pass  # Another process migrated it first
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logger.error(f"Cost ledger migration failed: {e}")
+
+    def _total(self, conn, where, args):
+        row = conn.execute(f"SELECT COALESCE(SUM(amount_micros), 0) FROM cost_ledger WHERE {where}", args).fetchone()
+        return row[0]
 
     def get_daily_spend(self):
-        today = str(date.today())
-        return self.costs["daily"].get(today, 0.0)
+        with self._lock:
+            return self._total(self._connect(), "day = ?", (str(date.today()),)) / MICROS
 
     def get_monthly_spend(self):
         month = date.today().strftime("%Y-%m")
-        return self.costs["monthly"].get(month, 0.0)
+        with self._lock:
+            return self._total(self._connect(), "day LIKE ?", (f"{month}-%",)) / MICROS
 
-    def track_cost(self, amount):
-        today = str(date.today())
-        month = date.today().strftime("%Y-%m")
+    def track_cost(self, amount, provider="api"):
+        """Records a charge unconditionally."""
+        with self._lock:
+            self._connect().execute(
+                """
+                INSERT INTO cost_ledger (day, provider, amount_micros, calls) VALUES (?, ?, ?, 1)
+                ON CONFLICT (day, provider) DO UPDATE SET
+                    amount_micros = amount_micros + excluded.amount_micros,
+                    calls = calls + 1
+                """,
+                (str(date.today()), provider, round(amount * MICROS)),
+            )
+
+    def reserve(self, amount, provider="api"):
+        """
+        Records a charge only if it keeps this month under the hard cap.
+        The check and the write share one IMMEDIATE transaction, so concurrent
+        callers in any process cannot overshoot the cap together.
+
+        The charge is made before the call it pays for. A caller whose call
+        then fails without being billed (network error, 429/5xx) hands it
+        back with refund(); otherwise the reservation stands.
+        """
+        today = date.today()
+        micros = round(amount * MICROS)
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                spent = self._total(conn, "day LIKE ?", (f"{today.strftime('%Y-%m')}-%",))
+                if spent + micros > self.monthly_hard_cap * MICROS:
+                    conn.execute("ROLLBACK")
+                    return False
+                conn.execute(
+                    """
+                    INSERT INTO cost_ledger (day, provider, amount_micros, calls) VALUES (?, ?, ?, 1)
+                    ON CONFLICT (day, provider) DO UPDATE SET
+                        amount_micros = amount_micros + excluded.amount_micros,
+                        calls = calls + 1
+                    """,
+                    (str(today), provider, micros),
+                )
+                conn.execute("COMMIT")
+                return True
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
 
-        self.costs["daily"][today] = self.costs["daily"].get(today, 0.0) + amount
-        self.costs["monthly"][month] = self.costs["monthly"].get(month, 0.0) + amount
-        self._save_costs()
+    def refund(self, amount, provider="api"):
+        """
+        Takes back one reserved charge from today's row (never below zero).
+        A reservation made before midnight and refunded after it stays charged.
+        """
+        with self._lock:
+            self._connect().execute(
+                """
+                UPDATE cost_ledger SET
+                    amount_micros = MAX(amount_micros - ?, 0),
+                    calls = MAX(calls - 1, 0)
+                WHERE day = ? AND provider = ?
+                """,
+                (round(amount * MICROS), str(date.today()), provider),
+            )
+
+    def rollup(self, since=None):
+        """Per-day, per-provider spend: {day: {provider: {"cost": $, "calls": n}}}."""
+        since = since or date.today().strftime("%Y-%m-01")
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT day, provider, amount_micros, calls FROM cost_ledger WHERE day >= ? ORDER BY day, provider",
+                (str(since),),
+            ).fetchall()
+        out = {}
+        for day, provider, micros, calls in rows:
+            out.setdefault(day, {})[provider] = {"cost": micros / MICROS, "calls": calls}
+        return out
 
     def check_limits(self):
         daily_spend = self.get_daily_spend()
         monthly_spend = self.get_monthly_spend()
 
-        if monthly_spend > MONTHLY_HARD_CAP:
-            logger.critical(f"MONTHLY HARD CAP EXCEEDED: ${monthly_spend} > ${MONTHLY_HARD_CAP}. STOPPING.")
+        if monthly_spend > self.monthly_hard_cap:
+            logger.critical(f"MONTHLY HARD CAP EXCEEDED: ${monthly_spend} > ${self.monthly_hard_cap}. STOPPING.")
             return False, "MONTHLY_CAP_EXCEEDED"
-        
-        if daily_spend > DAILY_SOFT_CAP:
-            logger.warning(f"DAILY SOFT CAP EXCEEDED: ${daily_spend} > ${DAILY_SOFT_CAP}. Sending Alert.")
+
+        if daily_spend > self.daily_soft_cap:
+            logger.warning(f"DAILY SOFT CAP EXCEEDED: ${daily_spend} > ${self.daily_soft_cap}. Sending Alert.")
             # In a real app, this would trigger an email alert.
             pass
 
@@ -69,8 +197,21 @@ def check_circuit_breaker():
     is_safe, status = circuit_breaker.check_limits()
     return is_safe
 
-def track_api_cost(cost):
+def track_api_cost(cost, provider="api"):
     """
     Tracks the cost of an API call.
     """
-    circuit_breaker.track_cost(cost)
+    circuit_breaker.track_cost(cost, provider)
+
+def reserve_api_cost(cost, provider="api"):
+    """
+    Charges the cost of an API call about to be made.
+    Returns False (and charges nothing) if it would break the monthly hard cap.
+    """
+    return circuit_breaker.reserve(cost, provider)
+
+def refund_api_cost(cost, provider="api"):
+    """
+    Returns a reserve_api_cost() charge for a call that was not billed.
+    """
+    circuit_breaker.refund(cost, provider)
@@ -0,0 +1,89 @@
+import re
+
+# "West Region" leaders cover all Western States
+WEST_STATES = {'CA', 'WA', 'OR', 'ID', 'UT', 'CO', 'AZ', 'NV', 'NM'}
+
+
+def normalize_firm(name):
+    """'Arthur J. Gallagher & Co.' -> 'arthur j gallagher co'"""
+    return " ".join(re.sub(r'[^a-z0-9]+', ' ', (name or "").lower()).split())
+
+
+class RosterIndex:
+    """
+    In-memory index over the internal biz-dev roster, built once per run.
+
+    - exact map: normalized firm name -> roster positions
+    - token index: each firm key filed under its rarest word, so a query firm
+      ("Gallagher Benefit Services") finds every roster firm whose words appear
+      in it ("Gallagher") without touching firms that only share "Benefits"
+    - secondary keys per firm: city, state, and West-region leaders
+
+    lookup() returns the same entry the old linear scan did: the first roster
+    entry (in file order) of a matching firm with the same city, or the same
+    state outside the West-region rows; failing that, for Western states, the
+    first West-region leader. Roster firms match on whole words.
+    """
+
+    def __init__(self, roster):
+        self.entries = roster
+        self._by_firm = {}      # firm key -> [positions]
+        self._by_token = {}     # rarest token of a firm key -> {firm keys}
+        self._by_city = {}      # (firm key, city) -> first position
+        self._by_state = {}     # (firm key, STATE) -> first position (non-regional rows)
+        self._regional = {}     # firm key -> first West-region position
+
+        for pos, entry in enumerate(roster):
+            key = normalize_firm(entry.get('firm'))
+            if not key:
+                continue
+            self._by_firm.setdefault(key, []).append(pos)
+
+            city = (entry.get('city') or "").lower()
+            state = (entry.get('state') or "").upper()
+            self._by_city.setdefault((key, city), pos)
+            if city == "west region" or state == "WEST":
+                self._regional.setdefault(key, pos)
+            if city != "west region":
+                self._by_state.setdefault((key, state), pos)
+
+        # Every word of a matching firm is in the query, so its rarest one is too
+        frequency = {}
+        for key in self._by_firm:
+            for token in set(key.split()):
+                frequency[token] = frequency.get(token, 0) + 1
+        for key in self._by_firm:
+            rarest = min(key.split(), key=lambda t: (frequency[t], t))
+            self._by_token.setdefault(rarest, set()).add(key)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def firms_in(self, firm):
+        """Roster firm keys whose words appear, in order, in the given firm name."""
+        query = normalize_firm(firm)
+        if not query:
+            return []
+        padded = f" {query} "
+        keys = set()
+        for token in set(query.split()):
+            keys |= self._by_token.get(token, set())
+        return [k for k in keys if f" {k} " in padded]
+
+    def lookup(self, firm, city=None, state=None):
+        keys = self.firms_in(firm)
+        if not keys:
+            return None
+        city = (city or "").lower()
+        state = (state or "").upper()
+
+        best = None
+        for key in keys:
+            for pos in (self._by_city.get((key, city)) if city else None,
+                        self._by_state.get((key, state)) if state else None):
+                if pos is not None and (best is None or pos < best):
+                    best = pos
+        if best is None and state in WEST_STATES:
+            regional = [self._regional[k] for k in keys if k in self._regional]
+            best = min(regional) if regional else None
+        return self.entries[best] if best is not None else None
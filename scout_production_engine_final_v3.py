@@ -2,15 +2,19 @@ import os
 import requests
 import csv
 import time
-import datetime
 import re
+import threading
 from dotenv import load_dotenv
+from utils.rate_limiter import get_limiter, retry_after_seconds
+from utils.batch_runner import ConcurrentBatchRunner, OrderedCsvWriter, resumable_output_path
 
 load_dotenv()
 
 # --- CONFIGURATION ---
 CREDITS_BUDGET_CAP = int(os.getenv("SCOUT_BUDGET_CAP", 50))
 CANARY_LIMIT = 25 
+# Rows in flight at once; the shared "pdl" bucket sets the real pace
+BATCH_WORKERS = int(os.getenv("SCOUT_BATCH_WORKERS", 4))
 
 # API CONFIG
 PDL_API_KEY = os.getenv("PDL_API_KEY") 
@@ -33,6 +37,11 @@ class ScoutEngine:
             raise ValueError("❌ CRITICAL: PDL_API_KEY not found in environment.")
         self.total_credits_used = 0.0
         self.rate_limit_hits = 0
+        self._stats_lock = threading.Lock()  # rows run on a worker pool
+
+    def spend(self, credits):
+        with self._stats_lock:
+            self.total_credits_used += credits
 
     def extract_state(self, address_str):
         if not address_str: return ""
@@ -60,42 +69,27 @@ class ScoutEngine:
         return {"name": name, "lives": lives, "funding": funding, "state": state}
 
     def safe_request(self, method, url, **kwargs):
-        """Wrapper to handle 429 Rate Limits with Smart Backoff"""
+        """Wrapper to handle 429 Rate Limits via the shared "pdl" bucket (honours Retry-After)"""
         retries = 3
-        backoff = 1 # Start with 1 second
         resp = None 
+        bucket = get_limiter("pdl")
         
         for i in range(retries):
             try:
+                bucket.acquire()
                 if method.upper() == "GET":
                     resp = requests.get(url, **kwargs)
                 else:
                     resp = requests.post(url, **kwargs)
                 
-                # Check for Rate Limit
+                # Check for Rate Limit: pause + slow the bucket for every worker
                 if resp.status_code == 429:
-                    self.rate_limit_hits += 1
-                    # Try to parse Retry-After
-                    retry_after = resp.headers.get("Retry-After")
-                    wait_time = backoff # Default
-                    
-                    if retry_after:
-                        try:
-                            # Try integer seconds
-                            wait_time = int(retry_after) + 1
-                            print(f"      ⚠️ Rate Limit (429). Server requested wait: {wait_time}s")
-                        except ValueError:
-                            # If date string or garbage, fall back to exponential
-                            print(f"      ⚠️ Rate Limit (429). Unparseable header. Backing off {backoff}s...")
-                            wait_time = backoff
-                            backoff *= 2 
-                    else:
-                        print(f"      ⚠️ Rate Limit (429). Backing off {backoff}s...")
-                        backoff *= 2 
-
-                    time.sleep(wait_time)
+                    with self._stats_lock: self.rate_limit_hits += 1
+                    print(f"      ⚠️ Rate Limit (429). Backing off...")
+                    bucket.penalize(retry_after_seconds(resp))
                     continue # Retry loop
                 
+                bucket.success()
                 return resp # Success or non-retryable error
             
             except requests.exceptions.RequestException as e:
@@ -143,7 +137,7 @@ class ScoutEngine:
             
             used = float(c_resp.headers.get('X-Call-Credits-Spent', 0.0))
             c_credits += used
-            self.total_credits_used += used
+            self.spend(used)
 
             if c_status == 429:
                 result["Action"] = "ERROR_RATE_LIMIT"
@@ -161,7 +155,7 @@ class ScoutEngine:
                     c_resp = self.safe_request("GET", PDL_COMPANY_URL, params=params_relaxed, headers=headers, timeout=10)
                     used = float(c_resp.headers.get('X-Call-Credits-Spent', 0.0))
                     c_credits += used
-                    self.total_credits_used += used
+                    self.spend(used)
                     c_status = c_resp.status_code
                     result["Comp_Status"] = c_status
                     
@@ -218,7 +212,7 @@ class ScoutEngine:
                     
                     used = float(p_resp.headers.get('X-Call-Credits-Spent', 0.0))
                     p_credits += used
-                    self.total_credits_used += used
+                    self.spend(used)
 
                     if p_resp.status_code == 429:
                         result["Action"] = "ERROR_RATE_LIMIT"
@@ -249,24 +243,16 @@ class ScoutEngine:
         return result
 
     def run_batch(self, input_rows, output_file):
-        print(f"🚀 SCOUT ENGINE FINAL v3.1 (Safe Backoff). Budget: {CREDITS_BUDGET_CAP}")
-        results = []
-        
-        for raw_row in input_rows:
-            try:
-                res = self.process_row(raw_row)
-                results.append(res)
-                print(f"   [{res['Action']}] {res['Client']} -> {res['Reason']} (Cost: {res['Cost']})")
-            except Exception as e:
-                print(f"   [CRITICAL ERROR] Row Failed: {str(e)}")
-            
-            time.sleep(1.0) 
-
+        print(f"🚀 SCOUT ENGINE FINAL v3.1 (Safe Backoff). Budget: {CREDITS_BUDGET_CAP} | Workers: {BATCH_WORKERS}")
         keys = ["Client", "Enriched", "PDL_ID", "Target", "Action", "Reason", "Cost", "Comp_Status", "Pers_Status", "Error_Log"]
-        with open(output_file, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=keys)
-            writer.writeheader()
-            writer.writerows(results)
+
+        # Rows stream to the CSV in input order as they finish (journaled, so a crash loses nothing)
+        runner = ConcurrentBatchRunner(
+            self.process_row, workers=BATCH_WORKERS,
+            on_result=lambda raw, res: print(f"   [{res['Action']}] {res['Client']} -> {res['Reason']} (Cost: {res['Cost']})"),
+            on_error=lambda raw, e: print(f"   [CRITICAL ERROR] Row Failed: {str(e)}"))
+        with OrderedCsvWriter(output_file, keys) as writer:
+            runner.run(input_rows, writer)
         
         print(f"\n✅ BATCH COMPLETE. Results saved to {output_file}")
         print(f"📉 Total Session Credits: {self.total_credits_used}")
@@ -287,7 +273,8 @@ if __name__ == "__main__":
                     if CANARY_LIMIT:
                         print(f"🐤 CANARY RUN: Processing first {CANARY_LIMIT} rows only...")
                         rows = rows[:CANARY_LIMIT]
-                    engine.run_batch(rows, f"production_results_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+                    # An unfinished run of this input resumes from its journal; otherwise a new file
+                    engine.run_batch(rows, resumable_output_path(real_data_file, "production_results"))
         except Exception as e: print(f"❌ Error: {e}")
     else:
         print("⚠️ No input file found. Running HOSTILE VERIFICATION...")
@@ -2,9 +2,11 @@ import os
 import requests
 import csv
 import time
-import datetime
 import re
+import threading
 from dotenv import load_dotenv
+from utils.rate_limiter import get_limiter, retry_after_seconds
+from utils.batch_runner import ConcurrentBatchRunner, OrderedCsvWriter, resumable_output_path
 
 load_dotenv()
 
@@ -13,12 +15,48 @@ load_dotenv()
 CREDITS_BUDGET_CAP = int(os.getenv("SCOUT_BUDGET_CAP", 500))
 # Set to integer (e.g. 5) for acceptance test, or None for full run
 CANARY_LIMIT = None 
+# Rows in flight at once; the shared "pdl" bucket sets the real pace.
+# The budget gate is checked per row, so it can overshoot by the rows in flight.
+BATCH_WORKERS = int(os.getenv("SCOUT_BATCH_WORKERS", 4))
 
 # API CONFIG
 PDL_API_KEY = os.getenv("PDL_API_KEY") 
 PDL_COMPANY_URL = "https://api.peopledatalabs.com/v5/company/enrich"
 PDL_PERSON_URL = "https://api.peopledatalabs.com/v5/person/search"
 
+# PERSON SEARCH: "tiered" = one query per tier (at most 1 billed record per company,
+# empty tiers are free 404s). "combined" (opt-in) = one query for every tier's titles,
+# ranked locally: fewer round trips, but PDL bills every record on the page, and a
+# truncated page that misses Tier 1 still falls back to the per-tier queries.
+PERSON_SEARCH_MODE = os.getenv("SCOUT_PERSON_SEARCH_MODE", "tiered")
+COMBINED_SEARCH_SIZE = int(os.getenv("SCOUT_COMBINED_SEARCH_SIZE", 5))
+
+# Buyer tiers, best first - EXACT MATCHES ONLY
+# With exact matching, we don't need "NOT LIKE '%Assistant%'" because "Assistant CFO" won't match "CFO".
+TITLE_TIERS = [
+    # Bucket 1: The Chiefs (High Authority)
+    ("Tier 1 (Chiefs)", [
+        'CFO', 'Chief Financial Officer', 
+        'CHRO', 'Chief Human Resources Officer', 
+        'CPO', 'Chief People Officer', 
+        'Chief Administrative Officer'
+    ]),
+    # Bucket 2: The Heads/VPs (Strategic)
+    ("Tier 2 (VPs/Directors)", [
+        'VP HR', 'Vice President Human Resources', 'Vice President of Human Resources',
+        'VP People', 'Vice President People',
+        'Head of People', 'Head of HR', 'Head of Human Resources',
+        'Director of Benefits', 'Director of Compensation and Benefits',
+        'Head of Total Rewards', 'VP Total Rewards'
+    ]),
+    # Bucket 3: The Managers (Tactical)
+    ("Tier 3 (Managers)", [
+        'Benefits Manager', 'Manager of Benefits',
+        'Compensation and Benefits Manager',
+        'Human Resources Manager', 'HR Manager'
+    ]),
+]
+
 # HOSTILE DATASET (Fallback)
 HOSTILE_ROWS = [{"name": "SPACE EXPLORATION TECHNOLOGIES CORP", "lives": 12000, "funding": 4, "state": "CA", "ein": "00-0000000"}]
 
@@ -27,6 +65,11 @@ class ScoutEngine:
         if not PDL_API_KEY: raise ValueError("CRITICAL: PDL_API_KEY not found.")
         self.total_credits_used = 0.0
         self.rate_limit_hits = 0
+        self._stats_lock = threading.Lock()  # rows run on a worker pool
+
+    def spend(self, credits):
+        with self._stats_lock:
+            self.total_credits_used += credits
 
     def extract_state(self, address_str):
         if not address_str: return ""
@@ -78,73 +121,98 @@ class ScoutEngine:
         }
 
     def safe_request(self, method, url, **kwargs):
-        retries = 5; backoff = 2; resp = None 
+        # PDL calls draw from the shared "pdl" token bucket; a 429 pauses it (Retry-After)
+        # and halves its rate for every worker/process until successes win it back.
+        retries = 5; resp = None; bucket = get_limiter("pdl")
         for i in range(retries):
             try:
+                bucket.acquire()
                 if method.upper() == "GET": resp = requests.get(url, **kwargs)
                 else: resp = requests.post(url, **kwargs)
                 
                 if resp.status_code == 429:
-                    self.rate_limit_hits += 1
-                    retry_after = resp.headers.get("Retry-After")
-                    wait_time = int(retry_after) + 1 if retry_after else backoff
-                    print(f"      Rate Limit (429). Waiting {wait_time}s...")
-                    time.sleep(wait_time)
-                    if not retry_after: backoff *= 2
+                    with self._stats_lock: self.rate_limit_hits += 1
+                    print(f"      Rate Limit (429). Backing off...")
+                    bucket.penalize(retry_after_seconds(resp))
                     continue 
+                bucket.success()
                 return resp 
             except requests.exceptions.RequestException as e:
                 print(f"      Transport Error: {e}. Retrying..."); time.sleep(2)
         if resp: return resp
         raise requests.exceptions.ConnectionError("Max retries exceeded.")
 
+    def title_sql(self, company_id, titles):
+        return f"SELECT * FROM person WHERE job_company_id = '{company_id}' AND job_title IN ({', '.join([repr(t) for t in titles])})"
+
     def search_person_waterfall(self, company_id, headers):
         """
-        Executes a 3-stage waterfall to find the BEST buyer.
+        Finds the BEST buyer across the title tiers.
         Returns: (person_dict, tier_name, total_cost_credits, last_status_code)
         """
-        # Common exclusion filter (Moved from SQL LIKE to Python check if needed, or omitted if exact match implies exclusion)
-        # With exact matching, we don't need "NOT LIKE '%Assistant%'" because "Assistant CFO" won't match "CFO".
-        
-        # Bucket 1: The Chiefs (High Authority) - EXACT MATCHES ONLY
-        titles_t1 = [
-            'CFO', 'Chief Financial Officer', 
-            'CHRO', 'Chief Human Resources Officer', 
-            'CPO', 'Chief People Officer', 
-            'Chief Administrative Officer'
-        ]
-        sql_tier_1 = f"SELECT * FROM person WHERE job_company_id = '{company_id}' AND job_title IN ({', '.join([repr(t) for t in titles_t1])})"
-        
-        # Bucket 2: The Heads/VPs (Strategic) - EXACT MATCHES ONLY
-        titles_t2 = [
-            'VP HR', 'Vice President Human Resources', 'Vice President of Human Resources',
-            'VP People', 'Vice President People',
-            'Head of People', 'Head of HR', 'Head of Human Resources',
-            'Director of Benefits', 'Director of Compensation and Benefits',
-            'Head of Total Rewards', 'VP Total Rewards'
-        ]
-        sql_tier_2 = f"SELECT * FROM person WHERE job_company_id = '{company_id}' AND job_title IN ({', '.join([repr(t) for t in titles_t2])})"
-        
-        # Bucket 3: The Managers (Tactical) - EXACT MATCHES ONLY
-        titles_t3 = [
-            'Benefits Manager', 'Manager of Benefits',
-            'Compensation and Benefits Manager',
-            'Human Resources Manager', 'HR Manager'
-        ]
-        sql_tier_3 = f"SELECT * FROM person WHERE job_company_id = '{company_id}' AND job_title IN ({', '.join([repr(t) for t in titles_t3])})"
+        if PERSON_SEARCH_MODE == "combined":
+            return self.search_person_combined(company_id, headers)
+        return self.search_person_tiers(company_id, headers, TITLE_TIERS)
 
-        waterfall = [
-            ("Tier 1 (Chiefs)", sql_tier_1),
-            ("Tier 2 (VPs/Directors)", sql_tier_2),
-            ("Tier 3 (Managers)", sql_tier_3)
-        ]
+    def search_person_combined(self, company_id, headers):
+        """
+        One search for every tier's titles, ranked locally by tier. When PDL has
+        more matches than it returned, the tiers above the best one returned are
+        re-checked with per-tier queries so the same tier still wins.
+        Costs up to COMBINED_SEARCH_SIZE credits (plus any fallback) vs. at most
+        1 for the tiered waterfall: trades credits for latency.
+        """
+        all_titles = [t for _, titles in TITLE_TIERS for t in titles]
+        params = {"sql": self.title_sql(company_id, all_titles), "size": COMBINED_SEARCH_SIZE, "pretty": False}
+        try:
+            resp = self.safe_request("GET", PDL_PERSON_URL, params=params, headers=headers, timeout=10)
+        except Exception as e:
+            print(f"      [Waterfall Error] {e}")
+            return self.search_person_tiers(company_id, headers, TITLE_TIERS)
+
+        last_status = resp.status_code
+        total_cost = float(resp.headers.get('X-Call-Credits-Spent', 0.0))
+        if resp.status_code == 429:
+            return None, "RATE_LIMIT", total_cost, last_status
+        if resp.status_code == 404:
+            return None, "NO_MATCH", total_cost, last_status  # No tier has anyone
+        if resp.status_code != 200:
+            person, tier, cost, last_status = self.search_person_tiers(company_id, headers, TITLE_TIERS)
+            return person, tier, total_cost + cost, last_status
+
+        data = resp.json()
+        people = data.get('data') or []
+        tier_of = {t.lower(): i for i, (_, titles) in enumerate(TITLE_TIERS) for t in titles}
+        best = None  # (tier index, person): first returned person of the best tier
+        for person in people:
+            i = tier_of.get((person.get('job_title') or "").lower())
+            if i is not None and (best is None or i < best[0]):
+                best = (i, person)
+
+        truncated = data.get('total', len(people)) > len(people)
+        if truncated:
+            # A better tier may sit beyond the returned page
+            better = TITLE_TIERS[:best[0]] if best else TITLE_TIERS
+            person, tier, cost, status = self.search_person_tiers(company_id, headers, better)
+            total_cost += cost
+            if person or tier == "RATE_LIMIT":
+                return person, tier, total_cost, status
 
+        if best:
+            return best[1], TITLE_TIERS[best[0]][0], total_cost, last_status
+        return None, "NO_MATCH", total_cost, last_status
+
+    def search_person_tiers(self, company_id, headers, tiers):
+        """
+        Executes a sequential waterfall, one search per tier.
+        Returns: (person_dict, tier_name, total_cost_credits, last_status_code)
+        """
         total_cost = 0.0
         last_status = "N/A"
 
-        for tier_name, sql in waterfall:
+        for tier_name, titles in tiers:
             # Added 'size' param back as per proven v4 configuration
-            params = {"sql": sql, "size": 1, "pretty": False}
+            params = {"sql": self.title_sql(company_id, titles), "size": 1, "pretty": False}
             try:
                 resp = self.safe_request("GET", PDL_PERSON_URL, params=params, headers=headers, timeout=10)
                 last_status = resp.status_code
@@ -206,7 +274,7 @@ class ScoutEngine:
             
             used = float(c_resp.headers.get('X-Call-Credits-Spent', 0.0))
             c_credits += used
-            self.total_credits_used += used # Update Global
+            self.spend(used) # Update Global
 
             if c_status == 429: result["Action"] = "ERROR_RATE_LIMIT"; result["Cost"] = c_credits; return result
             
@@ -217,7 +285,7 @@ class ScoutEngine:
                     c_resp = self.safe_request("GET", PDL_COMPANY_URL, params=params_relaxed, headers=headers, timeout=10)
                     used = float(c_resp.headers.get('X-Call-Credits-Spent', 0.0))
                     c_credits += used
-                    self.total_credits_used += used # Update Global
+                    self.spend(used) # Update Global
                     c_status = c_resp.status_code; result["Comp_Status"] = c_status
 
             if c_status == 200:
@@ -239,7 +307,7 @@ class ScoutEngine:
             person, tier, cost, p_status = self.search_person_waterfall(pdl_company_id, headers)
             
             p_credits = cost
-            self.total_credits_used += cost # Update Global with total waterfall cost
+            self.spend(cost) # Update Global with total waterfall cost
             result["Pers_Status"] = p_status
             
             if tier == "RATE_LIMIT":
@@ -261,22 +329,18 @@ class ScoutEngine:
         return result
 
     def run_batch(self, input_rows, output_file):
-        print(f"🚀 SCOUT ENGINE v7.4 (FINAL). Budget: {CREDITS_BUDGET_CAP}")
-        results = []
-        for raw_row in input_rows:
-            try:
-                res = self.process_row(raw_row)
-                results.append(res)
-                print(f"   [{res['Action']}] {res['Client']} -> {res['Reason']} ({res['Cost']} Credits)")
-            except Exception as e: print(f"   [CRITICAL] {e}")
-            time.sleep(2.0)
-        
+        print(f"🚀 SCOUT ENGINE v7.4 (FINAL). Budget: {CREDITS_BUDGET_CAP} | Workers: {BATCH_WORKERS}")
         keys = ["Client", "DOL_Lives", "DOL_Funding", "DOL_EIN", "DOL_PlanYear", "DOL_Address", "Lives_Source", "Funding_Source", 
                 "Enriched_Company", "PDL_ID", "Target_Name", "Target_Title", "Target_Email", "Target_LinkedIn", "Contact_Source",
                 "Action", "Reason", "Cost", "Comp_Status", "Pers_Status"]
-        
-        with open(output_file, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=keys); writer.writeheader(); writer.writerows(results)
+
+        # Rows stream to the CSV in input order as they finish (journaled, so a crash loses nothing)
+        runner = ConcurrentBatchRunner(
+            self.process_row, workers=BATCH_WORKERS,
+            on_result=lambda raw, res: print(f"   [{res['Action']}] {res['Client']} -> {res['Reason']} ({res['Cost']} Credits)"),
+            on_error=lambda raw, e: print(f"   [CRITICAL] {e}"))
+        with OrderedCsvWriter(output_file, keys) as writer:
+            runner.run(input_rows, writer)
         print(f"\n✅ BATCH COMPLETE. Output: {output_file}")
         print(f"📉 Total Credits Used: {self.total_credits_used}")
         print(f"🛡️ Rate Limit Hits: {self.rate_limit_hits}")
@@ -290,5 +354,6 @@ if __name__ == "__main__":
             if CANARY_LIMIT: 
                 print(f"🐤 CANARY MODE: Processing {CANARY_LIMIT} rows.")
                 rows = rows[:CANARY_LIMIT]
-            engine.run_batch(rows, f"scout_v7_final_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+            # An unfinished run of this input resumes from its journal; otherwise a new file
+            engine.run_batch(rows, resumable_output_path("dol_batch.csv", "scout_v7_final"))
     else: engine.run_batch(HOSTILE_ROWS, "hostile_v7_results.csv")
@@ -1,10 +1,13 @@
 import os
+import sys
 import requests
 import json
-import time
 from dotenv import load_dotenv
 from supabase import create_client
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.rate_limiter import send_with_limits
+
 # Load env vars
 load_dotenv()
 
@@ -38,7 +41,8 @@ def get_real_image_from_serper(name, firm):
     }
     
     try:
-        response = requests.post(serper_url, headers=headers, json=payload)
+        # Shared Serper bucket: runs at the safe rate, backs off on 429
+        response = send_with_limits("serper", lambda: requests.post(serper_url, headers=headers, json=payload))
         if response.status_code != 200:
             print(f"      ❌ Serper Error: {response.status_code}")
             return None
@@ -130,8 +134,6 @@ def main():
             updates += 1
         else:
             print("   ⏩ No strict match found. Keeping existing.")
-            
-        time.sleep(1)
 
     print(f"\n✅ Bulk Refinement Complete. Updated {updates} targets.")
 
@@ -9,6 +9,7 @@ from collections import defaultdict, Counter
 # Ensure src module is in path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 from scout.broker_hunter import BrokerHunter
+from utils.cassette import env_cassette
 
 # --- CONFIGURATION ---
 SERPER_API_KEY = os.getenv("SERPER_API_KEY")
@@ -277,4 +278,6 @@ if __name__ == "__main__":
         print('SAFETY LOCK: Set ALLOW_LEGACY_RUNS=1 to execute this legacy script.')
         sys.exit(0)
 
-    run()
+    # SCOUT_CASSETTE=<fixture> replays recorded upstream calls (offline benchmarks)
+    with env_cassette():
+        run()
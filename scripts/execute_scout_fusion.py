@@ -2,6 +2,7 @@ import pandas as pd
 import requests
 import json
 import os
+import sys
 import time
 import argparse
 import re
@@ -10,6 +11,9 @@ import glob
 from datetime import datetime
 from urllib.parse import urlparse
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.pdl import get_pdl_client, BULK_MAX_RECORDS
+
 # --- CONFIGURATION ---
 # Fail Fast on Missing Keys
 SERPER_API_KEY = os.getenv("SERPER_API_KEY")
@@ -249,49 +253,74 @@ class PDLClient:
         with open(self.cache_path, 'w') as f: json.dump(self.cache, f)
 
     def enrich(self, linkedin_url, expected_firm_key):
-        if self.call_count >= MAX_PDL_CALLS: return {'is_valid': False, 'status': "BUDGET_CAP"}
-        
-        # Hardened Cache Key (URL + Firm)
-        cache_key = f"{linkedin_url}|{expected_firm_key}"
-        if cache_key in self.cache: return self.cache[cache_key]
-
-        url = "https://api.peopledatalabs.com/v5/person/enrich"
-        params = {'profile': linkedin_url, 'pretty': True}
-        headers = {'X-Api-Key': PDL_API_KEY}
-
-        try:
-            self.call_count += 1
-            response = requests.get(url, headers=headers, params=params, timeout=API_TIMEOUT)
-            
-            if response.status_code == 200:
-                data = response.json().get('data', {})
-                email = data.get('work_email')
-                canonical_pdl = get_canonical_firm(data.get('job_company_name', ''))
-                
-                is_match = (canonical_pdl == expected_firm_key)
-                status = "PDL_MATCH_UNVERIFIED" if (email and is_match) else "MISMATCH_OR_NO_EMAIL"
-                
-                result = {
-                    'email': email,
-                    'title': data.get('job_title'),
-                    'name': data.get('full_name'),
-                    'is_valid': (email and is_match),
-                    'status': status
-                }
+        return self.enrich_many([(linkedin_url, expected_firm_key)])[0]
+
+    def enrich_many(self, pairs):
+        """
+        enrich() for a list of (linkedin_url, expected_firm_key): uncached profiles
+        go to PDL bulk enrichment (up to 100 per request) within the MAX_PDL_CALLS
+        budget. Results are returned in input order.
+        """
+        results = [None] * len(pairs)
+        misses = {}  # Hardened Cache Key (URL + Firm) -> input indexes
+        for i, (linkedin_url, expected_firm_key) in enumerate(pairs):
+            cache_key = f"{linkedin_url}|{expected_firm_key}"
+            if cache_key in self.cache:
+                results[i] = self.cache[cache_key]
             else:
-                result = {'is_valid': False, 'status': f"API_{response.status_code}"}
+                misses.setdefault(cache_key, []).append(i)
+        if not misses:
+            return results
 
-            self.cache[cache_key] = result
-            self._save_cache()
-            return result
+        keys = list(misses)
+        client = get_pdl_client()
+        sent_before = client.bulk_records
+        try:
+            responses = client.bulk_enrich(
+                [{'profile': pairs[misses[k][0]][0]} for k in keys],
+                max_records=MAX_PDL_CALLS - self.call_count)
         except Exception:
-            return {'is_valid': False, 'status': "ERROR"}
+            responses = ["ERROR"] * len(keys)
+        self.call_count += client.bulk_records - sent_before
+
+        for cache_key, response in zip(keys, responses):
+            if response is None:
+                result = {'is_valid': False, 'status': "BUDGET_CAP"}
+            elif response == "ERROR":
+                result = {'is_valid': False, 'status': "ERROR"}
+            else:
+                result = self._shape(*response, pairs[misses[cache_key][0]][1])
+                self.cache[cache_key] = result
+            for i in misses[cache_key]:
+                results[i] = result
+        self._save_cache()
+        return results
+
+    def _shape(self, status_code, body, expected_firm_key):
+        if status_code != 200:
+            return {'is_valid': False, 'status': f"API_{status_code}"}
+        data = body.get('data', {})
+        email = data.get('work_email')
+        canonical_pdl = get_canonical_firm(data.get('job_company_name', ''))
+
+        is_match = (canonical_pdl == expected_firm_key)
+        status = "PDL_MATCH_UNVERIFIED" if (email and is_match) else "MISMATCH_OR_NO_EMAIL"
+
+        return {
+            'email': email,
+            'title': data.get('job_title'),
+            'name': data.get('full_name'),
+            'is_valid': (email and is_match),
+            'status': status
+        }
 
 # --- MAIN ---
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--broker-id", required=True)
     parser.add_argument("--target-yield", type=int, default=50)
+    parser.add_argument("--pdl-batch", type=int, default=BULK_MAX_RECORDS,
+                        help="Profiles per bulk PDL pass; smaller spends fewer credits past the target yield")
     args = parser.parse_args()
 
     print(f"--- SCOUT v4 FUSION ENGINE ---")
@@ -364,71 +393,103 @@ def main():
     
     print(f"Starting Scout Loop [Broker: {args.broker_id}]...")
     
-    for sponsor, group in grouped:
-        if len(output_rows) >= args.target_yield: break
-        
-        # A. Client Suppression
-        if suppression.is_client(sponsor): continue
-
-        firm_key = group.iloc[0]['Canonical_Firm']
-        if firm_counts.get(firm_key, 0) >= MAX_CLIENTS_PER_FIRM: continue
-        
-        candidates = group.head(MAX_BROKERS_PER_CLIENT)
-        sponsor_yield = 0
-        
-        for _, row in candidates.iterrows():
-            if sponsor_yield >= MAX_BROKERS_PER_CLIENT: break
-            
-            broker_raw_name = row['SC_BROKER_RAW']
-            if pd.isna(broker_raw_name) or str(broker_raw_name).strip().lower() in ['unknown', 'nan', '']:
-                 continue # Skip bad data
+    sponsors = iter(grouped)
+    held = None  # sponsor deferred to the next window
+    while len(output_rows) < args.target_yield:
+        # Discovery for a window of sponsors, then one bulk PDL pass for all of them.
+        # Each profile yields at most one lead, so never enrich more than the shortfall.
+        limit = min(args.pdl_batch, args.target_yield - len(output_rows))
+        window = []
+        window_firms = {}
+        pending = 0
+        while pending < limit:
+            if held is not None:
+                (sponsor, group), held = held, None
+            else:
+                item = next(sponsors, None)
+                if item is None: break
+                sponsor, group = item
+
+            # A. Client Suppression
+            if suppression.is_client(sponsor): continue
+
+            firm_key = group.iloc[0]['Canonical_Firm']
+            if firm_counts.get(firm_key, 0) >= MAX_CLIENTS_PER_FIRM: continue
+            if firm_counts.get(firm_key, 0) + window_firms.get(firm_key, 0) >= MAX_CLIENTS_PER_FIRM:
+                # The firm may be capped by sponsors already in this window: decide after their results
+                held = (sponsor, group)
+                break
+
+            found = []
+            for _, row in group.head(MAX_BROKERS_PER_CLIENT).iterrows():
+                broker_raw_name = row['SC_BROKER_RAW']
+                if pd.isna(broker_raw_name) or str(broker_raw_name).strip().lower() in ['unknown', 'nan', '']:
+                     continue # Skip bad data
+
+                human_firm = row['PROVIDER_NAME_NORM']
+
+                # B. Serper (Discovery)
+                serper_res = serper.find_profile_url(broker_raw_name, human_firm)
+                if not serper_res['profile_found']: continue
+                found.append((row, serper_res, broker_raw_name))
+
+            window.append((sponsor, firm_key, found))
+            if found:
+                window_firms[firm_key] = window_firms.get(firm_key, 0) + 1
+            pending += len(found)
+        if not window: break
+
+        # D. PDL (Enrichment) -- bulk, in input order
+        pdl_results = iter(pdl.enrich_many([(res['url'], firm_key) for _, firm_key, found in window
+                                            for _, res, _ in found]))
+
+        for sponsor, firm_key, found in window:
+            sponsor_pdl = [next(pdl_results) for _ in found]
+            if len(output_rows) >= args.target_yield: break
+            if firm_counts.get(firm_key, 0) >= MAX_CLIENTS_PER_FIRM: continue
+            sponsor_yield = 0
+
+            for (row, serper_res, broker_raw_name), pdl_res in zip(found, sponsor_pdl):
+                if sponsor_yield >= MAX_BROKERS_PER_CLIENT: break
+
+                # C. ID Generation
+                lead_id = generate_lead_id(sponsor, firm_key, serper_res['url'])
+
+                if not pdl_res['is_valid']: continue
+
+                # E. DNC Check
+                if suppression.is_dnc(pdl_res['email']): continue
+
+                # F. Atomic Allocation
+                if not ledger.atomic_allocate(lead_id, args.broker_id, sponsor):
+                    continue
 
-            human_firm = row['PROVIDER_NAME_NORM']
-            
-            # B. Serper (Discovery)
-            serper_res = serper.find_profile_url(broker_raw_name, human_firm)
-            if not serper_res['profile_found']: continue
-            
-            # C. ID Generation
-            lead_id = generate_lead_id(sponsor, firm_key, serper_res['url'])
-            
-            # D. PDL (Enrichment)
-            pdl_res = pdl.enrich(serper_res['url'], firm_key)
-            if not pdl_res['is_valid']: continue
-            
-            # E. DNC Check
-            if suppression.is_dnc(pdl_res['email']): continue
+                # G. Success
+                lives = int(row['LIVES'])
+                plan_name = row.get('PLAN_NAME', 'Unknown Plan') 
+
+                out_row = {
+                    'Lead_ID': lead_id,
+                    'Broker_Allocation': args.broker_id,
+                    'Primary_Client': sponsor,
+                    'Plan_Name': plan_name,
+                    'Lives': lives,
+                    'Sales_Angle': "TPA Replacement" if lives > 500 else "Conversion Opportunity",
+                    'Target_Firm': firm_key,
+                    'Broker_Name': pdl_res['name'] or broker_raw_name,
+                    'Job_Title': pdl_res['title'],
+                    'Work_Email': pdl_res['email'],
+                    'Deliverability': "Test Required",
+                    'LinkedIn_URL': serper_res['url'],
+                    'Verification_Status': pdl_res['status'],
+                    'Data_Source': 'BenefitFlow'
+                }
+                output_rows.append(out_row)
+                sponsor_yield += 1
+                print(f"[+] Acquired: {out_row['Broker_Name']} @ {sponsor}")
 
-            # F. Atomic Allocation
-            if not ledger.atomic_allocate(lead_id, args.broker_id, sponsor):
-                continue
-            
-            # G. Success
-            lives = int(row['LIVES'])
-            plan_name = row.get('PLAN_NAME', 'Unknown Plan') 
-            
-            out_row = {
-                'Lead_ID': lead_id,
-                'Broker_Allocation': args.broker_id,
-                'Primary_Client': sponsor,
-                'Plan_Name': plan_name,
-                'Lives': lives,
-                'Sales_Angle': "TPA Replacement" if lives > 500 else "Conversion Opportunity",
-                'Target_Firm': firm_key,
-                'Broker_Name': pdl_res['name'] or broker_raw_name,
-                'Job_Title': pdl_res['title'],
-                'Work_Email': pdl_res['email'],
-                'Deliverability': "Test Required",
-                'LinkedIn_URL': serper_res['url'],
-                'Verification_Status': pdl_res['status'],
-                'Data_Source': 'BenefitFlow'
-            }
-            output_rows.append(out_row)
-            sponsor_yield += 1
-            print(f"[+] Acquired: {out_row['Broker_Name']} @ {sponsor}")
-            
-        if sponsor_yield > 0:
-            firm_counts[firm_key] = firm_counts.get(firm_key, 0) + 1
+            if sponsor_yield > 0:
+                firm_counts[firm_key] = firm_counts.get(firm_key, 0) + 1
 
     # 6. Save Output
     timestamp = datetime.now().strftime("%Y%m%d")
@@ -3,10 +3,13 @@ import pandas as pd
 import os
 import json
 import re
+import sys
 import time
-import requests
 from datetime import datetime
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.serper import SerperClient
+
 print("DEBUG: Imports Complete")
 
 # --- CONFIGURATION ---
@@ -40,6 +43,7 @@ def normalize_firm_name(text):
 class TerritoryResolver:
     def __init__(self):
         self.cache = self._load_cache()
+        self.serper = SerperClient(api_key=SERPER_API_KEY)
         self.serper_queries = 0
         self.pdl_lookups = 0
         self.stats = {"HITS": 0, "NEW": 0, "METHODS": {}}
@@ -60,13 +64,9 @@ class TerritoryResolver:
 
     def _serper_search(self, query):
         if not SERPER_API_KEY: return None
-        url = "https://google.serper.dev/search"
-        payload = json.dumps({"q": query})
-        headers = {'X-API-KEY': SERPER_API_KEY, 'Content-Type': 'application/json'}
         try:
             self.serper_queries += 1
-            response = requests.post(url, headers=headers, data=payload, timeout=10)
-            return response.json()
+            return self.serper.search(query)
         except: return None
 
     def _parse_serper_results(self, results):
@@ -205,7 +205,7 @@ def main():
     print(f"Firms Processed: {len(unique_firms)}")
     print(f"Cache Hits: {resolver.stats['HITS']}")
     print(f"New Resolutions: {resolver.stats['NEW']}")
-    print(f"Serper Queries: {resolver.serper_queries}")
+    print(f"Serper Queries: {resolver.serper_queries} ({resolver.serper.calls} billed, rest from response cache)")
     print("Methods:", resolver.stats['METHODS'])
     print(f"Saved to: {OUTPUT_CSV}")
 
@@ -2,6 +2,7 @@ import os
 import json
 import random
 from app.services.enrichment_service import EnrichmentService
+from utils.cassette import env_cassette
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
@@ -23,16 +24,14 @@ SEEDS = [
 def seed_db():
     print("🌱 Starting Seed Process (Real Humans, Mock Drafts)...")
     
-    for seed in SEEDS:
-        print(f"🔎 Enriching target for: {seed['company']}...")
-        
-        # 1. Real Identity Resolution
-        person = enrichment.find_person(
-            company_name=seed['company'],
-            location=seed['location'],
-            title_keywords=seed['titles']
-        )
-        
+    # 1. Real Identity Resolution (masked hits hydrated in one bulk call)
+    print(f"🔎 Enriching targets for: {', '.join(seed['company'] for seed in SEEDS)}...")
+    people = enrichment.find_people([
+        {"company_name": seed['company'], "location": seed['location'], "title_keywords": seed['titles']}
+        for seed in SEEDS
+    ])
+
+    for seed, person in zip(SEEDS, people):
         if not person.get('success'):
             print(f"⚠️ Failed to find person for {seed['company']}: {person.get('error')}")
             print(f"⚠️ Applying MOCK FALLBACK for {seed['company']}...")
@@ -117,4 +116,6 @@ def seed_db():
     print("🏁 Seed Complete.")
 
 if __name__ == "__main__":
-    seed_db()
+    # SCOUT_CASSETTE=<fixture> replays recorded upstream calls (offline benchmarks)
+    with env_cassette():
+        seed_db()
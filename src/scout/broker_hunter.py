@@ -1,12 +1,15 @@
 import re
 import requests
-import json
 import time
 import os
 import sys
 from urllib.parse import urlparse
 from collections import Counter
 
+# Repo root (shared utils)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from utils.serper import SerperClient, SerperOfflineMiss
+
 # --- CONSTANTS ---
 BIG_BROKERS = {
     "MARSH": "Marsh", "MERCER": "Mercer", "AON": "Aon", 
@@ -31,7 +34,6 @@ BROKER_DOMAINS = {
 FIRM_PATTERNS = r"([A-Z][\w&']+(?:\s[A-Z][\w&']+){0,2})\s(BENEFITS|CONSULTING|INSURANCE|RISK|BROKERAGE|ADVISORS)"
 
 # IMPORTS
-import json
 import os
 
 # STOPWORDS for "The Bouncer" - These are NOT brands.
@@ -58,6 +60,7 @@ class BrokerHunter:
         if not self.api_key:
             raise ValueError("SERPER_API_KEY is required")
         self.search_cache = {}
+        self.serper = SerperClient(api_key=serper_api_key)
 
     def clean_text(self, text): 
         return re.sub(r'\s+', ' ', text).strip().upper()
@@ -71,16 +74,12 @@ class BrokerHunter:
 
     def search_google(self, query):
         if query in self.search_cache: return self.search_cache[query]
-        url = "https://google.serper.dev/search"
-        payload = json.dumps({"q": query, "num": 10}) 
-        headers = {'X-API-KEY': self.api_key, 'Content-Type': 'application/json'}
-        retries = 3; backoff = 2
+        # 429 back-off happens in SerperClient (shared token bucket); only transport errors retry here
+        retries = 3
         for i in range(retries):
             try:
-                response = requests.request("POST", url, headers=headers, data=payload)
-                if response.status_code == 200:
-                    data = response.json(); self.search_cache[query] = data; return data
-                elif response.status_code == 429: time.sleep(backoff); backoff *= 2; continue
+                data = self.serper.search(query, num=10); self.search_cache[query] = data; return data
+            except (requests.HTTPError, SerperOfflineMiss): return {}
             except: time.sleep(1)
         return {}
 
@@ -0,0 +1,108 @@
+import sys
+import os
+import time
+import threading
+import unittest
+
+# Path Setup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+try:
+    import modules.attribution as attribution
+except ImportError:  # requests not installed
+    attribution = None
+
+
+class FakeSearch:
+    """search_google stand-in: per-query delay and result, records call order."""
+
+    def __init__(self, plan):
+        self.plan = plan  # substring of query -> (delay, organic items)
+        self.started = []
+        self.lock = threading.Lock()
+
+    def __call__(self, query, location="United States"):
+        for marker, (delay, organic) in self.plan.items():
+            if marker in query:
+                with self.lock:
+                    self.started.append(marker)
+                time.sleep(delay)
+                return {"organic": organic}
+        return {"organic": []}
+
+
+class FakeModel:
+    def __init__(self, search):
+        self.search = search
+        self.prompts = []
+
+    def generate_content(self, prompt):
+        self.prompts.append((prompt, time.perf_counter()))
+        return type("R", (), {"text": '{"best_match_name": "Jane Doe", "job_title": "Principal", '
+                                       '"specialty_evidence": "Self-Funded", "confidence_score": 85}'})()
+
+
+def hits(text, n=1):
+    return [{"title": f"{text} {i}", "snippet": text} for i in range(n)]
+
+
+@unittest.skipUnless(attribution, "requests not installed")
+class TestAttributionParallel(unittest.TestCase):
+
+    def setUp(self):
+        self.original = attribution.search_google
+
+    def tearDown(self):
+        attribution.search_google = self.original
+
+    def _engine(self, plan, model=False):
+        attribution.search_google = FakeSearch(plan)
+        engine = attribution.AttributionEngine.__new__(attribution.AttributionEngine)
+        engine.roster = []
+        engine.model = FakeModel(attribution.search_google) if model else None
+        return engine
+
+    def test_01_validation_priority_and_latency(self):
+        print("\n[TEST 1] Three Checks In Parallel, Site Still Wins...")
+        engine = self._engine({
+            "site:": (0.3, hits("Jane Doe Team")),
+            "license": (0.1, hits("active producer license")),
+            "after:": (0.3, []),
+        })
+        start = time.perf_counter()
+        ok, data = engine._validate_enhanced("Jane Doe", "Acme Benefits", "CA")
+        elapsed = time.perf_counter() - start
+        self.assertEqual((ok, data), (True, {'method': 'Firm_Website_Match'}))
+        self.assertLess(elapsed, 0.5)  # serial: 0.7s
+
+        engine = self._engine({"site:": (0.2, []), "license": (0.1, hits("active")), "after:": (1.0, [])})
+        start = time.perf_counter()
+        self.assertEqual(engine._validate_enhanced("Jane Doe", "Acme", "CA"), (True, {'method': 'License_Check_Match'}))
+        self.assertLess(time.perf_counter() - start, 0.5)  # press search not awaited
+        print("PASSED")
+
+    def test_02_gemini_starts_once_prompt_is_full(self):
+        print("\n[TEST 2] Gemini Starts Before The Slow LinkedIn Search...")
+        engine = self._engine({
+            "Stop Loss": (0.1, hits("Stop loss partner", 6)),
+            "Speaker": (0.1, hits("Self-Funded speaker", 6)),
+            "linkedin": (0.5, hits("Jane Doe - Principal")),
+        }, model=True)
+        start = time.perf_counter()
+        result = engine._triangulate_deep("Employer", "CA", "Acme", "Irvine")
+        self.assertEqual(result['name'], "Jane Doe")
+        prompt, called_at = engine.model.prompts[0]
+        self.assertLess(called_at - start, 0.3)  # LinkedIn search still in flight
+        self.assertIn("Self-Funded speaker 3", prompt)  # 6 + 4 = the 10 snippets a serial run sends
+        self.assertNotIn("Self-Funded speaker 4", prompt)
+
+        # No model: only the LinkedIn search is needed for the heuristic
+        engine = self._engine({"Stop Loss": (0, []), "Speaker": (0, []),
+                               "linkedin": (0, [{"title": "Jane Doe - Principal - Acme", "snippet": ""}])})
+        self.assertEqual(engine._triangulate_deep("Employer", "CA", "Acme", "Irvine")['method'], "Heuristic_Fallback")
+        self.assertEqual(attribution.search_google.started, ["linkedin"])
+        print("PASSED")
+
+
+if __name__ == "__main__":
+    unittest.main()
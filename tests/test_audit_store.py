@@ -0,0 +1,53 @@
+import sys
+import os
+import time
+import tempfile
+import unittest
+
+# Path Setup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.audit_store import AuditStore, row_fingerprint
+
+
+class TestAuditStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "audit.sqlite3")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_01_fingerprint_ignores_audit_annotations(self):
+        print("\n[TEST 1] Fingerprint Stable Across Audit Writes...")
+        base = row_fingerprint("Jane Doe", "Lockton", "https://linkedin.com/in/janedoe/", "Jane.Doe@lockton.com")
+        self.assertEqual(base, row_fingerprint(
+            "jane  doe", "Lockton ", "https://linkedin.com/in/janedoe",
+            "jane.doe@lockton.com\n⚠️ [NOT VERIFIED: Identity Mismatch]"))
+        self.assertNotEqual(base, row_fingerprint("Jane Doe", "Marsh", "https://linkedin.com/in/janedoe", "jane.doe@lockton.com"))
+        self.assertNotEqual(base, row_fingerprint("Jane Doe", "Lockton", "https://linkedin.com/in/janedoe", "[FOUND] jd@lockton.com"))
+        print("PASSED")
+
+    def test_02_only_new_changed_or_stale_rows_reaudited(self):
+        print("\n[TEST 2] 1,000 Row Sheet, 10 Edited...")
+        store = AuditStore("forensic", path=self.path)
+        rows = [row_fingerprint(f"Person {n}", "Firm", "", "") for n in range(1000)]
+        store.record_many([(fp, "VERIFIED") for fp in rows])
+
+        edited = rows[:990] + [row_fingerprint(f"Person {n}", "New Firm", "", "") for n in range(990, 1000)]
+        fresh = AuditStore("forensic", path=self.path).fresh_verdicts(edited)
+        self.assertEqual(sum(fp not in fresh for fp in edited), 10)
+
+        # Other audits keep their own verdicts
+        self.assertEqual(AuditStore("integrity", path=self.path).fresh_verdicts(rows), {})
+
+        # Past the re-verify age everything is due again
+        time.sleep(0.02)
+        stale = AuditStore("forensic", path=self.path, max_age_days=0.01 / 86400)
+        self.assertEqual(stale.fresh_verdicts(rows), {})
+        print("PASSED")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,385 @@
+import sys
+import os
+import time
+import random
+import threading
+import unittest
+import uuid
+
+# Path Setup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.jobs.baker import OvernightBaker
+from app.jobs.checkpoints import BakeCheckpointStore
+from utils.rate_limiter import get_limiter
+
+# Stubbed upstream latencies (seconds), scaled down 10x from production p50s:
+# Serper ~300ms, image HEAD ~150ms, Tavily+LLM judge ~1.5s, Gemini draft ~2s.
+LAT_IMAGE_VERIFY = 0.015
+LAT_SERPER = 0.03
+LAT_SIGNALS = 0.15
+LAT_EVENTS = 0.01
+LAT_DRAFT = 0.2
+SERIAL_PER_CANDIDATE = LAT_IMAGE_VERIFY + LAT_SERPER + LAT_SIGNALS + LAT_EVENTS + LAT_DRAFT
+
+
+class _Result:
+    def __init__(self, data=None, count=None):
+        self.data = data
+        self.count = count
+
+
+class _Query:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.op = "select"
+        self.payload = None
+        self.filters = []
+        self.head = False
+        self.window = None
+
+    def select(self, *_cols, count=None, head=False):
+        self.head = head
+        return self
+
+    def eq(self, col, val):
+        self.filters.append((col, lambda v, want=val: v == want))
+        return self
+
+    def in_(self, col, vals):
+        self.filters.append((col, lambda v, want=set(vals): v in want))
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end)
+        return self
+
+    def update(self, payload):
+        self.op, self.payload = "update", payload
+        return self
+
+    def insert(self, payload):
+        self.op, self.payload = "insert", payload
+        return self
+
+    def upsert(self, payload, on_conflict=""):
+        self.op, self.payload, self.keys = "upsert", payload, on_conflict.split(",")
+        return self
+
+    def execute(self):
+        with self.db.lock:
+            self.db.calls += 1
+            if self.op != "select":
+                self.db.writes[self.table] = self.db.writes.get(self.table, 0) + 1
+                if self.db.fail_writes.get(self.table, 0) > 0:
+                    self.db.fail_writes[self.table] -= 1
+                    raise RuntimeError(f"{self.table}: 503 Service Unavailable")
+            rows = self.db.tables.setdefault(self.table, [])
+            match = [r for r in rows if all(test(r.get(c)) for c, test in self.filters)]
+            payloads = self.payload if isinstance(self.payload, list) else [self.payload]
+            if self.op == "upsert":
+                for payload in payloads:
+                    existing = next((r for r in rows if all(r.get(k) == payload.get(k) for k in self.keys)), None)
+                    if existing is not None:
+                        existing.update(payload)
+                    else:
+                        rows.append(dict(payload))
+                return _Result(payloads)
+            if self.op == "insert":
+                rows.extend(dict(p) for p in payloads)
+                return _Result(payloads)
+            if self.op == "update":
+                for r in match:
+                    r.update(self.payload)
+                return _Result(match)
+            if self.head:
+                return _Result(None, len(match))
+            if self.window:
+                match = match[self.window[0]:self.window[1] + 1]
+            self.db.rows_returned += len(match)
+            return _Result([dict(r) for r in match], len(match))
+
+
+class _Rpc:
+    def __init__(self, db, fn, params):
+        self.db, self.fn, self.params = db, fn, params
+
+    def execute(self):
+        if self.fn == "sample_pool_candidates":
+            return self._sample()
+        # bake_flush_<table>(p_rows): bulk UPDATE ... FROM jsonb_to_recordset (migration 017)
+        table = self.fn.replace("bake_flush_", "")
+        with self.db.lock:
+            self.db.calls += 1
+            self.db.writes[table] = self.db.writes.get(table, 0) + 1
+            if self.db.fail_writes.get(table, 0) > 0:
+                self.db.fail_writes[table] -= 1
+                raise RuntimeError(f"{table}: 503 Service Unavailable")
+            by_id = {r["id"]: r for r in self.params["p_rows"]}
+            for row in self.db.tables.get(table, []):
+                if row.get("id") in by_id:
+                    row.update(by_id[row["id"]])
+            return _Result(len(by_id))
+
+    def _sample(self):
+        # Same contract as migration 018: random order, firm cap incl. p_firm_counts, exact size
+        p = self.params
+        if self.db.sampling_disabled:
+            raise RuntimeError("function sample_pool_candidates does not exist")
+        with self.db.lock:
+            self.db.calls += 1
+            exclude = set(p["p_exclude_ids"])
+            pool = [r for r in self.db.tables.get("candidates", [])
+                    if r["status"] == "POOL" and r["id"] not in exclude and not r.get("last_attempted_at")]
+            random.shuffle(pool)
+            counts, picked = dict(p["p_firm_counts"]), []
+            for row in pool:
+                if len(picked) >= p["p_needed"]:
+                    break
+                if counts.get(row["firm"], 0) >= p["p_max_per_firm"]:
+                    continue
+                counts[row["firm"]] = counts.get(row["firm"], 0) + 1
+                row["last_attempted_at"] = "now"
+                picked.append(dict(row))
+            self.db.rows_returned += len(picked)
+            return _Result(picked)
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.tables = {}
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.writes = {}       # table -> write round trips
+        self.fail_writes = {}  # table -> number of upcoming writes to fail
+        self.sampling_disabled = False
+        self.rows_returned = 0
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def rpc(self, fn, params):
+        return _Rpc(self, fn, params)
+
+
+class StubImageProxy:
+    def verify_accessibility(self, url):
+        time.sleep(LAT_IMAGE_VERIFY)
+        return True
+
+    def fetch_image(self, name, company, linkedin_url=None):
+        time.sleep(LAT_SERPER)
+        return {"imageUrl": f"https://media.licdn.com/{uuid.uuid4().hex}.jpg"}
+
+
+class StubLiveness:
+    def __init__(self):
+        self.checked = []
+
+    def check_status(self, cand):
+        time.sleep(LAT_SERPER)
+        self.checked.append(cand["id"])
+        blocked = cand["full_name"].endswith("Gone")
+        return {"is_departure": blocked, "risk_reason": "Departure Detected" if blocked else None}
+
+
+class StubSignals:
+    def scan_and_analyze(self, firm):
+        time.sleep(LAT_SIGNALS)
+        return [{"signal_type": "M&A", "title": f"{firm} acquires rival", "analysis": "Growth."}]
+
+
+class StubEvents:
+    def check_events(self, cand):
+        time.sleep(LAT_EVENTS)
+        return []
+
+
+class StubGhostwriter:
+    def __init__(self, crash=False):
+        self.crash = crash
+
+    def generate_draft(self, cand, context=None):
+        time.sleep(LAT_DRAFT)
+        if self.crash:
+            raise RuntimeError("Gemini 503")
+        return f"Subject: Hello {cand['full_name']}\n\nBody for {cand['firm']}"
+
+
+def _seed_pool(db, n_firms=40, per_firm=4):
+    for f in range(n_firms):
+        for p in range(per_firm):
+            name = f"Person {f}-{p}" + (" Gone" if p == 3 else "")
+            db.tables.setdefault("candidates", []).append({
+                "id": str(uuid.uuid4()), "status": "POOL", "full_name": name,
+                "firm": f"Firm {f}", "email": f"p{f}{p}@firm{f}.com",
+                "linkedin_image_url": "https://media.licdn.com/existing.jpg",
+            })
+    # A few invalid rows that must be marked FAILED and never baked
+    for i in range(5):
+        db.tables["candidates"].append({"id": str(uuid.uuid4()), "status": "POOL", "full_name": f"No Email {i}", "firm": "Firm X"})
+
+
+def _make_baker(db, ghostwriter=None, liveness=None, **kwargs):
+    return OvernightBaker(
+        db=db, ghostwriter=ghostwriter or StubGhostwriter(), image_proxy=StubImageProxy(),
+        signals_engine=StubSignals(), event_scout=StubEvents(), liveness_checker=liveness or StubLiveness(),
+        target_total=50, batch_size=10, max_per_firm=2,
+        flush_backoff=0, **kwargs
+    )
+
+
+class TestBakerPipeline(unittest.TestCase):
+
+    def setUp(self):
+        # Unthrottled for the test; the buckets are process-wide, so put them back after
+        self.saved_limits = {}
+        for name in ("serper", "tavily", "gemini"):
+            bucket = get_limiter(name)
+            self.saved_limits[name] = (bucket.rate, bucket.burst)
+            get_limiter(name, rate=0)
+
+    def tearDown(self):
+        for name, (rate, burst) in self.saved_limits.items():
+            get_limiter(name, rate=rate, burst=burst)
+
+    def test_01_exact_target_and_firm_cap(self):
+        print("\n[TEST 1] Exact Target + Firm Diversity Cap...")
+        db = FakeSupabase()
+        _seed_pool(db)
+
+        total = _make_baker(db).run("2026-01-20")
+
+        queue = db.tables["morning_briefing_queue"]
+        self.assertEqual(total, 50)
+        self.assertEqual(len(queue), 50)
+
+        firm_of = {c["id"]: c["firm"] for c in db.tables["candidates"]}
+        per_firm = {}
+        for row in queue:
+            per_firm[firm_of[row["candidate_id"]]] = per_firm.get(firm_of[row["candidate_id"]], 0) + 1
+        self.assertLessEqual(max(per_firm.values()), 2)
+
+        # Batches 1..5, 10 each
+        batches = sorted(r["priority_score"] for r in queue)
+        self.assertEqual(batches, [b for b in range(1, 6) for _ in range(10)])
+        print("PASSED")
+
+    def test_02_wall_clock_vs_serial(self):
+        print("\n[TEST 2] Wall Clock (50 candidates, stubbed latencies)...")
+        db = FakeSupabase()
+        _seed_pool(db)
+
+        start = time.monotonic()
+        total = _make_baker(db).run("2026-01-20")
+        elapsed = time.monotonic() - start
+
+        serial_estimate = 50 * SERIAL_PER_CANDIDATE
+        print(f"   concurrent={elapsed:.2f}s  serial_estimate={serial_estimate:.2f}s")
+        self.assertEqual(total, 50)
+        self.assertLess(elapsed, serial_estimate * 0.25)
+        print("PASSED")
+
+    def test_03_resume_tops_up_partial_queue(self):
+        print("\n[TEST 3] Partial Queue Top-Up...")
+        db = FakeSupabase()
+        _seed_pool(db)
+        db.tables["morning_briefing_queue"] = [{"candidate_id": "x", "selected_for_date": "2026-01-20"}] * 45
+
+        total = _make_baker(db).run("2026-01-20")
+        self.assertEqual(total, 50)
+        self.assertEqual(len(db.tables["morning_briefing_queue"]), 50)
+        print("PASSED")
+
+    def test_04_crash_resume_reuses_checkpoints(self):
+        print("\n[TEST 4] Crash + Resume (no repeated paid calls)...")
+        db = FakeSupabase()
+        _seed_pool(db)
+
+        # Run 1: drafting dies after image/liveness/intel were paid for
+        # (only liveness-blocked candidates, which skip drafting, make it in)
+        first_liveness = StubLiveness()
+        first_total = _make_baker(db, ghostwriter=StubGhostwriter(crash=True), liveness=first_liveness,
+                                  page_size=20, max_attempts=1).run("2026-01-20")
+        self.assertLess(first_total, 20)
+        self.assertTrue(first_liveness.checked)
+
+        # Run 2: resumes those candidates first, without re-checking them
+        second_liveness = StubLiveness()
+        total = _make_baker(db, liveness=second_liveness).run("2026-01-20")
+        self.assertEqual(total, 50)
+        self.assertFalse(set(first_liveness.checked) & set(second_liveness.checked))
+
+        queued = {r["candidate_id"] for r in db.tables["morning_briefing_queue"]}
+        self.assertTrue(set(first_liveness.checked) & queued)
+        self.assertTrue(all(r["committed"] for r in db.tables["draft_prep_checkpoints"] if r["candidate_id"] in queued))
+        print("PASSED")
+
+    def test_05_batched_writes(self):
+        print("\n[TEST 5] One Bulk Write per Table per Batch...")
+        db = FakeSupabase()
+        _seed_pool(db)
+
+        total = _make_baker(db).run("2026-01-20")
+        self.assertEqual(total, 50)
+
+        # 5 batches -> 5 writes per table (was 50 per table)
+        for table in ("morning_briefing_queue", "candidates", "target_brokers", "candidate_signals"):
+            self.assertLessEqual(db.writes.get(table, 0), 6, table)
+        queued = {r["candidate_id"] for r in db.tables["morning_briefing_queue"]}
+        self.assertEqual(queued, {c["id"] for c in db.tables["candidates"] if c["status"] == "QUEUED"})
+        print("PASSED")
+
+    def test_06_queue_flush_failure_leaves_pool(self):
+        print("\n[TEST 6] Failed Queue Flush (batch stays in POOL, run tops up)...")
+        db = FakeSupabase()
+        _seed_pool(db)
+        db.fail_writes["morning_briefing_queue"] = 3  # first flush exhausts its retries
+
+        total = _make_baker(db).run("2026-01-20")
+        self.assertEqual(total, 50)
+        self.assertEqual(len(db.tables["morning_briefing_queue"]), 50)
+
+        # No candidate is QUEUED without a queue row
+        queued = {r["candidate_id"] for r in db.tables["morning_briefing_queue"]}
+        self.assertEqual(queued, {c["id"] for c in db.tables["candidates"] if c["status"] == "QUEUED"})
+        # The failed batch is still open for the next run's resume
+        store = BakeCheckpointStore(db, "2026-01-20")
+        store.load()
+        open_ids = set(store.open_candidate_ids())
+        self.assertTrue(open_ids)
+        self.assertFalse(open_ids & queued)
+        print("PASSED")
+
+    def test_07_server_side_sampling(self):
+        print("\n[TEST 7] Server-Side Sampling vs Offset Scan (rows read)...")
+        rows_read = {}
+        for mode in ("sampled", "offset"):
+            db = FakeSupabase()
+            _seed_pool(db, n_firms=200)
+            db.sampling_disabled = mode == "offset"
+            self.assertEqual(_make_baker(db).run("2026-01-20"), 50)
+            rows_read[mode] = db.rows_returned
+
+            per_firm = {}
+            firm_of = {c["id"]: c["firm"] for c in db.tables["candidates"]}
+            for row in db.tables["morning_briefing_queue"]:
+                per_firm[firm_of[row["candidate_id"]]] = per_firm.get(firm_of[row["candidate_id"]], 0) + 1
+            self.assertLessEqual(max(per_firm.values()), 2)
+
+        print(f"   rows read: sampled={rows_read['sampled']}  offset={rows_read['offset']}")
+        self.assertLess(rows_read["sampled"], rows_read["offset"] / 2)
+        print("PASSED")
+
+
+    def test_08_baker_leaves_shared_rates_alone(self):
+        print("\n[TEST 8] Building A Baker Does Not Reconfigure Process-Wide Buckets...")
+        get_limiter("serper", rate=3.0, burst=3)
+        baker = _make_baker(FakeSupabase())
+        self.assertIs(baker.limiters["serper"], get_limiter("serper"))
+        self.assertEqual((get_limiter("serper").rate, get_limiter("gemini").rate), (3.0, 0.0))
+        print("PASSED")
+
+if __name__ == "__main__":
+    unittest.main()
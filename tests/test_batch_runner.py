@@ -0,0 +1,144 @@
+import sys
+import os
+import csv
+import time
+import tempfile
+import unittest
+
+# Path Setup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.batch_runner import ConcurrentBatchRunner, OrderedCsvWriter, resumable_output_path
+
+
+def read_rows(path):
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+class TestBatchRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.out = os.path.join(self.tmp.name, "out.csv")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_01_concurrent_rows_written_in_order(self):
+        print("\n[TEST 1] 12 Rows, 4 Workers, Out-Of-Order Completion...")
+
+        def process(item):
+            time.sleep(0.05 * (item % 3))
+            if item == 5:
+                raise ValueError("bad row")
+            return {"Client": f"c{item}", "Cost": item}
+
+        errors = []
+        start = time.perf_counter()
+        with OrderedCsvWriter(self.out, ["Client", "Cost"]) as writer:
+            results = ConcurrentBatchRunner(process, workers=4, on_error=lambda i, e: errors.append(i)).run(list(range(12)), writer)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual([r["Client"] for r in read_rows(self.out)], [f"c{i}" for i in range(12) if i != 5])
+        self.assertIsNone(results[5])
+        self.assertEqual(errors, [5])
+        self.assertLess(elapsed, 0.45)  # serial: 0.55s
+        print(f"   {elapsed:.2f}s")
+
+        # The failed row is not journaled: resuming retries only it
+        self.assertTrue(os.path.exists(self.out + ".journal"))
+        calls = []
+        with OrderedCsvWriter(self.out, ["Client", "Cost"]) as writer:
+            ConcurrentBatchRunner(lambda i: calls.append(i) or {"Client": f"c{i}", "Cost": i}, workers=4).run(list(range(12)), writer)
+        self.assertEqual(calls, [5])
+        self.assertEqual([r["Client"] for r in read_rows(self.out)], [f"c{i}" for i in range(12)])
+        self.assertFalse(os.path.exists(self.out + ".journal"))
+        print("PASSED")
+
+    def test_02_crash_resumes_from_journal(self):
+        print("\n[TEST 2] Crash Mid-Batch -> Resume Runs Only Missing Rows...")
+        calls = []
+
+        def crashing(item):
+            calls.append(item)
+            if item == 1:
+                time.sleep(0.1)
+                raise KeyboardInterrupt  # not an Exception: aborts the run
+            return {"Client": f"c{item}"}
+
+        writer = OrderedCsvWriter(self.out, ["Client"])
+        with self.assertRaises(KeyboardInterrupt):
+            ConcurrentBatchRunner(crashing, workers=3).run(list(range(3)), writer)
+        writer.close()  # row 2 finished behind the unfinished row 1: written past the gap
+        self.assertTrue(os.path.exists(self.out + ".journal"))
+        self.assertEqual([r["Client"] for r in read_rows(self.out)], ["c0", "c2"])
+
+        calls.clear()
+        with OrderedCsvWriter(self.out, ["Client"]) as writer:
+            self.assertEqual(sorted(writer.completed), [0, 2])
+            ConcurrentBatchRunner(lambda i: calls.append(i) or {"Client": f"c{i}"}, workers=3).run(list(range(4)), writer)
+        self.assertEqual(calls, [1, 3])
+        self.assertEqual([r["Client"] for r in read_rows(self.out)], ["c0", "c1", "c2", "c3"])
+        print("PASSED")
+
+    def test_03_output_path_resumes_only_unfinished_runs(self):
+        print("\n[TEST 3] Unfinished Run Resumed, Finished Output Never Overwritten...")
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        try:
+            with open("dol_batch.csv", "w") as f:
+                f.write("Client\nAcme\n")
+            first = resumable_output_path("dol_batch.csv", "scout_v7_final")
+            self.assertTrue(first.startswith("scout_v7_final_dol_batch_") and first.endswith(".csv"))
+
+            writer = OrderedCsvWriter(first, ["Client"])
+            writer.skip(0, failed=True)
+            writer.close()  # unfinished: journal kept
+            self.assertEqual(resumable_output_path("dol_batch.csv", "scout_v7_final"), first)
+
+            with OrderedCsvWriter(first, ["Client"]) as writer:
+                writer.add(0, {"Client": "Acme"})
+            time.sleep(1.1)  # timestamped names have one-second resolution
+            second = resumable_output_path("dol_batch.csv", "scout_v7_final")
+            self.assertNotEqual(second, first)
+            self.assertTrue(second.startswith(first[:-len("_YYYYmmdd_HHMMSS.csv")]))
+
+            with open("dol_batch.csv", "a") as f:
+                f.write("Beta\n")
+            self.assertFalse(resumable_output_path("dol_batch.csv", "scout_v7_final")
+                             .startswith(first[:-len("_YYYYmmdd_HHMMSS.csv")]))
+        finally:
+            os.chdir(cwd)
+        print("PASSED")
+
+    def test_04_failed_row_does_not_stall_stream(self):
+        print("\n[TEST 4] Failed Row: Later Rows Stream, Resume Retries It...")
+        seen = {}
+
+        def process(item):
+            if item == 2:
+                raise ConnectionError("PDL timeout")
+            return {"Client": f"c{item}"}
+
+        def on_result(item, row):
+            if item == 5:  # one worker: everything before it has finished
+                seen["mid_run"] = [r["Client"] for r in read_rows(self.out)]
+
+        with OrderedCsvWriter(self.out, ["Client"]) as writer:
+            ConcurrentBatchRunner(process, workers=1, on_result=on_result).run(list(range(6)), writer)
+            self.assertEqual(writer.failed, {2})
+        self.assertEqual(seen["mid_run"], ["c0", "c1", "c3", "c4", "c5"])
+        self.assertTrue(os.path.exists(self.out + ".journal"))
+
+        calls = []
+        with OrderedCsvWriter(self.out, ["Client"]) as writer:
+            self.assertNotIn(2, writer.completed)
+            ConcurrentBatchRunner(lambda i: calls.append(i) or {"Client": f"c{i}"}, workers=2).run(list(range(6)), writer)
+        self.assertEqual(calls, [2])
+        self.assertEqual([r["Client"] for r in read_rows(self.out)], [f"c{i}" for i in range(6)])
+        self.assertFalse(os.path.exists(self.out + ".journal"))
+        print("PASSED")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+import sys
+import os
+import json
+import time
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from concurrent.futures import ThreadPoolExecutor
+
+# Path Setup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from unittest import mock
+from utils.cassette import Cassette, CassetteMiss, env_cassette, wrap_gemini
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+
+class _Upstream(BaseHTTPRequestHandler):
+    hits = 0
+
+    def do_POST(self):
+        _Upstream.hits += 1
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        payload = json.dumps({"organic": [{"title": f"{body['q']} - LinkedIn"}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestCassette(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "fixtures", "recon.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_01_record_then_replay(self):
+        print("\n[TEST 1] Record Once, Replay Offline...")
+        upstream = []
+
+        def pdl_lookup(name, api_key=None):
+            upstream.append(name)
+            return {"name": name, "title": "Benefits Consultant"}
+
+        recorder = Cassette(self.path, mode="record")
+        lookup = recorder.wrap("pdl", pdl_lookup)
+        lookup("Jane Doe", api_key="secret")
+        lookup("John Roe", api_key="secret")
+        recorder.save()
+        self.assertNotIn("secret", open(self.path).read())
+
+        player = Cassette(self.path, mode="replay")
+        lookup = player.wrap("pdl", pdl_lookup)
+        self.assertEqual(lookup("Jane Doe", api_key="other-key")["title"], "Benefits Consultant")
+        self.assertEqual(upstream, ["Jane Doe", "John Roe"])  # nothing new went upstream
+        with self.assertRaises(CassetteMiss):
+            lookup("Nobody")
+        self.assertEqual((player.stats["replayed"], player.stats["misses"]), (1, 1))
+        print("PASSED")
+
+    def test_02_latency_makes_concurrency_measurable(self):
+        print("\n[TEST 2] Injected Latency + Deterministic Jitter...")
+        recorder = Cassette(self.path, mode="record")
+        search = recorder.wrap("serper", lambda q: {"q": q})
+        for i in range(8):
+            search(f"firm {i}")
+        recorder.save()
+
+        def run(workers):
+            player = Cassette(self.path, mode="replay", latency={"serper": 0.1}, jitter=0.02, seed=7)
+            search = player.wrap("serper", lambda q: None)
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(search, [f"firm {i}" for i in range(8)]))
+            return time.perf_counter() - start, player.stats["by_source"]["serper"]
+
+        serial, calls = run(1)
+        parallel, _ = run(8)
+        print(f"   serial {serial:.2f}s, 8 workers {parallel:.2f}s")
+        self.assertEqual(calls, 8)
+        self.assertGreater(serial, 0.6)
+        self.assertLess(parallel, serial / 3)
+        print("PASSED")
+
+    def test_03_gemini_model(self):
+        print("\n[TEST 3] Gemini Model Wrapper...")
+
+        class FakeModel:
+            calls = 0
+
+            def generate_content(self, prompt):
+                FakeModel.calls += 1
+                return type("R", (), {"text": f"draft for {prompt}"})()
+
+        recorder = Cassette(self.path, mode="auto")
+        model = recorder.wrap_model(FakeModel())
+        model.generate_content("Jane")
+        self.assertEqual(model.generate_content("Jane").text, "draft for Jane")
+        self.assertEqual(FakeModel.calls, 1)  # auto mode replays the second call
+        print("PASSED")
+
+    @unittest.skipUnless(requests, "requests not installed")
+    def test_04_http_transport(self):
+        print("\n[TEST 4] requests Sessions Replay Through Cassette...")
+        server = HTTPServer(("127.0.0.1", 0), _Upstream)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}/search"
+        try:
+            with Cassette(self.path, mode="record").activate():
+                requests.post(url, json={"q": "jane doe", "api_key": "k1"})
+            with Cassette(self.path, mode="replay").activate() as player:
+                session = requests.Session()
+                r = session.post(url, json={"api_key": "k2", "q": "jane doe"})
+                self.assertEqual(r.json()["organic"][0]["title"], "jane doe - LinkedIn")
+                with self.assertRaises(requests.ConnectionError):
+                    session.post(url, json={"q": "unrecorded"})
+            self.assertEqual(_Upstream.hits, 1)
+            self.assertEqual(player.stats["replayed"], 1)
+        finally:
+            server.shutdown()
+        print("PASSED")
+
+    def test_05_env_cassette_entry_point(self):
+        print("\n[TEST 5] SCOUT_CASSETTE Wraps Gemini Only Inside env_cassette()...")
+
+        class FakeModel:
+            calls = 0
+
+            def generate_content(self, prompt):
+                FakeModel.calls += 1
+                return type("R", (), {"text": f"intel on {prompt}"})()
+
+        raw = FakeModel()
+        with mock.patch.dict(os.environ, {"SCOUT_CASSETTE": ""}):
+            with env_cassette() as cassette:
+                self.assertIsNone(cassette)
+                self.assertIs(wrap_gemini(raw), raw)
+
+        with mock.patch.dict(os.environ, {"SCOUT_CASSETTE": self.path, "SCOUT_CASSETTE_MODE": "record"}):
+            with env_cassette():
+                wrap_gemini(raw).generate_content("Acme")
+        self.assertIs(wrap_gemini(raw), raw)
+        self.assertTrue(os.path.exists(self.path))
+
+        with mock.patch.dict(os.environ, {"SCOUT_CASSETTE": self.path, "SCOUT_CASSETTE_MODE": "replay"}):
+            with env_cassette() as player:
+                self.assertEqual(wrap_gemini(raw).generate_content("Acme").text, "intel on Acme")
+        self.assertEqual((FakeModel.calls, player.stats["replayed"]), (1, 1))
+        print("PASSED")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import sys
+import os
+import json
+import time
+import tempfile
+import unittest
+import multiprocessing
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+
+# Path Setup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import requests
+from modules.circuit_breaker import CircuitBreaker
+from utils.response_cache import ResponseCache
+from utils.serper import SerperClient
+
+
+class _FakeSession:
+    """Replays the given outcomes: an int is a status code, an exception is raised."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        response = requests.Response()
+        response.status_code = outcome
+        response._content = b'{"organic": []}'
+        return response
+
+
+def _charge(path, n):
+    breaker = CircuitBreaker(path=path, legacy_file=None)
+    for _ in range(n):
+        breaker.track_cost(0.001, "serper")
+
+
+def _reserve(path, n, results):
+    breaker = CircuitBreaker(path=path, legacy_file=None, monthly_hard_cap=0.05)
+    results.put(sum(breaker.reserve(0.001, "serper") for _ in range(n)))
+
+
+class TestCostLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cost_ledger.sqlite3")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_01_concurrent_threads_lose_nothing(self):
+        print("\n[TEST 1] 8 Threads x 500 Charges...")
+        breaker = CircuitBreaker(path=self.path, legacy_file=None)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: [breaker.track_cost(0.001, "serper") for _ in range(500)], range(8)))
+        per_call_ms = (time.perf_counter() - start) / 4000 * 1000
+        print(f"   {per_call_ms:.3f} ms per charge")
+
+        self.assertAlmostEqual(breaker.get_daily_spend(), 4.0)
+        today = breaker.rollup()[str(date.today())]
+        self.assertEqual(today["serper"]["calls"], 4000)
+        self.assertLess(per_call_ms, 5.0)
+        print("PASSED")
+
+    def test_02_concurrent_processes_lose_nothing(self):
+        print("\n[TEST 2] 4 Processes x 250 Charges...")
+        procs = [multiprocessing.Process(target=_charge, args=(self.path, 250)) for _ in range(4)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        breaker = CircuitBreaker(path=self.path, legacy_file=None)
+        self.assertAlmostEqual(breaker.get_monthly_spend(), 1.0)
+        self.assertEqual(breaker.rollup()[str(date.today())]["serper"]["calls"], 1000)
+        print("PASSED")
+
+    def test_03_hard_cap_holds_across_processes(self):
+        print("\n[TEST 3] Budget Enforced Across Processes...")
+        results = multiprocessing.Queue()
+        procs = [multiprocessing.Process(target=_reserve, args=(self.path, 30, results)) for _ in range(3)]
+        for p in procs:
+            p.start()
+        granted = sum(results.get() for _ in procs)
+        for p in procs:
+            p.join()
+        # $0.05 cap at $0.001 per call: exactly 50 of the 90 attempts get through
+        self.assertEqual(granted, 50)
+        self.assertAlmostEqual(CircuitBreaker(path=self.path, legacy_file=None).get_monthly_spend(), 0.05)
+        print("PASSED")
+
+    def test_04_legacy_json_imported_once(self):
+        print("\n[TEST 4] cost_tracker.json Migration...")
+        legacy = os.path.join(self.tmp.name, "cost_tracker.json")
+        today = str(date.today())
+        with open(legacy, "w") as f:
+            json.dump({"daily": {today: 1.25}, "monthly": {today[:7]: 1.25}}, f)
+
+        breaker = CircuitBreaker(path=self.path, legacy_file=legacy)
+        breaker.track_cost(0.25)
+        self.assertAlmostEqual(breaker.get_daily_spend(), 1.5)
+        self.assertFalse(os.path.exists(legacy))
+        self.assertTrue(os.path.exists(legacy + ".migrated"))
+
+        # A second instance does not import again
+        self.assertAlmostEqual(CircuitBreaker(path=self.path, legacy_file=legacy).get_daily_spend(), 1.5)
+        print("PASSED")
+
+    def test_05_unbilled_calls_refunded(self):
+        print("\n[TEST 5] Failed Serper Calls Give Their Reservation Back...")
+        breaker = CircuitBreaker(path=self.path, legacy_file=None)
+        client = SerperClient(api_key="k", cache=ResponseCache(":memory:"), offline=False,
+                              cost_tracker=breaker.reserve, cost_refund=breaker.refund)
+        client.session = _FakeSession([500, requests.ConnectionError("reset"), 400, 200])
+        for q in ("a", "b", "c"):
+            with self.assertRaises(requests.RequestException):
+                client.search(q)
+        self.assertEqual(client.search("d"), {"organic": []})
+
+        # Only network errors, 429s and 5xx are refunded; the 400 and the success stay charged
+        self.assertAlmostEqual(breaker.get_daily_spend(), 0.002)
+        self.assertEqual(breaker.rollup()[str(date.today())]["serper"]["calls"], 2)
+        breaker.refund(1.0, "serper")
+        self.assertEqual(breaker.get_daily_spend(), 0.0)  # never below zero
+        print("PASSED")
+
+
+if __name__ == "__main__":
+    unittest.main()
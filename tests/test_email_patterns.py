@@ -0,0 +1,64 @@
+import sys
+import os
+import tempfile
+import unittest
+
+# Path Setup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.email_patterns import DomainPatternStore, infer, render
+
+
+class TestDomainPatterns(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = DomainPatternStore(os.path.join(self.tmp.name, "patterns.sqlite3"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_01_infer_and_render(self):
+        print("\n[TEST 1] Pattern Inference...")
+        self.assertEqual(infer("jdoe@lockton.com", "Jane", "Doe"), "flast")
+        self.assertEqual(infer("Jane.Doe@lockton.com", "Jane", "Doe"), "first.last")
+        self.assertEqual(infer("mary.o'neil@x.com", "Mary", "O'Neil"), None)
+        self.assertEqual(render("f.last", "Mary", "O'Neil"), "m.oneil")
+        self.assertIsNone(render("flast", "", "Doe"))
+        print("PASSED")
+
+    def test_02_learned_pattern_tried_first(self):
+        print("\n[TEST 2] Second Lead At A Known Firm...")
+        default = ["first.last", "flast", "firstlast", "first_last"]
+        self.assertEqual(self.store.candidates("John", "Roe", "lockton.com", default)[0][1], "john.roe@lockton.com")
+
+        self.store.record_hit("jdoe@lockton.com", "jane", "doe", "SMTP_VERIFIED")
+        first = self.store.candidates("John", "Roe", "Lockton.com", default)
+        self.assertEqual(first[0], ("flast", "jroe@lockton.com"))
+        self.assertEqual(len(first), 4)
+
+        # Free mail never teaches a domain pattern
+        self.store.record_hit("jane.doe@gmail.com", "jane", "doe", "SMTP_VERIFIED")
+        self.assertIsNone(self.store.best("gmail.com"))
+
+        # Nor does an address that was only scraped, not verified
+        self.assertIsNone(self.store.record_hit("jane.doe@alera.com", "jane", "doe", "SEARCH_FOUND"))
+        self.assertIsNone(self.store.best("alera.com"))
+        print("PASSED")
+
+    def test_03_confidence_drops_with_misses(self):
+        print("\n[TEST 3] Misses Demote A Pattern...")
+        self.store.record_hit("jdoe@alera.com", "jane", "doe", "SEARCH_VERIFIED")
+        self.store.record_miss("alera.com", "flast")
+        self.assertIsNone(self.store.best("alera.com"))  # 1/2 < 0.6
+
+        for name in ("john roe", "ann lee"):
+            f, l = name.split()
+            self.store.record_hit(f"{f}.{l}@alera.com", f, l, "SMTP_VERIFIED")
+        pattern, hits, confidence = self.store.best("alera.com")
+        self.assertEqual((pattern, hits, confidence), ("first.last", 2, 1.0))
+        print("PASSED")
+
+
+if __name__ == "__main__":
+    unittest.main()
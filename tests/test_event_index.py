@@ -0,0 +1,125 @@
+import sys
+import os
+import time
+import random
+import datetime
+import unittest
+
+# Path Setup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+try:
+    from app.core.event_scout import EventIndex, EventScout
+except ImportError:  # supabase / pydantic not installed
+    EventIndex = EventScout = None
+
+TODAY = datetime.date(2026, 3, 1)
+
+
+def linear_hooks(events, candidate, today):
+    """The pre-index check_events loop (reference), plus the index's date filter."""
+    hooks = []
+    cand_city = (candidate.get("city") or "").lower()
+    cand_title = (candidate.get("title") or "").lower()
+    cand_firm = (candidate.get("firm") or "").lower()
+    for event in events:
+        last_day = event.get("end_date") or event.get("start_date")
+        if last_day and datetime.date.fromisoformat(last_day) < today:
+            continue
+        tags = event.get("match_tags", [])
+        if event.get("city", "").lower() == cand_city:
+            reason = "LOCAL_HOST"
+        elif "ROSETTA" in tags and ("rosetta" in cand_firm or "advisors" in cand_firm):
+            reason = "TRIBE_MEMBER"
+        elif "EXECUTIVE" in tags and any(r in cand_title for r in ["ceo", "president", "principal", "founder", "partner"]):
+            reason = "PEER_LEADER"
+        else:
+            continue
+        hooks.append((event["name"], reason))
+    return hooks
+
+
+def synthetic_events(n, seed=3, today=TODAY):
+    rng = random.Random(seed)
+    cities = ["Denver", "Austin", "Seattle", "Boston", "Chicago"]
+    events = []
+    for i in range(n):
+        start = today + datetime.timedelta(days=rng.randint(-60, 120))
+        events.append({
+            "name": f"Event {i}", "city": rng.choice(cities), "venue": f"Hall {i}",
+            "start_date": start.isoformat(),
+            "end_date": (start + datetime.timedelta(days=rng.randint(0, 3))).isoformat(),
+            "match_tags": rng.sample(["ROSETTA", "EXECUTIVE", "TPA"], rng.randint(0, 2)),
+        })
+    return events
+
+
+class _Table:
+    def __init__(self, db):
+        self.db = db
+
+    def select(self, *args):
+        return self
+
+    def execute(self):
+        self.db.reads += 1
+        return type("Res", (), {"data": list(self.db.events)})()
+
+
+class _FakeSupabase:
+    def __init__(self, events):
+        self.events = events
+        self.reads = 0
+
+    def table(self, name):
+        return _Table(self)
+
+
+@unittest.skipUnless(EventIndex, "supabase / pydantic not installed")
+class TestEventIndex(unittest.TestCase):
+
+    def test_01_matches_linear_filter(self):
+        print("\n[TEST 1] Index Hooks == Linear Scan (City / Tag / Date)...")
+        events = synthetic_events(400)
+        index = EventIndex(events, today=TODAY)
+        self.assertTrue(all(e["end_date"] >= TODAY.isoformat() for e in index.events))
+
+        rng = random.Random(5)
+        for _ in range(200):
+            candidate = {"city": rng.choice(["Denver", "austin", "Reno", ""]),
+                         "firm": rng.choice(["Rosetta Advisors", "Lockton", ""]),
+                         "title": rng.choice(["CEO", "Benefits Manager", "Founding Partner"])}
+            got = [(h["event_name"], h["match_reason"]) for h in index.match(candidate)]
+            self.assertEqual(got, linear_hooks(events, candidate, TODAY), candidate)
+
+        self.assertEqual({index.events[p]["city"] for p in index.by_city["denver"]}, {"Denver"})
+        print("PASSED")
+
+    def test_02_shared_index_refreshes_after_ttl(self):
+        print("\n[TEST 2] One Read Per TTL Across Scouts...")
+        db = _FakeSupabase(synthetic_events(20, today=datetime.date.today()))
+
+        class Scout(EventScout):
+            INDEX_TTL_SECONDS = 0.2
+            _shared_index = None
+            _shared_loaded_at = 0.0
+
+            def __init__(self):
+                self.supabase = db
+
+        candidate = {"city": "Denver", "firm": "", "title": ""}
+        first = [Scout().check_events(candidate) for _ in range(5)]
+        self.assertEqual(db.reads, 1)
+        self.assertTrue(all(h == first[0] for h in first))
+
+        db.events = [dict(e, city="Denver") for e in db.events]
+        self.assertEqual(Scout().check_events(candidate), first[0])  # still cached
+        time.sleep(0.25)
+        refreshed = Scout().check_events(candidate)
+        self.assertEqual(db.reads, 2)
+        self.assertGreater(len(refreshed), len(first[0]))
+        print("PASSED")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import sys
+import os
+import time
+import datetime
+import threading
+import unittest
+
+# Path Setup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+try:
+    from app.core.liveness import EmploymentLivenessCheck, LivenessVerdictCache, candidate_key
+except ImportError:  # supabase / pydantic not installed
+    EmploymentLivenessCheck = None
+
+
+class _Query:
+    def __init__(self, db):
+        self.db = db
+        self.keys = None
+        self.row = None
+
+    def select(self, *args):
+        return self
+
+    def in_(self, column, keys):
+        self.keys = keys
+        return self
+
+    def upsert(self, row, on_conflict=None):
+        self.row = row
+        return self
+
+    def execute(self):
+        if self.row is not None:
+            self.db.rows[self.row["candidate_key"]] = self.row
+            return type("Res", (), {"data": [self.row]})()
+        self.db.reads += 1
+        return type("Res", (), {"data": [r for k, r in self.db.rows.items() if k in self.keys]})()
+
+
+class FakeDb:
+    def __init__(self, rows=()):
+        self.rows = {r["candidate_key"]: r for r in rows}
+        self.reads = 0
+
+    def table(self, name):
+        return _Query(self)
+
+
+class FakeSerper:
+    """Current employee unless the name contains 'Gone'; 'Flaky' raises."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.queries = []
+        self.lock = threading.Lock()
+
+    def request(self, endpoint, payload, ttl=None):
+        with self.lock:
+            self.queries.append(payload["q"])
+        time.sleep(self.delay)
+        if "Flaky" in payload["q"]:
+            raise ConnectionError("timeout")
+        prefix = "Former VP" if "Gone" in payload["q"] else "VP"
+        return {"organic": [{"title": f"{prefix} - Lockton", "snippet": "Benefits at Lockton"}]}
+
+
+def row(name, hours_old, departure=False):
+    checked = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=hours_old)
+    return {"candidate_key": candidate_key(name, "Lockton"), "full_name": name, "firm": "Lockton",
+            "is_departure": departure, "risk_reason": None, "evidence": "cached", "checked_at": checked.isoformat()}
+
+
+def make_checker(db, ttl_hours=72):
+    checker = EmploymentLivenessCheck.__new__(EmploymentLivenessCheck)
+    checker.api_key = "k"
+    checker.serper = FakeSerper()
+    checker.cache = LivenessVerdictCache(db, ttl_hours)
+    return checker
+
+
+@unittest.skipUnless(EmploymentLivenessCheck, "supabase / pydantic not installed")
+class TestLivenessCache(unittest.TestCase):
+
+    def test_01_verdicts_expire_after_ttl(self):
+        print("\n[TEST 1] 71h Verdict Reused, 73h Verdict Re-Checked...")
+        checker = make_checker(FakeDb([row("Ann Lee", 71, departure=True), row("Bob Roe", 73, departure=True)]))
+        fresh = checker.check_status({"full_name": "Ann Lee", "firm": "Lockton"})
+        stale = checker.check_status({"full_name": "Bob Roe", "firm": "Lockton"})
+        self.assertTrue(fresh["cached"] and fresh["is_departure"])
+        self.assertFalse(stale["cached"] or stale["is_departure"])
+        self.assertEqual(len(checker.serper.queries), 1)
+        self.assertTrue(checker.check_status({"full_name": "Bob Roe", "firm": "Lockton"})["cached"])
+        print("PASSED")
+
+    def test_02_check_batch_skips_cached_keeps_order(self):
+        print("\n[TEST 2] Batch: One Read, Only Misses Hit Serper, Input Order...")
+        db = FakeDb([row("Ann Lee", 1), row("Cy Poe", 2)])
+        checker = make_checker(db)
+        candidates = [{"full_name": n, "firm": "Lockton"} for n in ("Gone Guy", "Ann Lee", "Dee Fox", "Cy Poe", "Gone Gal")]
+        start = time.perf_counter()
+        results = checker.check_batch(candidates, max_workers=4)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual([r["is_departure"] for r in results], [True, False, False, False, True])
+        self.assertEqual([r["cached"] for r in results], [False, True, False, True, False])
+        self.assertEqual(sorted(checker.serper.queries),
+                         sorted(f"site:linkedin.com/in/ {n} Lockton" for n in ("Gone Guy", "Dee Fox", "Gone Gal")))
+        self.assertEqual(db.reads, 1)
+        self.assertLess(elapsed, 0.14)  # 3 misses x 0.05s run side by side
+        print("PASSED")
+
+    def test_03_errors_not_cached(self):
+        print("\n[TEST 3] Failed Serper Call Leaves No Verdict...")
+        db = FakeDb()
+        checker = make_checker(db)
+        for _ in range(2):
+            result = checker.check_status({"full_name": "Flaky Fred", "firm": "Lockton"})
+            self.assertFalse(result["cached"] or result["is_departure"])
+        self.assertEqual(len(checker.serper.queries), 2)
+        self.assertEqual(db.rows, {})
+        print("PASSED")
+
+
+if __name__ == "__main__":
+    unittest.main()
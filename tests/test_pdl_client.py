@@ -0,0 +1,103 @@
+import sys
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+# Path Setup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.response_cache import ResponseCache
+from utils.rate_limiter import get_limiter
+
+try:
+    from utils.pdl import PdlClient
+except ImportError:  # requests not installed
+    PdlClient = None
+
+
+class FakeResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self._body = body
+        self.headers = {}
+        self.text = str(body)
+
+    def json(self):
+        return self._body
+
+
+class FakeSession:
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.calls.append((url, params))
+        if "Nowhere" in str(params.get("name")):
+            return FakeResponse(404, {"status": 404, "error": {"message": "No records"}})
+        return FakeResponse(200, {"status": 200, "id": "lockton-id", "name": "lockton"})
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        self.calls.append((url, json))
+        items = []
+        for request in reversed(json["requests"]):  # order not guaranteed: map via metadata
+            profile = request["params"]["profile"]
+            if "ghost" in profile:
+                items.append({"status": 404, "error": {"message": "No records"}, "metadata": request["metadata"]})
+            else:
+                items.append({"status": 200, "data": {"linkedin_url": profile}, "metadata": request["metadata"]})
+        return FakeResponse(200, items)
+
+
+@unittest.skipUnless(PdlClient, "requests not installed")
+class TestPdlClient(unittest.TestCase):
+
+    def setUp(self):
+        get_limiter("pdl", rate=0)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.client = PdlClient(api_key="k", cache=ResponseCache(os.path.join(self.tmp.name, "r.sqlite3")))
+        self.client.session = FakeSession()
+
+    def tearDown(self):
+        get_limiter("pdl", rate=2.0, burst=2)
+        self.tmp.cleanup()
+
+    def test_01_repeat_company_lookups_are_free(self):
+        print("\n[TEST 1] Same Firm For 5 People -> 1 Company Enrich...")
+        names = ["Lockton Companies", "lockton  companies", "LOCKTON COMPANIES", "Lockton Companies", "lockton companies"]
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            results = list(pool.map(lambda n: self.client.get("company/enrich", {"name": n, "pretty": True}), names))
+        self.assertTrue(all(r == (200, {"status": 200, "id": "lockton-id", "name": "lockton"}) for r in results))
+        self.assertEqual(len(self.client.session.calls), 1)
+        print("PASSED")
+
+    def test_02_not_found_cached_errors_not(self):
+        print("\n[TEST 2] 404 Cached, Websites Normalized...")
+        for _ in range(2):
+            self.assertEqual(self.client.get("company/enrich", {"name": "Nowhere LLC"})[0], 404)
+        self.client.get("company/enrich", {"website": "https://www.lockton.com/"})
+        self.client.get("company/enrich", {"website": "lockton.com"})
+        self.assertEqual(len(self.client.session.calls), 2)
+        print("PASSED")
+
+    def test_03_bulk_enrich_maps_records_and_budget(self):
+        print("\n[TEST 3] 250 Profiles -> 3 Bulk Calls, Per-Record 404s...")
+        profiles = [f"linkedin.com/in/p{i}" for i in range(248)] + ["linkedin.com/in/ghost", "linkedin.com/in/P0"]
+        results = self.client.bulk_enrich([{"profile": p} for p in profiles])
+        self.assertEqual(len(self.client.session.calls), 3)  # 249 unique records, 100 per call
+        self.assertEqual(results[7], (200, {"status": 200, "data": {"linkedin_url": "linkedin.com/in/p7"}}))
+        self.assertEqual(results[248][0], 404)
+        self.assertEqual(results[249], results[0])
+
+        # Shared cache with single enrich; budget caps uncached records sent
+        self.assertEqual(self.client.get("person/enrich", {"profile": "linkedin.com/in/p3"})[0], 200)
+        more = self.client.bulk_enrich([{"profile": p} for p in ("linkedin.com/in/p1", "linkedin.com/in/new1",
+                                                                 "linkedin.com/in/new2")], max_records=1)
+        self.assertEqual([r and r[0] for r in more], [200, 200, None])
+        self.assertEqual(len(self.client.session.calls), 4)
+        self.assertEqual(self.client.bulk_records, 250)
+        print("PASSED")
+
+
+if __name__ == "__main__":
+    unittest.main()
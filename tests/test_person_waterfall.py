@@ -0,0 +1,121 @@
+import sys
+import os
+import unittest
+
+# Path Setup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+try:
+    import scout_production_engine_v7_final as v7
+except ImportError:  # requests / dotenv not installed
+    v7 = None
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None, credits=0.0):
+        self.status_code = status_code
+        self._body = body or {}
+        self.headers = {"X-Call-Credits-Spent": credits}
+
+    def json(self):
+        return self._body
+
+
+class FakePdl:
+    """person/search over a fixed roster. Returns `size` matches in roster order."""
+
+    def __init__(self, roster):
+        self.roster = roster
+        self.queries = []
+
+    def __call__(self, method, url, params=None, **kwargs):
+        self.queries.append(params["sql"])
+        titles = {t.strip(" '").lower() for t in params["sql"].split("IN (")[1].rstrip(")").split(",")}
+        matches = [p for p in self.roster if p["job_title"].lower() in titles]
+        if not matches:
+            return FakeResponse(404, {"status": 404})
+        page = matches[:params["size"]]
+        return FakeResponse(200, {"status": 200, "data": page, "total": len(matches)}, credits=len(page))
+
+
+@unittest.skipUnless(v7, "requests / dotenv not installed")
+class TestPersonWaterfall(unittest.TestCase):
+
+    def setUp(self):
+        self.size, self.mode = v7.COMBINED_SEARCH_SIZE, v7.PERSON_SEARCH_MODE
+        v7.PERSON_SEARCH_MODE = "combined"
+
+    def tearDown(self):
+        v7.COMBINED_SEARCH_SIZE, v7.PERSON_SEARCH_MODE = self.size, self.mode
+
+    def _engine(self, roster):
+        engine = v7.ScoutEngine.__new__(v7.ScoutEngine)
+        engine.total_credits_used = 0.0
+        engine.rate_limit_hits = 0
+        engine.safe_request = FakePdl(roster)
+        return engine
+
+    def test_01_one_query_same_winner(self):
+        print("\n[TEST 1] Combined Query Picks The Waterfall's Tier...")
+        roster = [{"full_name": "Mgr", "job_title": "hr manager"},
+                  {"full_name": "Vp", "job_title": "vp hr"},
+                  {"full_name": "Chief", "job_title": "chief financial officer"}]
+        for size in (5, 3):
+            engine = self._engine(roster)
+            v7.COMBINED_SEARCH_SIZE = size
+            person, tier, cost, status = engine.search_person_waterfall("cid", {})
+            self.assertEqual((person["full_name"], tier), ("Chief", "Tier 1 (Chiefs)"))
+            self.assertEqual(len(engine.safe_request.queries), 1)
+
+        engine = self._engine(roster)
+        self.assertEqual(engine.search_person_tiers("cid", {}, v7.TITLE_TIERS)[1], "Tier 1 (Chiefs)")
+        print("PASSED")
+
+    def test_02_truncated_page_falls_back_to_better_tiers(self):
+        print("\n[TEST 2] Truncated Page -> Per-Tier Check Above Best...")
+        roster = [{"full_name": f"Mgr{i}", "job_title": "benefits manager"} for i in range(4)]
+        roster.append({"full_name": "Vp", "job_title": "Head of People"})
+        v7.COMBINED_SEARCH_SIZE = 2
+        engine = self._engine(roster)
+        person, tier, cost, status = engine.search_person_waterfall("cid", {})
+        self.assertEqual((person["full_name"], tier), ("Vp", "Tier 2 (VPs/Directors)"))
+        self.assertEqual(len(engine.safe_request.queries), 3)  # combined + tier 1 + tier 2
+        self.assertEqual(cost, 3.0)
+
+        v7.COMBINED_SEARCH_SIZE = 5
+        engine = self._engine([])
+        self.assertEqual(engine.search_person_waterfall("cid", {})[1], "NO_MATCH")
+        self.assertEqual(len(engine.safe_request.queries), 1)  # was 3
+        print("PASSED")
+
+    def test_03_credits_and_requests_vs_tiered(self):
+        print("\n[TEST 3] Combined vs Tiered: Requests And Credits...")
+        small = [{"full_name": "Vp", "job_title": "vp hr"}, {"full_name": "Mgr", "job_title": "hr manager"}]
+        large = [{"full_name": f"Mgr{i}", "job_title": "hr manager"} for i in range(20)]
+        large.append({"full_name": "Vp", "job_title": "vp hr"})
+        v7.COMBINED_SEARCH_SIZE = 5
+        rows = []
+        for label, roster in (("not truncated", small), ("truncated", large)):
+            combined = self._engine(roster)
+            c_person, c_tier, c_cost, _ = combined.search_person_combined("cid", {})
+            tiered = self._engine(roster)
+            t_person, t_tier, t_cost, _ = tiered.search_person_tiers("cid", {}, v7.TITLE_TIERS)
+            self.assertEqual(c_tier, t_tier)
+            rows.append((label, len(combined.safe_request.queries), c_cost,
+                         len(tiered.safe_request.queries), t_cost))
+            print(f"   {label}: combined {rows[-1][1]} req / {c_cost} cr, tiered {rows[-1][3]} req / {t_cost} cr")
+
+        # Small company: fewer requests, but every returned record is billed
+        self.assertEqual(rows[0][1:], (1, 2.0, 2, 1.0))
+        # Truncated page without Tier 1: full page billed plus the per-tier fallback
+        self.assertEqual(rows[1][1:], (3, 6.0, 2, 1.0))
+        self.assertGreater(rows[1][2], rows[1][4])
+
+        # Default stays the tiered waterfall (at most 1 billed record per company)
+        if not os.getenv("SCOUT_PERSON_SEARCH_MODE"):
+            self.assertEqual(self.mode, "tiered")
+        print("PASSED")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,221 @@
+import sys
+import os
+import time
+import tempfile
+import threading
+import subprocess
+import unittest
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+
+# Path Setup
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(ROOT)
+
+try:
+    import recon_agent
+except ImportError:  # gspread / google-generativeai not installed
+    recon_agent = None
+
+from utils.email_patterns import DomainPatternStore
+from utils.audit_store import AuditStore
+
+DELAY = 0.05
+
+
+def fake_search_serper(query):
+    time.sleep(DELAY)
+    if query.startswith('site:linkedin.com/in/ "'):
+        return "Jane Doe - VP Benefits - Acme Benefits - Present"
+    return f"snippets for <{query}>"
+
+
+def fake_search_images(query):
+    time.sleep(DELAY)
+    return f"https://img.example/{len(query)}.jpg"
+
+
+@unittest.skipUnless(recon_agent, "gspread / google-generativeai not installed")
+class TestGatherIntel(unittest.TestCase):
+
+    def gather(self, pool):
+        saved = recon_agent._intel_pool
+        recon_agent._intel_pool = pool
+        try:
+            with mock.patch.object(recon_agent, "search_serper", fake_search_serper), \
+                 mock.patch.object(recon_agent, "serper_snippets", fake_search_serper), \
+                 mock.patch.object(recon_agent, "search_images", fake_search_images):
+                start = time.perf_counter()
+                result = recon_agent.gather_intel("Jane Doe", "Acme Benefits")
+                return result, time.perf_counter() - start
+        finally:
+            recon_agent._intel_pool = saved
+
+    def test_01_pool_built_on_first_use(self):
+        print("\n[TEST 1] Importing recon_agent Starts No Threads...")
+        out = subprocess.run(
+            [sys.executable, "-c", "import recon_agent; print(recon_agent._intel_pool)"],
+            cwd=ROOT, capture_output=True, text=True, timeout=60)
+        self.assertEqual(out.stdout.strip().splitlines()[-1], "None", out.stderr)
+        pool = recon_agent.get_intel_pool()
+        self.assertIs(recon_agent.get_intel_pool(), pool)
+        print("PASSED")
+
+    def test_02_concurrent_matches_serial(self):
+        print("\n[TEST 2] Concurrent Fan-Out == Serial (Order + Content), Faster...")
+        with ThreadPoolExecutor(max_workers=1) as serial_pool:
+            serial, serial_time = self.gather(serial_pool)
+        concurrent, concurrent_time = self.gather(None)  # lazily built shared pool
+        print(f"   serial {serial_time:.2f}s, concurrent {concurrent_time:.2f}s")
+
+        self.assertEqual(concurrent, serial)
+        raw_intel, image_url, status, _ = concurrent
+        self.assertEqual(status, recon_agent.VerificationStatus.VERIFIED.value)
+        self.assertTrue(image_url.startswith("https://img.example/"))
+        sections = raw_intel.split("\n\n")
+        self.assertEqual([s.split(":\n")[0] for s in sections],
+                         ["BIO", "POSTS", "ARTICLES", "PODCASTS/INTERVIEWS", "NEWS/PR", "SOCIAL"])
+        for section, marker in zip(sections[1:], ("linkedin.com/posts/", "linkedin.com/pulse/",
+                                                  "youtube.com", "press release", "twitter.com")):
+            self.assertIn(marker, section)
+
+        # bio + 6 serial calls vs bio + one concurrent round
+        self.assertGreater(serial_time, 6 * DELAY)
+        self.assertLess(concurrent_time, serial_time / 2)
+        print("PASSED")
+
+
+class FakeVerifier:
+    """SMTP verifier stand-in: outcomes[email] = (valid, seconds or a callable to wait on)."""
+
+    def __init__(self, outcomes, workers):
+        self.outcomes = outcomes
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.submitted = []
+        self.started = []
+
+    def submit(self, email):
+        self.submitted.append(email)
+        return self.pool.submit(self._verify, email)
+
+    def _verify(self, email):
+        self.started.append(email)
+        valid, wait = self.outcomes.get(email, (False, 0))
+        wait() if callable(wait) else time.sleep(wait)
+        return valid, "fake"
+
+
+@unittest.skipUnless(recon_agent, "gspread / google-generativeai not installed")
+class TestHunterSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = DomainPatternStore(os.path.join(self.tmp.name, "patterns.sqlite3"))
+        self.queries = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def hunt(self, verifier):
+        with mock.patch.object(recon_agent, "get_pattern_store", lambda: self.store), \
+             mock.patch.object(recon_agent, "get_smtp_verifier", lambda: verifier), \
+             mock.patch.object(recon_agent, "search_serper", lambda q: self.queries.append(q) or ""):
+            return recon_agent.hunter_search("John", "Roe", "Acme", "acme.com")
+
+    def test_01_learned_pattern_probed_first(self):
+        print("\n[TEST 1] Learned Pattern Verified -> No Other Probes...")
+        self.store.record_hit("jdoe@acme.com", "Jane", "Doe", "SMTP_VERIFIED")
+        verifier = FakeVerifier({"jroe@acme.com": (True, 0)}, workers=4)
+        self.assertEqual(self.hunt(verifier), ("jroe@acme.com", "SMTP_VERIFIED"))
+        self.assertEqual(verifier.submitted, ["jroe@acme.com"])
+        self.assertEqual(self.queries, [])
+        print("PASSED")
+
+    def test_02_priority_beats_speed(self):
+        print("\n[TEST 2] Slow first.last Wins Over Fast flast...")
+        verifier = FakeVerifier({"john.roe@acme.com": (True, 0.15), "jroe@acme.com": (True, 0)}, workers=4)
+        self.assertEqual(self.hunt(verifier), ("john.roe@acme.com", "SMTP_VERIFIED"))
+        self.assertEqual(self.store.best("acme.com")[0], "first.last")
+        self.assertEqual(self.queries, [])  # SMTP passed: no search fallback
+        verifier.pool.shutdown(wait=True)
+        print("PASSED")
+
+    def test_03_queued_probes_dropped(self):
+        print("\n[TEST 3] Probes Not Yet Started Are Cancelled...")
+        gate = threading.Event()
+        verifier = FakeVerifier({"john.roe@acme.com": (True, 0), "jroe@acme.com": (False, gate.wait),
+                                 "johnroe@acme.com": (False, gate.wait)}, workers=2)
+        self.assertEqual(self.hunt(verifier), ("john.roe@acme.com", "SMTP_VERIFIED"))
+        gate.set()  # running probes can't be cancelled; they finish and are ignored
+        verifier.pool.shutdown(wait=True)
+        self.assertEqual(len(verifier.submitted), 4)
+        self.assertNotIn("john_roe@acme.com", verifier.started)
+        print("PASSED")
+
+
+
+class FakeWorksheet:
+    HEADERS = ["First Name", "Last Name", "Firm", "LinkedIn URL", "Found Email", "Profile Image",
+               "Dossier Summary", "Verification Status", "Validation Log", "Data Source"]
+
+    def __init__(self, records):
+        self.records = records
+        self.writes = []
+
+    def get_all_records(self):
+        return self.records
+
+    def row_values(self, row):
+        return list(self.HEADERS)
+
+    def batch_update(self, data, value_input_option=None):
+        self.writes.extend(data)
+
+
+@unittest.skipUnless(recon_agent, "gspread / google-generativeai not installed")
+class TestForensicAudit(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.sheet = FakeWorksheet([{"First Name": "Jane", "Last Name": "Doe", "Firm": "Acme",
+                                     "LinkedIn URL": "", "Found Email": ""}])
+        client = mock.Mock()
+        client.open.return_value.worksheet.return_value = self.sheet
+        path = os.path.join(self.tmp.name, "audit.sqlite3")
+        self.patches = [
+            mock.patch.object(recon_agent, "get_google_sheet_client", lambda: client),
+            mock.patch.object(recon_agent, "AuditStore", lambda audit: AuditStore(audit, path=path)),
+            mock.patch.object(recon_agent, "explain_failure", lambda name, firm: "not found"),
+        ]
+        for p in self.patches:
+            p.start()
+        self.store = AuditStore("forensic", path=path)
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmp.cleanup()
+
+    def audit(self, snippets):
+        with mock.patch.object(recon_agent, "serper_snippets", snippets):
+            return recon_agent.run_forensic_audit()
+
+    def test_01_search_error_is_not_a_verdict(self):
+        print("\n[TEST 1] Serper Error -> Row Untouched, No Cached Verdict...")
+
+        def failing(query):
+            raise RuntimeError("API budget exhausted (monthly hard cap)")
+
+        self.audit(failing)
+        self.assertEqual(self.sheet.writes, [])
+        self.assertEqual(self.store._conn.execute("SELECT * FROM audit_fingerprints").fetchall(), [])
+
+        # A real failed match is recorded and the assets are wiped
+        self.assertEqual(self.audit(lambda query: "John Roe - Initech"), 1)
+        self.assertIn("⚠️ SCOUT AGENT: not found", [v for w in self.sheet.writes for v in w["values"][0]])
+        rows = self.store._conn.execute("SELECT verdict FROM audit_fingerprints").fetchall()
+        self.assertEqual(rows, [(recon_agent.VerificationStatus.NOT_VERIFIED.value,)])
+        print("PASSED")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import sys
+import os
+import time
+import tempfile
+import unittest
+
+# Path Setup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.response_cache import ResponseCache, make_key
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(os.path.join(self.tmp.name, "responses.sqlite3"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_01_normalized_keys(self):
+        print("\n[TEST 1] Query Normalization...")
+        a = make_key("serper:search", {"q": "Jane  Doe Lockton", "num": 10})
+        b = make_key("serper:search", {"num": 10, "q": " jane doe lockton", "gl": None})
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, make_key("serper:news", {"q": "jane doe lockton", "num": 10}))
+        self.assertNotEqual(a, make_key("serper:search", {"q": "jane doe lockton", "num": 3}))
+        print("PASSED")
+
+    def test_02_ttl_and_stats(self):
+        print("\n[TEST 2] TTL + Stats...")
+        params = {"q": "alera group"}
+        self.assertIsNone(self.cache.get("serper:news", params, ttl=60))
+        self.cache.set("serper:news", params, {"news": [{"title": "Alera acquires X"}]})
+
+        self.assertEqual(self.cache.get("serper:news", params, ttl=60)["news"][0]["title"], "Alera acquires X")
+        time.sleep(0.05)
+        self.assertIsNone(self.cache.get("serper:news", params, ttl=0.01))
+        # Offline reads ignore age
+        self.assertIsNotNone(self.cache.get("serper:news", params, ttl=None))
+
+        summary = self.cache.summary()
+        self.assertEqual((summary["hits"], summary["misses"], summary["expired"]), (2, 1, 1))
+        self.assertEqual(summary["entries"], {"serper:news": 1})
+        print("PASSED")
+
+    def test_03_persists_across_instances(self):
+        print("\n[TEST 3] Shared On-Disk Store...")
+        self.cache.set("serper:images", {"q": "x"}, {"images": []})
+        other = ResponseCache(self.cache.path)
+        self.assertEqual(other.get("serper:images", {"q": "X"}, ttl=3600), {"images": []})
+        self.assertEqual(other.purge(namespace="serper:images"), 1)
+        print("PASSED")
+
+
+if __name__ == "__main__":
+    unittest.main()
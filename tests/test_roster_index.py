@@ -0,0 +1,102 @@
+import sys
+import os
+import time
+import random
+import unittest
+
+# Path Setup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from modules.roster_index import RosterIndex
+
+
+def linear_lookup(roster, firm, city, state):
+    """The pre-index AttributionEngine._lookup_internal scan (reference)."""
+    if not firm: return None
+    firm_lower = firm.lower()
+    city_lower = city.lower() if city else ""
+    for entry in roster:
+        if entry['firm'].lower() in firm_lower:
+            e_city = entry['city'].lower()
+            if city_lower and e_city == city_lower:
+                return entry
+            if state and entry['state'] == state and e_city != "west region":
+                return entry
+    if state in ['CA', 'WA', 'OR', 'ID', 'UT', 'CO', 'AZ', 'NV', 'NM']:
+        for entry in roster:
+            if entry['firm'].lower() in firm_lower:
+                if entry['city'].lower() == "west region" or entry['state'].lower() == "west":
+                    return entry
+    return None
+
+
+def synthetic_roster(n, seed=7):
+    rng = random.Random(seed)
+    states = ['CA', 'WA', 'OR', 'NV', 'AZ', 'TX', 'NY', 'IL', 'FL', 'CO']
+    cities = [f"City{i}" for i in range(200)]
+    roster = []
+    for i in range(n):
+        firm = f"Firm{rng.randrange(n // 10)} {rng.choice(['Insurance', 'Benefits', 'Partners'])}"
+        if rng.random() < 0.05:
+            roster.append({"firm": firm, "city": "West Region", "state": "West", "person_name": f"P{i}"})
+        else:
+            roster.append({"firm": firm, "city": rng.choice(cities), "state": rng.choice(states), "person_name": f"P{i}"})
+    return roster
+
+
+class TestRosterIndex(unittest.TestCase):
+
+    def test_01_same_answers_as_linear_scan(self):
+        print("\n[TEST 1] Index vs Linear Scan...")
+        roster = [
+            {"firm": "Gallagher", "city": "Glendale", "state": "CA", "person_name": "Neil Parton"},
+            {"firm": "Lockton", "city": "West Region", "state": "West", "person_name": "Regional Lead"},
+            {"firm": "Lockton", "city": "Seattle", "state": "WA", "person_name": "Seattle Lead"},
+        ]
+        index = RosterIndex(roster)
+        cases = [("Arthur J. Gallagher & Co", "Glendale", "CA"), ("Gallagher", "Irvine", "CA"),
+                 ("Lockton Companies", "Portland", "OR"), ("Lockton", "Austin", "TX"),
+                 ("Lockton", "Spokane", "WA"), ("Unknown Firm", "Glendale", "CA"), (None, None, None)]
+        for case in cases:
+            self.assertIs(index.lookup(*case) if case[0] else None, linear_lookup(roster, *case), case)
+        self.assertEqual(index.lookup("Lockton", "Portland", "OR")["person_name"], "Regional Lead")
+
+        roster = synthetic_roster(5000)
+        index = RosterIndex(roster)
+        rng = random.Random(1)
+        for _ in range(300):
+            entry = rng.choice(roster)
+            case = (f"The {entry['firm']} Group", f"City{rng.randrange(200)}", rng.choice(['CA', 'TX', 'NY']))
+            self.assertIs(index.lookup(*case), linear_lookup(roster, *case), case)
+        print("PASSED")
+
+    def test_02_benchmark_synthetic_roster(self):
+        print("\n[TEST 2] 50k-Row Roster Throughput...")
+        roster = synthetic_roster(50000)
+        start = time.perf_counter()
+        index = RosterIndex(roster)
+        build = time.perf_counter() - start
+
+        rng = random.Random(2)
+        queries = [(rng.choice(roster)['firm'] + " LLC", f"City{rng.randrange(200)}", rng.choice(['CA', 'TX']))
+                   for _ in range(2000)]
+
+        start = time.perf_counter()
+        for q in queries:
+            index.lookup(*q)
+        indexed = (time.perf_counter() - start) / len(queries)
+
+        start = time.perf_counter()
+        for q in queries[:20]:
+            linear_lookup(roster, *q)
+        linear = (time.perf_counter() - start) / 20
+
+        print(f"   build {build * 1000:.0f}ms | indexed {indexed * 1e6:.1f}us/lookup ({1 / indexed:,.0f}/s) "
+              f"| linear {linear * 1e3:.2f}ms/lookup ({1 / linear:,.0f}/s)")
+        self.assertLess(indexed, 0.001)
+        self.assertLess(indexed * 20, linear)
+        print("PASSED")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import sys
+import os
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+# Path Setup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.gsheets import SheetWriteBuffer, col_to_letters
+from utils.rate_limiter import get_limiter
+
+
+class _QuotaError(Exception):
+    def __init__(self):
+        super().__init__("APIError: [429]: Quota exceeded for quota metric 'Write requests'")
+        self.response = type("R", (), {"status_code": 429, "headers": {"Retry-After": "0.01"}})()
+
+
+class FakeWorksheet:
+    def __init__(self, fail_first=0):
+        self.calls = []
+        self.fail_first = fail_first
+
+    def batch_update(self, data, value_input_option=None):
+        if self.fail_first:
+            self.fail_first -= 1
+            raise _QuotaError()
+        self.calls.append(data)
+
+    def row_values(self, row):
+        return ["First Name", "Last Name"]
+
+
+class TestSheetWriteBuffer(unittest.TestCase):
+
+    def setUp(self):
+        get_limiter("gsheets", rate=0)  # no pacing in tests
+
+    def tearDown(self):
+        get_limiter("gsheets", rate=1.0, burst=1)
+
+    def test_01_cells_become_ranges(self):
+        print("\n[TEST 1] Row Writes -> Ranged batch_update...")
+        self.assertEqual([col_to_letters(c) for c in (1, 26, 27, 52)], ["A", "Z", "AA", "AZ"])
+        ws = FakeWorksheet()
+        with SheetWriteBuffer(ws) as sheet:
+            for col, value in ((10, "dossier"), (11, "draft"), (12, "img"), (14, "VERIFIED")):
+                sheet.update_cell(5, col, value)
+            sheet.update_cell(6, 14, "NOT_VERIFIED")
+            sheet.update_cell(5, 14, "SUSPECT")  # last write wins
+            self.assertEqual(sheet.row_values(1), ["First Name", "Last Name"])  # reads pass through
+            self.assertEqual(ws.calls, [])
+
+        self.assertEqual(ws.calls, [[
+            {"range": "J5:L5", "values": [["dossier", "draft", "img"]]},
+            {"range": "N5:N5", "values": [["SUSPECT"]]},
+            {"range": "N6:N6", "values": [["NOT_VERIFIED"]]},
+        ]])
+        print("PASSED")
+
+    def test_02_concurrent_writers_batched(self):
+        print("\n[TEST 2] 50 Leads x 8 Cells From 8 Threads...")
+        ws = FakeWorksheet()
+        sheet = SheetWriteBuffer(ws, max_cells=100)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda r: [sheet.update_cell(r, c, f"{r}:{c}") for c in range(1, 9)], range(2, 52)))
+        sheet.flush()
+
+        written = {(d["range"], v) for call in ws.calls for d in call for v in d["values"][0]}
+        self.assertEqual(len(written), 400)
+        self.assertLessEqual(sheet.stats["api_calls"], 5)  # vs 400 update_cell calls
+        print("PASSED")
+
+    def test_03_quota_retry_and_failure(self):
+        print("\n[TEST 3] 429 Retried, Other Errors Keep Cells Buffered...")
+        ws = FakeWorksheet(fail_first=2)
+        sheet = SheetWriteBuffer(ws)
+        sheet.update_cell(2, 1, "x")
+        self.assertEqual(sheet.flush(), 1)
+        self.assertEqual(sheet.stats["retries"], 2)
+
+        ws.batch_update = lambda data, value_input_option=None: (_ for _ in ()).throw(RuntimeError("500"))
+        sheet.update_cell(3, 1, "y")
+        with self.assertRaises(RuntimeError):
+            sheet.flush()
+        self.assertEqual(len(sheet), 1)
+        print("PASSED")
+
+
+if __name__ == "__main__":
+    unittest.main()
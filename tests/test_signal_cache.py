@@ -0,0 +1,252 @@
+import sys
+import os
+import time
+import datetime
+import threading
+import unittest
+from collections import OrderedDict
+
+# Path Setup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.rate_limiter import get_limiter
+
+try:
+    from app.core import signal_analyst
+    from app.core.signal_analyst import SignalAnalyst, FirmSignalCache
+except ImportError:  # tavily / supabase / pydantic not installed
+    SignalAnalyst = FirmSignalCache = None
+
+
+class FakeSerper:
+    def __init__(self, links):
+        self.links = links
+        self.calls = 0
+
+    def request(self, endpoint, payload):
+        self.calls += 1
+        return {"news": [{"title": f"Deal {i}", "link": link} for i, link in enumerate(self.links)]}
+
+
+class PerFirmSerper:
+    """News links keyed by firm name (the first word of the query)."""
+
+    def __init__(self, links_by_firm):
+        self.links_by_firm = links_by_firm
+        self.calls = 0
+
+    def request(self, endpoint, payload):
+        self.calls += 1
+        links = self.links_by_firm.get(payload["q"].split()[0], [])
+        return {"news": [{"title": f"Deal {i}", "link": link} for i, link in enumerate(links)]}
+
+
+class FakeTavily:
+    """Extracts every URL; URLs containing 'broken' come back as failed_results."""
+
+    def __init__(self):
+        self.calls = []
+
+    def extract(self, urls):
+        self.calls.append(list(urls))
+        return {"results": [{"url": u, "raw_content": f"text of {u}"} for u in urls if "broken" not in u],
+                "failed_results": [{"url": u, "error": "blocked"} for u in urls if "broken" in u]}
+
+
+class FakeLLM:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def analyze_text(self, system_prompt, user_text, json_schema=None):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return {"signal_type": "M&A", "relevance_score": 90, "impact_rating": "HIGH",
+                "analysis": "Acquired.", "action_suggested": "Mention it."}
+
+
+def make_analyst(links, cache, llm_delay=0.0):
+    analyst = SignalAnalyst.__new__(SignalAnalyst)
+    analyst.serper_key = "k"
+    analyst.tavily_key = "k"
+    analyst.serper = FakeSerper(links)
+    analyst.tavily = FakeTavily()
+    analyst.llm = FakeLLM(llm_delay)
+    analyst.cache = cache
+    analyst._content = OrderedDict()
+    analyst._content_lock = threading.Lock()
+    analyst._prefetched = {}
+    analyst._prefetch_guard = threading.Lock()
+    return analyst
+
+
+class ClockedCache(FirmSignalCache if FirmSignalCache else object):
+    """FirmSignalCache with a settable clock."""
+    now = datetime.datetime(2026, 3, 1, tzinfo=datetime.timezone.utc)
+
+    def _now(self):
+        return ClockedCache.now
+
+
+@unittest.skipUnless(SignalAnalyst, "tavily / supabase / pydantic not installed")
+class TestFirmSignalCache(unittest.TestCase):
+
+    def setUp(self):
+        get_limiter("tavily", rate=0)
+        ClockedCache.now = datetime.datetime(2026, 3, 1, tzinfo=datetime.timezone.utc)
+
+    def tearDown(self):
+        get_limiter("tavily", rate=2.0, burst=2)
+
+    def test_01_freshness_ttl(self):
+        print("\n[TEST 1] Fresh Entry Served Without Upstream Calls...")
+        analyst = make_analyst(["https://news.example/a"], ClockedCache(freshness_hours=20))
+        first = analyst.scan_and_analyze("Acme Benefits")
+        self.assertEqual(len(first), 1)
+
+        ClockedCache.now += datetime.timedelta(hours=19)
+        self.assertEqual(analyst.scan_and_analyze("ACME  Benefits."), first)
+        self.assertEqual(analyst.serper.calls, 1)
+
+        ClockedCache.now += datetime.timedelta(hours=2)  # 21h: stale -> re-scan
+        analyst.scan_and_analyze("Acme Benefits")
+        self.assertEqual(analyst.serper.calls, 2)
+        print("PASSED")
+
+    def test_02_url_set_hash_reuse(self):
+        print("\n[TEST 2] Same Articles Reuse Judgement, New Articles Miss...")
+        analyst = make_analyst(["https://news.example/a", "https://news.example/b"], ClockedCache(freshness_hours=1))
+        analyst.scan_and_analyze("Acme")
+        self.assertEqual(analyst.llm.calls, 2)
+
+        ClockedCache.now += datetime.timedelta(hours=2)
+        analyst.serper.links = ["https://news.example/b", "https://news.example/a"]  # same set, new order
+        analyst.scan_and_analyze("Acme")
+        self.assertEqual((analyst.serper.calls, analyst.llm.calls, len(analyst.tavily.calls)), (2, 2, 2))
+
+        ClockedCache.now += datetime.timedelta(hours=2)
+        analyst.serper.links = ["https://news.example/a", "https://news.example/c"]
+        analyst._content.clear()
+        analyst.scan_and_analyze("Acme")
+        self.assertEqual(analyst.llm.calls, 4)
+        self.assertEqual(analyst.cache.get("acme")["url_set_hash"],
+                         SignalAnalyst.url_set_hash(["https://news.example/c", "https://news.example/a"]))
+        print("PASSED")
+
+    def test_03_concurrent_callers_share_one_analysis(self):
+        print("\n[TEST 3] 8 Concurrent Calls For One Firm -> 1 Analysis...")
+        analyst = make_analyst(["https://news.example/a"], ClockedCache(), llm_delay=0.2)
+        results = [None] * 8
+
+        def call(i):
+            results[i] = analyst.scan_and_analyze("Acme Benefits")
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual((analyst.serper.calls, analyst.llm.calls), (1, 1))
+        self.assertTrue(all(r == results[0] and len(r) == 1 for r in results))
+        results[0][0]["title"] = "mutated"  # callers get independent copies
+        self.assertNotEqual(results[1][0]["title"], "mutated")
+        print("PASSED")
+
+
+@unittest.skipUnless(SignalAnalyst, "tavily / supabase / pydantic not installed")
+class TestPrefetchContent(unittest.TestCase):
+
+    def setUp(self):
+        get_limiter("tavily", rate=0)
+        self.saved = (signal_analyst.CONTENT_FAILED_TTL_SECONDS, signal_analyst.CONTENT_MAX_ENTRIES,
+                      signal_analyst.PREFETCH_KEEP_SECONDS, signal_analyst.PREFETCH_WAIT_SECONDS)
+
+    def tearDown(self):
+        get_limiter("tavily", rate=2.0, burst=2)
+        (signal_analyst.CONTENT_FAILED_TTL_SECONDS, signal_analyst.CONTENT_MAX_ENTRIES,
+         signal_analyst.PREFETCH_KEEP_SECONDS, signal_analyst.PREFETCH_WAIT_SECONDS) = self.saved
+
+    def make(self, links_by_firm):
+        analyst = make_analyst([], ClockedCache())
+        analyst.serper = PerFirmSerper(links_by_firm)
+        return analyst
+
+    def test_01_cross_firm_url_dedupe(self):
+        print("\n[TEST 1] URL Shared By Two Firms Extracted Once...")
+        shared = "https://news.example/merger"
+        analyst = self.make({"Acme": [shared, "https://news.example/a"],
+                             "Beta": [shared, "https://news.example/b"],
+                             "Gamma": [shared, "https://news.example/c"]})
+        self.assertEqual(analyst.prefetch(["Acme", "Beta"]), 1)
+        self.assertEqual(sorted(analyst.tavily.calls[0]),
+                         sorted([shared, "https://news.example/a", "https://news.example/b"]))
+
+        analyst.scan_and_analyze("Acme")
+        analyst.scan_and_analyze("Beta")
+        self.assertEqual((analyst.serper.calls, len(analyst.tavily.calls)), (2, 1))
+
+        analyst.prefetch(["Gamma"])  # already-extracted URLs are not sent again
+        self.assertEqual(analyst.tavily.calls[1], ["https://news.example/c"])
+        print("PASSED")
+
+    def test_02_extract_batched(self):
+        print("\n[TEST 2] 46 URLs -> Extract Calls Of <= TAVILY_EXTRACT_BATCH...")
+        firms = [f"Firm{i}" for i in range(23)]
+        analyst = self.make({f: [f"https://news.example/{f}/1", f"https://news.example/{f}/2"] for f in firms})
+        calls = analyst.prefetch(firms)
+        batch = signal_analyst.TAVILY_EXTRACT_BATCH
+        self.assertEqual(calls, -(-46 // batch))
+        self.assertEqual([len(c) for c in analyst.tavily.calls], [batch, batch, 46 - 2 * batch])
+        self.assertEqual(len({u for c in analyst.tavily.calls for u in c}), 46)
+        print("PASSED")
+
+    def test_03_content_cache_bounded(self):
+        print("\n[TEST 3] Failed Extracts Expire, LRU Bound, Untaken Scans Dropped...")
+        signal_analyst.CONTENT_FAILED_TTL_SECONDS = 0.1
+        signal_analyst.CONTENT_MAX_ENTRIES = 3
+        signal_analyst.PREFETCH_KEEP_SECONDS = 0.1
+        analyst = self.make({"Acme": ["https://news.example/broken"], "Beta": ["https://news.example/b"]})
+
+        analyst.prefetch(["Acme"])
+        self.assertEqual(analyst._cached_content(analyst.url_key("https://news.example/broken")), (True, None))
+        time.sleep(0.15)
+        self.assertEqual(analyst._cached_content(analyst.url_key("https://news.example/broken")), (False, None))
+
+        analyst.prefetch(["Beta"])  # Acme's scan was never taken: dropped
+        self.assertEqual(set(analyst._prefetched), {"beta"})
+
+        for i in range(5):
+            analyst._store_content(f"k{i}", "text")
+        self.assertEqual(list(analyst._content), ["k2", "k3", "k4"])
+        print("PASSED")
+
+
+    def test_04_waiter_timeout_during_prefetch(self):
+        print("\n[TEST 4] Waiter Gives Up Mid-Prefetch -> Prefetch Still Completes...")
+        signal_analyst.PREFETCH_WAIT_SECONDS = 0.05
+        analyst = self.make({"Acme": ["https://news.example/a"], "Beta": ["https://news.example/b"]})
+        request = analyst.serper.request
+        analyst.serper.request = lambda endpoint, payload: time.sleep(0.2) or request(endpoint, payload)
+
+        errors = []
+
+        def run_prefetch():
+            try:
+                analyst.prefetch(["Acme", "Beta"], scan_workers=1)
+            except Exception as e:
+                errors.append(e)
+
+        prefetcher = threading.Thread(target=run_prefetch)
+        prefetcher.start()
+        time.sleep(0.02)
+        self.assertEqual(analyst._take_prefetched("acme"), (False, None))  # timed out, entry popped
+        prefetcher.join()
+        self.assertEqual(errors, [])
+        self.assertTrue(analyst._prefetched["beta"]["ready"].is_set())
+        self.assertEqual(analyst._take_prefetched("beta")[0], True)
+        print("PASSED")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import sys
+import os
+import time
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+# Path Setup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_01_concurrent_identical_calls_collapse(self):
+        print("\n[TEST 1] 10 Concurrent Identical Lookups -> 1 Upstream Call...")
+        flight = SingleFlight("test")
+        upstream = []
+        start = threading.Barrier(10)
+
+        def lookup():
+            upstream.append(1)
+            time.sleep(0.1)  # slow Serper call
+            return {"organic": [{"title": "Jane Doe - Lockton"}]}
+
+        def caller(_):
+            start.wait()
+            return flight.do("serper:search|jane doe lockton", lookup)
+
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            results = list(pool.map(caller, range(10)))
+
+        self.assertEqual(len(upstream), 1)
+        self.assertTrue(all(r == results[0] for r in results))
+        self.assertEqual(flight.summary(), {"calls": 10, "executed": 1, "collapsed": 9, "errors": 0, "in_flight": 0})
+        print("PASSED")
+
+    def test_02_errors_reach_every_waiter(self):
+        print("\n[TEST 2] Upstream Error Shared, Not Remembered...")
+        flight = SingleFlight("test")
+        start = threading.Barrier(4)
+
+        def failing():
+            time.sleep(0.05)
+            raise RuntimeError("429 Too Many Requests")
+
+        def caller(_):
+            start.wait()
+            try:
+                flight.do("k", failing)
+            except RuntimeError as e:
+                return str(e)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            errors = list(pool.map(caller, range(4)))
+        self.assertEqual(errors, ["429 Too Many Requests"] * 4)
+
+        # The next call after completion runs again
+        self.assertEqual(flight.do("k", lambda: "ok"), "ok")
+        self.assertEqual(flight.summary()["executed"], 2)
+        print("PASSED")
+
+    def test_03_distinct_keys_run_independently(self):
+        print("\n[TEST 3] Distinct Keys Not Coalesced...")
+        flight = SingleFlight("test")
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            results = list(pool.map(lambda i: flight.do(f"firm-{i}", lambda: i * 2), range(5)))
+        self.assertEqual(results, [0, 2, 4, 6, 8])
+        self.assertEqual(flight.summary()["collapsed"], 0)
+        print("PASSED")
+
+
+if __name__ == "__main__":
+    unittest.main()
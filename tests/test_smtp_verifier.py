@@ -0,0 +1,138 @@
+import sys
+import os
+import time
+import socket
+import threading
+import unittest
+
+# Path Setup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.smtp_verifier import SmtpVerifier
+
+
+class StubSmtpServer:
+    """Minimal SMTP server: 250 for known mailboxes (or everything if catch_all), else 550."""
+
+    def __init__(self, mailboxes=(), catch_all=False, rcpt_delay=0.0):
+        self.mailboxes = {m.lower() for m in mailboxes}
+        self.catch_all = catch_all
+        self.rcpt_delay = rcpt_delay
+        self.connections = 0
+        self.rcpts = []
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(8)
+        self.port = self.sock.getsockname()[1]
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        f = conn.makefile("rb")
+        conn.sendall(b"220 stub ESMTP\r\n")
+        for line in f:
+            cmd = line.decode().strip()
+            verb = cmd.split(" ")[0].upper()
+            if verb in ("EHLO", "HELO"):
+                conn.sendall(b"250-stub\r\n250 OK\r\n")
+            elif verb in ("MAIL", "RSET", "NOOP"):
+                conn.sendall(b"250 OK\r\n")
+            elif verb == "RCPT":
+                address = cmd.split(":", 1)[1].strip().strip("<>").lower()
+                self.rcpts.append(address)
+                time.sleep(self.rcpt_delay)
+                ok = self.catch_all or address in self.mailboxes
+                conn.sendall(b"250 OK\r\n" if ok else b"550 No such user\r\n")
+            elif verb == "QUIT":
+                conn.sendall(b"221 Bye\r\n")
+                break
+            else:
+                conn.sendall(b"502 Not implemented\r\n")
+        conn.close()
+
+    def close(self):
+        self.sock.close()
+
+
+class TestSmtpVerifier(unittest.TestCase):
+
+    def _verifier(self, server, lookups, **kwargs):
+        def resolver(domain):
+            lookups.append(domain)
+            return ["127.0.0.1"], 300
+        return SmtpVerifier(resolver=resolver, port=server.port, timeout=2, **kwargs)
+
+    def test_01_one_lookup_one_session_per_domain(self):
+        print("\n[TEST 1] Hunter Permutations Share MX + Session...")
+        server = StubSmtpServer(mailboxes=["jdoe@lockton.com"])
+        lookups = []
+        with self._verifier(server, lookups) as verifier:
+            results = [verifier.verify(e) for e in
+                       ("jane.doe@lockton.com", "jdoe@lockton.com", "janedoe@lockton.com", "jane_doe@lockton.com")]
+        server.close()
+
+        self.assertEqual([ok for ok, _ in results], [False, True, False, False])
+        self.assertEqual(results[0][1], "SMTP Verify: Failed (550)")
+        self.assertEqual(lookups, ["lockton.com"])
+        self.assertEqual(server.connections, 1)  # was one connection per address
+        self.assertEqual(verifier.stats["catch_all_probes"], 1)
+        print("PASSED")
+
+    def test_02_catch_all_detected_once(self):
+        print("\n[TEST 2] Catch-All Domain Never Passes, Probed Once...")
+        server = StubSmtpServer(catch_all=True)
+        with self._verifier(server, []) as verifier:
+            results = [verifier.verify(f"{p}@alera.com") for p in ("jane.doe", "jdoe", "janedoe")]
+        server.close()
+
+        self.assertTrue(all(not ok and "Catch-all" in reason for ok, reason in results))
+        self.assertEqual(verifier.stats["catch_all_probes"], 1)
+        self.assertEqual(server.connections, 1)
+        print("PASSED")
+
+    def test_03_unreachable_host_fails_fast(self):
+        print("\n[TEST 3] Blocked Port 25 Remembered...")
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        sock.close()  # nothing listening: connection refused
+
+        verifier = SmtpVerifier(resolver=lambda d: (["127.0.0.1"], 300), port=port, timeout=1)
+        first = verifier.verify("a@x.com")
+        second = verifier.verify("b@x.com")
+        self.assertFalse(first[0])
+        self.assertTrue(second[1].startswith("SMTP Error/Block"))
+        self.assertEqual(verifier.stats["connections"], 1)
+        print("PASSED")
+
+    def test_04_concurrent_probes_bounded_per_host(self):
+        print("\n[TEST 4] 4 Permutations, 0.2s Per RCPT...")
+        emails = ["jane.doe@lockton.com", "jdoe@lockton.com", "janedoe@lockton.com", "jane_doe@lockton.com"]
+        timings = {}
+        for sessions in (1, 4):
+            server = StubSmtpServer(mailboxes=["janedoe@lockton.com"], rcpt_delay=0.2)
+            lookups = []
+            with self._verifier(server, lookups, max_sessions_per_host=sessions) as verifier:
+                start = time.perf_counter()
+                results = [f.result() for f in [verifier.submit(e) for e in emails]]
+                timings[sessions] = time.perf_counter() - start
+            server.close()
+            self.assertEqual([ok for ok, _ in results], [False, False, True, False])
+            self.assertEqual(lookups, ["lockton.com"])  # concurrent lookups coalesced
+            self.assertLessEqual(server.connections, sessions)
+        print(f"   1 session/host {timings[1]:.2f}s, 4 sessions/host {timings[4]:.2f}s")
+        self.assertGreaterEqual(timings[1], 0.8)
+        self.assertLess(timings[4], 0.6)
+        print("PASSED")
+
+
+if __name__ == "__main__":
+    unittest.main()
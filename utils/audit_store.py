@@ -0,0 +1,94 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_AUDIT_PATH = os.getenv("SCOUT_AUDIT_DB", os.path.join(PROJECT_ROOT, ".cache", "audit_fingerprints.sqlite3"))
+
+# Rows whose last verdict is older than this are re-verified even if unchanged
+REVERIFY_DAYS = float(os.getenv("SCOUT_AUDIT_REVERIFY_DAYS", "30"))
+
+
+def normalize_email_cell(value):
+    """
+    The email as entered, without the warning lines the audits append
+    ("...\\n⚠️ [NOT VERIFIED: Identity Mismatch]"), so an audit's own write
+    does not make the row look changed on the next run.
+    """
+    return str(value or "").split("\n")[0].strip().lower()
+
+
+def row_fingerprint(name, firm, linkedin, email):
+    """sha256 of the audited inputs (case/whitespace-insensitive)."""
+    parts = [" ".join(str(name or "").lower().split()),
+             " ".join(str(firm or "").lower().split()),
+             str(linkedin or "").strip().lower().rstrip("/"),
+             normalize_email_cell(email)]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+class AuditStore:
+    """
+    Last verdict per row fingerprint for one audit (SQLite, WAL). A row is skipped
+    when its fingerprint was audited within max_age; new rows, edited rows (new
+    fingerprint) and stale verdicts are re-verified. Rows are identified by content,
+    not position, so sorting or inserting rows in the sheet costs nothing.
+    """
+
+    def __init__(self, audit, path=DEFAULT_AUDIT_PATH, max_age_days=REVERIFY_DAYS):
+        self.audit = audit
+        self.path = path
+        self.max_age = max_age_days * 86400
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS audit_fingerprints (
+                audit TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                verdict TEXT NOT NULL,
+                audited_at REAL NOT NULL,
+                PRIMARY KEY (audit, fingerprint)
+            )
+        """)
+        self._conn.commit()
+
+    def fresh_verdicts(self, fingerprints):
+        """{fingerprint: verdict} for the given fingerprints audited within max_age."""
+        cutoff = time.time() - self.max_age
+        fingerprints = list(set(fingerprints))
+        found = {}
+        with self._lock:
+            for start in range(0, len(fingerprints), 500):
+                chunk = fingerprints[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT fingerprint, verdict FROM audit_fingerprints WHERE audit = ? AND audited_at >= ? "
+                    f"AND fingerprint IN ({','.join('?' * len(chunk))})",
+                    [self.audit, cutoff, *chunk],
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def record_many(self, verdicts):
+        """verdicts: [(fingerprint, verdict)], stamped now."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO audit_fingerprints (audit, fingerprint, verdict, audited_at) VALUES (?, ?, ?, ?)",
+                [(self.audit, fp, verdict, now) for fp, verdict in verdicts],
+            )
+            self._conn.commit()
+
+    def reset(self):
+        """Forgets every verdict of this audit (next run is a full pass)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM audit_fingerprints WHERE audit = ?", (self.audit,))
+            self._conn.commit()
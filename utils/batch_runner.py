@@ -0,0 +1,181 @@
+import os
+import csv
+import glob
+import json
+import hashlib
+import datetime
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = int(os.getenv("SCOUT_BATCH_WORKERS", 4))
+
+
+def resumable_output_path(input_path, prefix):
+    """
+    Output CSV for a batch over input_path. An unfinished run of the same input
+    (same content hash, journal still present) is resumed: its path is returned.
+    Otherwise a new '<prefix>_<input name>_<hash>_<timestamp>.csv', so a finished
+    output is never overwritten or paid for twice.
+    """
+    with open(input_path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:8]
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    base = f"{prefix}_{stem}_{digest}"
+    unfinished = glob.glob(glob.escape(base) + "_*.csv.journal")
+    if unfinished:
+        return max(unfinished, key=os.path.getmtime)[:-len(".journal")]
+    return f"{base}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+
+
+class OrderedCsvWriter:
+    """
+    Streams rows to a CSV in input order while they complete out of order.
+
+    add(index, row) first appends the row to a JSONL journal (flushed), then writes
+    every row that is now next in line to the CSV (flushed). A row finished ahead
+    of a slow earlier one waits in memory, but it is already in the journal, so a
+    crash loses nothing: reopening the same output replays the journal (completed
+    holds the replayed indexes) and the CSV is rebuilt in order. skip(index) marks
+    an input that produced no row; skip(index, failed=True) one whose worker raised:
+    streaming moves past it, but it is not replayed as completed (failed holds
+    these), so reopening the output retries it. close() removes the journal once
+    every input completed; otherwise it writes the rows still waiting behind
+    unfinished inputs (leaving gaps) and keeps the journal for the resume.
+    """
+
+    def __init__(self, path, fieldnames, journal_path=None):
+        self.path = path
+        self.fieldnames = fieldnames
+        self.journal_path = journal_path or f"{path}.journal"
+        self._lock = threading.Lock()
+        self._pending = {}  # index -> row or None (skipped)
+        self._next = 0
+        self.written = 0
+        self.completed = {}
+        self.failed = set()
+
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from a crash
+                    if not entry.get("failed"):
+                        self.completed[entry["i"]] = entry["row"]
+            logger.info(f"Resuming {path}: {len(self.completed)} rows from journal")
+
+        self._csv_file = open(path, 'w', newline='')
+        self._writer = csv.DictWriter(self._csv_file, fieldnames=fieldnames, extrasaction='ignore')
+        self._writer.writeheader()
+        self._journal = open(self.journal_path, 'a')
+        self._pending.update(self.completed)
+        with self._lock:
+            self._drain()
+
+    def add(self, index, row, failed=False):
+        entry = {"i": index, "row": row, "failed": True} if failed else {"i": index, "row": row}
+        with self._lock:
+            self._journal.write(json.dumps(entry, default=str) + "\n")
+            self._journal.flush()
+            if failed:
+                self.failed.add(index)
+            else:
+                self.failed.discard(index)
+            self._pending[index] = row
+            self._drain()
+
+    def skip(self, index, failed=False):
+        self.add(index, None, failed)
+
+    def _drain(self):
+        while self._next in self._pending:
+            row = self._pending.pop(self._next)
+            if row is not None:
+                self._writer.writerow(row)
+                self.written += 1
+            self._next += 1
+        self._csv_file.flush()
+
+    def close(self):
+        with self._lock:
+            waiting = len(self._pending)
+            for index in sorted(self._pending):
+                row = self._pending.pop(index)
+                if row is not None:
+                    self._writer.writerow(row)
+                    self.written += 1
+            failed = len(self.failed)
+            self._csv_file.close()
+            self._journal.close()
+        if not waiting and not failed:
+            os.remove(self.journal_path)
+        else:
+            logger.warning(f"{failed} failed and {waiting} out-of-order rows; keeping {self.journal_path} to resume")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class ConcurrentBatchRunner:
+    """
+    Runs process(item) -> row over a list of items on a worker pool and streams
+    the rows to an OrderedCsvWriter. At most `workers` items are in flight, so
+    throughput is set by the upstream rate limiters the workers draw from, not
+    by sleeps. Items already in the writer's journal are not run again.
+
+    A worker exception is reported through on_error(item, exc) and the item is
+    skipped as failed: later rows keep streaming, and resuming the same output
+    retries it. on_result(item, row) sees every row as it completes.
+    Returns the rows in input order (None for skipped or failed items).
+    """
+
+    def __init__(self, process, workers=DEFAULT_WORKERS, on_result=None, on_error=None):
+        self.process = process
+        self.workers = max(1, workers)
+        self.on_result = on_result
+        self.on_error = on_error
+
+    def run(self, items, writer):
+        results = [None] * len(items)
+        for index, row in writer.completed.items():
+            if index < len(items):
+                results[index] = row
+        todo = iter([i for i in range(len(items)) if i not in writer.completed])
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch") as pool:
+            in_flight = {}
+            while True:
+                while len(in_flight) < self.workers:
+                    index = next(todo, None)
+                    if index is None:
+                        break
+                    in_flight[pool.submit(self.process, items[index])] = index
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = in_flight.pop(future)
+                    try:
+                        row = future.result()
+                    except Exception as e:
+                        if self.on_error:
+                            self.on_error(items[index], e)
+                        writer.skip(index, failed=True)
+                        continue
+                    results[index] = row
+                    if row is None:
+                        writer.skip(index)
+                        continue
+                    writer.add(index, row)
+                    if self.on_result:
+                        self.on_result(items[index], row)
+        return results
@@ -0,0 +1,311 @@
+import os
+import json
+import time
+import random
+import base64
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Credentials never reach a fixture file or a match key
+SECRET_FIELDS = {"api_key", "apikey", "key", "token", "access_token", "x-api-key"}
+
+MODES = ("replay", "record", "auto")
+
+_active = None  # cassette installed by env_cassette(), if any
+
+
+class CassetteMiss(Exception):
+    """Replay mode and no recorded interaction matches the call."""
+
+
+class _TextResponse:
+    """Replayed Gemini response: callers only read .text."""
+
+    def __init__(self, text):
+        self.text = text
+
+
+def _strip_secrets(value):
+    if isinstance(value, dict):
+        return {k: _strip_secrets(v) for k, v in value.items() if k.lower() not in SECRET_FIELDS}
+    if isinstance(value, list):
+        return [_strip_secrets(v) for v in value]
+    return value
+
+
+def _clean_url(url):
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k.lower() not in SECRET_FIELDS)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+def _clean_body(body):
+    """Request body as match material: JSON is parsed, sorted and stripped of secrets."""
+    if body is None:
+        return None
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    try:
+        return _strip_secrets(json.loads(body))
+    except (TypeError, ValueError):
+        return body
+
+
+class Cassette:
+    """
+    Record/replay for external calls, for reproducible offline benchmarks.
+
+    record  -- every call goes upstream and its response is stored
+    replay  -- calls are answered from the fixture file; unknown calls raise CassetteMiss
+    auto    -- replay what is recorded, record the rest
+
+    HTTP calls made with `requests` (Serper, PDL, Tavily, Graph) are captured at the
+    transport adapter, below retries, SingleFlight and the token buckets, so those
+    still run as in production. Non-HTTP SDK calls (Gemini) go through wrap()/wrap_model().
+    Identical calls replay their recordings in order (the last one repeats).
+
+    Replays sleep `latency` seconds (+/- uniform `jitter`, seeded) to model the
+    upstream; latency may be a float or a {host_or_namespace: seconds} dict with
+    an optional "default". Point SCOUT_CACHE_DB at an empty file while benchmarking,
+    otherwise the response cache answers before the cassette is reached.
+
+    Entry points (recon_agent, draft_prep, execute_broker_hunter, seed_mvp) run
+    under env_cassette(), so setting SCOUT_CASSETTE is enough to record or replay.
+    """
+
+    def __init__(self, path, mode="replay", latency=0.0, jitter=0.0, seed=0):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._interactions = {}
+        self._cursor = {}
+        self._dirty = False
+        self.stats = {"replayed": 0, "recorded": 0, "misses": 0, "by_source": {}}
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                self._interactions = json.load(f).get("interactions", {})
+
+    # --- Storage ---
+
+    def _key(self, source, request):
+        blob = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(f"{source}|{blob}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, key):
+        with self._lock:
+            recorded = self._interactions.get(key)
+            if not recorded:
+                return None
+            i = self._cursor.get(key, 0)
+            self._cursor[key] = i + 1
+            return recorded[min(i, len(recorded) - 1)]
+
+    def _store(self, key, request, source, response):
+        with self._lock:
+            self._interactions.setdefault(key, []).append(
+                {"source": source, "request": request, "response": response})
+            self._cursor[key] = self._cursor.get(key, 0) + 1
+            self._dirty = True
+
+    def save(self):
+        """Writes the fixture file atomically (temp file + rename)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"version": 1, "interactions": self._interactions}, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+            self._dirty = False
+
+    # --- Replay timing ---
+
+    def _delay(self, source):
+        latency = self.latency
+        if isinstance(latency, dict):
+            latency = latency.get(source, latency.get("default", 0.0))
+        if self.jitter:
+            with self._lock:
+                latency += self._rng.uniform(-self.jitter, self.jitter)
+        if latency > 0:
+            time.sleep(latency)
+
+    def _count(self, source, outcome):
+        with self._lock:
+            self.stats[outcome] += 1
+            self.stats["by_source"][source] = self.stats["by_source"].get(source, 0) + 1
+
+    # --- Generic calls ---
+
+    def call(self, source, request, fn, encode=None, decode=None):
+        """
+        Record/replay one call. `request` (JSON-able) identifies it; fn() makes the
+        real call. encode/decode convert the result to and from JSON when needed.
+        """
+        request = _strip_secrets(request)
+        key = self._key(source, request)
+        if self.mode != "record":
+            recorded = self._lookup(key)
+            if recorded is not None:
+                self._count(source, "replayed")
+                self._delay(source)
+                response = recorded["response"]
+                return decode(response) if decode else response
+            if self.mode == "replay":
+                self._count(source, "misses")
+                raise CassetteMiss(f"No recording for {source} {json.dumps(request, default=str)[:200]}")
+
+        result = fn()
+        self._store(key, request, source, encode(result) if encode else result)
+        self._count(source, "recorded")
+        return result
+
+    def wrap(self, source, fn, encode=None, decode=None):
+        """fn(*args, **kwargs) under the cassette, keyed on its arguments."""
+        def wrapper(*args, **kwargs):
+            return self.call(source, {"args": list(args), "kwargs": kwargs},
+                             lambda: fn(*args, **kwargs), encode, decode)
+        return wrapper
+
+    def wrap_model(self, model, source="gemini"):
+        """A Gemini GenerativeModel whose generate_content() is recorded as response.text."""
+        cassette = self
+
+        class _Model:
+            def __getattr__(self, name):
+                return getattr(model, name)
+
+            def generate_content(self, contents, **kwargs):
+                return cassette.call(
+                    source, {"contents": contents, "kwargs": kwargs},
+                    lambda: model.generate_content(contents, **kwargs),
+                    encode=lambda r: r.text, decode=_TextResponse,
+                )
+
+        return _Model()
+
+    # --- HTTP (requests) ---
+
+    @contextmanager
+    def activate(self):
+        """
+        Routes every requests.Session (including already-built pooled sessions and the
+        module-level requests.get/post) through the cassette. Saves the fixture on exit.
+        """
+        import requests
+
+        adapter = _cassette_adapter(self)
+        original = requests.Session.get_adapter
+
+        def get_adapter(session, url):
+            if url.lower().startswith(("http://", "https://")):
+                return adapter
+            return original(session, url)
+
+        requests.Session.get_adapter = get_adapter
+        try:
+            yield self
+        finally:
+            requests.Session.get_adapter = original
+            self.save()
+
+    def summary(self):
+        with self._lock:
+            return {**self.stats, "by_source": dict(self.stats["by_source"]),
+                    "interactions": sum(len(v) for v in self._interactions.values())}
+
+
+def _cassette_adapter(cassette):
+    from requests.adapters import HTTPAdapter
+    from requests.models import Response
+    from requests.structures import CaseInsensitiveDict
+    from requests.exceptions import ConnectionError as RequestsConnectionError
+
+    class CassetteAdapter(HTTPAdapter):
+        def send(self, request, **kwargs):
+            source = urlsplit(request.url).netloc
+            match = {"method": request.method, "url": _clean_url(request.url), "body": _clean_body(request.body)}
+
+            def real():
+                r = super(CassetteAdapter, self).send(request, **kwargs)
+                return {
+                    "status": r.status_code,
+                    "headers": {k: v for k, v in r.headers.items()
+                                if k.lower() in ("content-type", "retry-after")},
+                    "body": base64.b64encode(r.content).decode("ascii"),
+                }
+
+            try:
+                recorded = cassette.call(source, match, real)
+            except CassetteMiss as e:
+                # Callers already handle connection errors; a miss degrades the same way
+                raise RequestsConnectionError(str(e), request=request)
+
+            response = Response()
+            response.status_code = recorded["status"]
+            response.headers = CaseInsensitiveDict(recorded["headers"])
+            response._content = base64.b64decode(recorded["body"])
+            response.url = request.url
+            response.request = request
+            response.encoding = "utf-8"
+            response.reason = "Replayed" if cassette.mode != "record" else "Recorded"
+            return response
+
+    return CassetteAdapter()
+
+
+def cassette_from_env():
+    """
+    Cassette configured by SCOUT_CASSETTE (fixture path), SCOUT_CASSETTE_MODE,
+    SCOUT_CASSETTE_LATENCY and SCOUT_CASSETTE_JITTER (seconds); None if unset.
+    """
+    path = os.getenv("SCOUT_CASSETTE")
+    if not path:
+        return None
+    return Cassette(
+        path,
+        mode=os.getenv("SCOUT_CASSETTE_MODE", "replay"),
+        latency=float(os.getenv("SCOUT_CASSETTE_LATENCY", "0")),
+        jitter=float(os.getenv("SCOUT_CASSETTE_JITTER", "0")),
+    )
+
+
+@contextmanager
+def env_cassette():
+    """
+    Entry-point hook: routes the block's HTTP calls through the SCOUT_CASSETTE
+    cassette and lets wrap_gemini() record/replay Gemini. No-op when unset.
+    Yields the cassette (or None); logs its summary on exit.
+    """
+    global _active
+    cassette = cassette_from_env()
+    if cassette is None:
+        yield None
+        return
+    with cassette.activate():
+        _active = cassette
+        try:
+            yield cassette
+        finally:
+            _active = None
+            logger.info(f"Cassette {cassette.path} ({cassette.mode}): {cassette.summary()}")
+
+
+def wrap_gemini(model, source="gemini"):
+    """model under the active env_cassette(); unchanged when none is active."""
+    if _active is None or model is None:
+        return model
+    return _active.wrap_model(model, source)
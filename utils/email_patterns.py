@@ -0,0 +1,158 @@
+import os
+import re
+import time
+import sqlite3
+import logging
+import threading
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_PATTERN_PATH = os.getenv("SCOUT_PATTERN_DB", os.path.join(PROJECT_ROOT, ".cache", "email_patterns.sqlite3"))
+
+# Local-part templates, in the order hunter_search tries them when nothing is learned
+PATTERNS = {
+    "first.last": lambda f, l: f"{f}.{l}",
+    "flast": lambda f, l: f"{f[0]}{l}",
+    "firstlast": lambda f, l: f"{f}{l}",
+    "first_last": lambda f, l: f"{f}_{l}",
+    "f.last": lambda f, l: f"{f[0]}.{l}",
+    "firstl": lambda f, l: f"{f}{l[0]}",
+    "first": lambda f, l: f,
+    "last.first": lambda f, l: f"{l}.{f}",
+}
+
+# A learned pattern is trusted once it has verified at least MIN_HITS addresses
+# and holds up for MIN_CONFIDENCE of the leads it was tried on.
+MIN_HITS = 1
+MIN_CONFIDENCE = 0.6
+
+FREE_PROVIDERS = {'gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 'aol.com'}
+
+# Only addresses hunter_search actually verified teach a pattern; an address merely
+# scraped from a snippet may be stale or someone else's.
+VERIFIED_SOURCES = {"SMTP_VERIFIED", "SEARCH_VERIFIED"}
+
+
+def _clean(name):
+    return re.sub(r'[^a-z]', '', str(name or "").lower())
+
+
+def render(pattern, first, last):
+    """'first.last', 'Jane', 'Doe' -> 'jane.doe' (None if the name can't fill it)."""
+    f, l = _clean(first), _clean(last)
+    if not f or not l or pattern not in PATTERNS:
+        return None
+    return PATTERNS[pattern](f, l)
+
+
+def infer(email, first, last):
+    """The pattern an address follows for this person, or None."""
+    local = email.split('@')[0].lower()
+    for pattern in PATTERNS:
+        if render(pattern, first, last) == local:
+            return pattern
+    return None
+
+
+class DomainPatternStore:
+    """
+    Email patterns learned per domain (SQLite, WAL): every verified address adds a
+    hit for its pattern, every failed try of a learned pattern adds a miss. Shared
+    by every script on the machine, so one verified lead at a firm speeds up the rest.
+    """
+
+    def __init__(self, path=DEFAULT_PATTERN_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS domain_patterns (
+                domain TEXT NOT NULL,
+                pattern TEXT NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                misses INTEGER NOT NULL DEFAULT 0,
+                last_source TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (domain, pattern)
+            )
+        """)
+        self._conn.commit()
+
+    def _bump(self, domain, pattern, hits, misses, source=None):
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO domain_patterns (domain, pattern, hits, misses, last_source, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (domain, pattern) DO UPDATE SET
+                    hits = hits + excluded.hits,
+                    misses = misses + excluded.misses,
+                    last_source = COALESCE(excluded.last_source, last_source),
+                    updated_at = excluded.updated_at
+                """,
+                (domain.lower(), pattern, hits, misses, source, time.time()),
+            )
+            self._conn.commit()
+
+    def record_hit(self, email, first, last, source):
+        """
+        A verified address: learn its pattern. Returns the pattern (None if
+        unrecognised or not learned: free mail, or a source outside VERIFIED_SOURCES).
+        """
+        if source not in VERIFIED_SOURCES:
+            return None
+        domain = email.split('@')[-1].lower()
+        pattern = infer(email, first, last)
+        if pattern and domain not in FREE_PROVIDERS:
+            self._bump(domain, pattern, 1, 0, source)
+        return pattern
+
+    def record_miss(self, domain, pattern):
+        self._bump(domain, pattern, 0, 1)
+
+    def best(self, domain):
+        """(pattern, hits, confidence) of the trusted pattern for a domain, or None."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT pattern, hits, misses FROM domain_patterns WHERE domain = ? ORDER BY hits DESC, misses ASC",
+                (domain.lower(),),
+            ).fetchall()
+        for pattern, hits, misses in rows:
+            confidence = hits / (hits + misses)
+            if hits >= MIN_HITS and confidence >= MIN_CONFIDENCE:
+                return pattern, hits, confidence
+        return None
+
+    def candidates(self, first, last, domain, patterns=None):
+        """
+        [(pattern, email)] to try for a person: the domain's learned pattern first,
+        then the remaining patterns in their default order.
+        """
+        order = list(patterns or PATTERNS)
+        learned = self.best(domain)
+        if learned:
+            order = [learned[0]] + [p for p in order if p != learned[0]]
+        out = []
+        for pattern in order:
+            local = render(pattern, first, last)
+            if local:
+                out.append((pattern, f"{local}@{domain.lower()}"))
+        return out
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_pattern_store():
+    """Process-wide store at DEFAULT_PATTERN_PATH."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = DomainPatternStore()
+        return _default_store
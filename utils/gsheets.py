@@ -1 +1,114 @@
 # Google Sheets Utility
+import logging
+import threading
+
+from utils.rate_limiter import get_limiter, retry_after_seconds
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def col_to_letters(col):
+    """1 -> A, 27 -> AA"""
+    letters = ""
+    while col:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _is_quota_error(e):
+    response = getattr(e, "response", None)
+    return getattr(response, "status_code", None) == 429 or "RESOURCE_EXHAUSTED" in str(e)
+
+
+class SheetWriteBuffer:
+    """
+    Drop-in for worksheet.update_cell that buffers cell writes and sends them as
+    ranged worksheet.batch_update calls: adjacent cells in a row become one range,
+    and one call carries every buffered row. API calls go from O(cells) to O(batches).
+
+    Thread-safe; a later write to the same cell replaces the buffered one. Flushes
+    when `max_cells` are buffered, on flush(), and on leaving a `with` block.
+    Each call draws from the shared "gsheets" bucket; quota errors (429) back the
+    bucket off and retry. Reads and anything else pass through to the worksheet.
+    """
+
+    def __init__(self, worksheet, max_cells=200, retries=5, value_input_option="USER_ENTERED"):
+        self.worksheet = worksheet
+        self.max_cells = max_cells
+        self.retries = retries
+        self.value_input_option = value_input_option
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self.stats = {"cells": 0, "api_calls": 0, "retries": 0}
+
+    def update_cell(self, row, col, value):
+        with self._lock:
+            self._pending[(row, col)] = value
+            self.stats["cells"] += 1
+            full = len(self._pending) >= self.max_cells
+        if full:
+            self.flush()
+
+    def _ranges(self, cells):
+        """{(row, col): value} -> batch_update data, one range per run of adjacent cells."""
+        data = []
+        for row, col in sorted(cells):
+            value = cells[(row, col)]
+            last = data[-1] if data else None
+            if last and last["_row"] == row and last["_end"] == col - 1:
+                last["values"][0].append(value)
+                last["_end"] = col
+            else:
+                data.append({"_row": row, "_start": col, "_end": col, "values": [[value]]})
+        return [
+            {"range": f"{col_to_letters(d['_start'])}{d['_row']}:{col_to_letters(d['_end'])}{d['_row']}",
+             "values": d["values"]}
+            for d in data
+        ]
+
+    def flush(self):
+        """Writes everything buffered. On failure the cells are put back and the error raised."""
+        with self._flush_lock:
+            with self._lock:
+                cells, self._pending = self._pending, {}
+            if not cells:
+                return 0
+
+            bucket = get_limiter("gsheets")
+            data = self._ranges(cells)
+            for attempt in range(self.retries):
+                bucket.acquire()
+                try:
+                    self.worksheet.batch_update(data, value_input_option=self.value_input_option)
+                    bucket.success()
+                    self.stats["api_calls"] += 1
+                    return len(cells)
+                except Exception as e:
+                    if not _is_quota_error(e) or attempt == self.retries - 1:
+                        with self._lock:
+                            # Newer writes made meanwhile win over the failed ones
+                            self._pending = {**cells, **self._pending}
+                        logger.error(f"Sheet flush failed ({len(cells)} cells): {e}")
+                        raise
+                    self.stats["retries"] += 1
+                    wait = retry_after_seconds(getattr(e, "response", None)) or 2 ** attempt
+                    logger.warning(f"Sheets quota hit, retrying flush in {wait}s ({attempt + 1}/{self.retries})")
+                    bucket.penalize(wait)
+            return 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pending)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self.worksheet, name)
@@ -0,0 +1,196 @@
+import os
+import copy
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from utils.response_cache import get_default_cache, make_key
+from utils.single_flight import SingleFlight
+from utils.rate_limiter import send_with_limits
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+PDL_BASE_URL = "https://api.peopledatalabs.com/v5"
+
+# Cache freshness per endpoint (seconds). Company identities barely move; who
+# holds a title at a firm moves faster.
+DEFAULT_TTLS = {
+    "company/enrich": 30 * 24 * 3600,
+    "person/search": 7 * 24 * 3600,
+    "person/enrich": 30 * 24 * 3600,
+}
+# "No match" (404) answers are cached too, but for less time
+NOT_FOUND_TTL = 24 * 3600
+# Records per person/bulk request (PDL maximum)
+BULK_MAX_RECORDS = 100
+
+# Parameters compared case- and whitespace-insensitively in cache keys
+_TEXT_PARAMS = {"name", "location", "website", "profile", "company", "sql"}
+
+# Identical PDL lookups in flight at the same time (API + baker + scripts in one
+# process) share one billed call.
+pdl_flight = SingleFlight("pdl")
+
+
+def normalize_pdl_params(params):
+    """Cache-key form: text params lowercased/space-collapsed, websites without scheme/www."""
+    clean = {}
+    for key, value in (params or {}).items():
+        if value is None or key == "pretty":
+            continue
+        if key in _TEXT_PARAMS and isinstance(value, str):
+            value = " ".join(value.lower().split())
+            if key == "website":
+                value = value.split("://")[-1].removeprefix("www.").rstrip("/")
+        clean[key] = value
+    return clean
+
+
+class PdlClient:
+    """
+    One PDL client for every caller: pooled HTTP session, the shared "pdl" token
+    bucket, single-flight for identical concurrent calls, and the on-disk
+    ResponseCache keyed by endpoint + normalized parameters. Repeat lookups within
+    the endpoint TTL cost no credits and no network round trip.
+
+    get() returns (status_code, body). Only 200 and 404 answers are cached; other
+    statuses are returned uncached and network errors raise (requests exceptions).
+    bulk_enrich() is the many-records form of get("person/enrich") and shares its cache.
+    """
+
+    def __init__(self, api_key=None, cache=None, ttls=None, timeout=30):
+        self.api_key = api_key or os.getenv("PDL_API_KEY")
+        self.cache = cache if cache is not None else get_default_cache()
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.timeout = timeout
+        self.calls = 0  # real API calls made by this client
+        self.bulk_records = 0  # records sent through person/bulk
+        self._calls_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+        self.session.mount("https://", adapter)
+
+    def get(self, endpoint, params, ttl=None, use_cache=True):
+        ttl = self.ttls.get(endpoint, 0) if ttl is None else ttl
+        namespace = f"pdl:{endpoint}"
+        key_params = normalize_pdl_params(params)
+
+        if use_cache and ttl:
+            for ns, age, status in ((namespace, ttl, 200), (f"{namespace}:404", min(ttl, NOT_FOUND_TTL), 404)):
+                cached = self.cache.get(ns, key_params, age)
+                if cached is not None:
+                    return status, cached
+
+        def fetch():
+            response = send_with_limits("pdl", lambda: self.session.get(
+                f"{PDL_BASE_URL}/{endpoint}", params=params,
+                headers={"X-Api-Key": self.api_key}, timeout=self.timeout))
+            with self._calls_lock:
+                self.calls += 1
+            try:
+                body = response.json()
+            except ValueError:
+                body = {"error": response.text}
+            if use_cache and response.status_code == 200:
+                self.cache.set(namespace, key_params, body)
+            elif use_cache and response.status_code == 404:
+                self.cache.set(f"{namespace}:404", key_params, body)
+            return response.status_code, body
+
+        # Followers share the leader's response; hand each caller its own copy
+        return copy.deepcopy(pdl_flight.do(make_key(namespace, key_params), fetch))
+
+    def bulk_enrich(self, params_list, max_records=None, use_cache=True):
+        """
+        Person enrichment for many records: cache hits are answered locally, the
+        rest are sent to person/bulk in requests of up to BULK_MAX_RECORDS.
+
+        Returns a list aligned with params_list of (status, body), where body has
+        the same shape as a person/enrich response (per-record 404s and errors are
+        kept per record). Identical records are sent once. At most max_records
+        uncached records are sent (a caller's credit budget); the rest come back as
+        None. If a bulk request itself fails, its records get that status and body.
+        """
+        endpoint = "person/enrich"
+        namespace = f"pdl:{endpoint}"
+        ttl = self.ttls[endpoint]
+        results = [None] * len(params_list)
+        pending = {}  # cache key -> (params, key_params, [indexes])
+
+        for i, params in enumerate(params_list):
+            key_params = normalize_pdl_params(params)
+            if use_cache:
+                cached = self.cache.get(namespace, key_params, ttl)
+                if cached is not None:
+                    results[i] = (200, cached)
+                    continue
+                cached = self.cache.get(f"{namespace}:404", key_params, min(ttl, NOT_FOUND_TTL))
+                if cached is not None:
+                    results[i] = (404, cached)
+                    continue
+            key = make_key(namespace, key_params)
+            if key not in pending:
+                pending[key] = (params, key_params, [])
+            pending[key][2].append(i)
+
+        todo = list(pending.values())
+        if max_records is not None:
+            todo = todo[:max(0, max_records)]
+
+        for start in range(0, len(todo), BULK_MAX_RECORDS):
+            chunk = todo[start:start + BULK_MAX_RECORDS]
+            for (_, key_params, indexes), (status, body) in zip(chunk, self._post_bulk(chunk)):
+                if use_cache and status == 200:
+                    self.cache.set(namespace, key_params, body)
+                elif use_cache and status == 404:
+                    self.cache.set(f"{namespace}:404", key_params, body)
+                for i in indexes:
+                    results[i] = (status, copy.deepcopy(body))
+        return results
+
+    def _post_bulk(self, chunk):
+        """One person/bulk call; [(status, body)] in chunk order."""
+        payload = {"requests": [{"params": {k: v for k, v in params.items() if k != "pretty"},
+                                 "metadata": {"index": n}}
+                                for n, (params, _, _) in enumerate(chunk)]}
+        response = send_with_limits("pdl", lambda: self.session.post(
+            f"{PDL_BASE_URL}/person/bulk", json=payload,
+            headers={"X-Api-Key": self.api_key}, timeout=self.timeout))
+        with self._calls_lock:
+            self.calls += 1
+            self.bulk_records += len(chunk)
+        try:
+            body = response.json()
+        except ValueError:
+            body = {"error": response.text}
+        if response.status_code != 200 or not isinstance(body, list):
+            logger.warning(f"PDL bulk enrich failed ({response.status_code}) for {len(chunk)} records")
+            return [(response.status_code, body)] * len(chunk)
+
+        # Responses carry our metadata back; fall back to request order without it
+        out = [(500, {"error": "Missing from bulk response"})] * len(chunk)
+        for n, item in enumerate(body):
+            index = (item.get("metadata") or {}).get("index", n)
+            if isinstance(index, int) and 0 <= index < len(chunk):
+                item = {k: v for k, v in item.items() if k != "metadata"}
+                out[index] = (item.get("status", 500), item)
+        return out
+
+    def stats(self):
+        return {"api_calls": self.calls, "bulk_records": self.bulk_records, **self.cache.summary(),
+                "single_flight": pdl_flight.summary()}
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_pdl_client():
+    """Process-wide PdlClient (shared session + cache)."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = PdlClient()
+        return _default_client
@@ -0,0 +1,205 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_STATE_PATH = os.getenv("SCOUT_RATE_DB", os.path.join(PROJECT_ROOT, ".cache", "rate_limits.sqlite3"))
+
+# Sustained calls/second and burst per upstream (the published/observed safe rates).
+DEFAULT_LIMITS = {
+    "serper": (5.0, 5),
+    "pdl": (2.0, 2),
+    "tavily": (2.0, 2),
+    "gemini": (1.0, 1),
+    "graph": (4.0, 4),
+    "gsheets": (1.0, 1),  # Sheets API: 60 writes/min per user
+}
+
+# Adaptive (AIMD): every 429 halves the effective rate down to MIN_FACTOR;
+# every success after that wins back RECOVERY_STEP of the configured rate.
+MIN_FACTOR = 0.1
+RECOVERY_STEP = 0.05
+
+
+class TokenBucket:
+    """
+    Token bucket for one upstream.
+
+    With shared=True the bucket state (tokens, 429 back-off, adaptive factor) lives in a
+    SQLite row, so every thread and every process on the machine draws from the same
+    bucket (BEGIN IMMEDIATE serializes the read-modify-write). rate <= 0 disables it.
+    """
+
+    def __init__(self, name, rate, burst=None, state_path=DEFAULT_STATE_PATH, shared=True):
+        self.name = name
+        self.configure(rate, burst)
+        self._conn, self._lock = _connection(state_path) if shared and state_path else (None, threading.Lock())
+        self._local = {"tokens": self.burst, "updated": time.time(), "factor": 1.0, "blocked_until": 0.0}
+        self._factor_seen = 1.0
+        self.stats = {"acquired": 0, "waited_s": 0.0, "throttled": 0}
+
+    def configure(self, rate, burst=None):
+        self.rate = float(rate or 0)
+        self.burst = float(max(1, burst or self.rate or 1))
+
+    @property
+    def enabled(self):
+        return self.rate > 0
+
+    def acquire(self, tokens=1.0):
+        """Blocks until `tokens` are available. Returns the seconds waited."""
+        if not self.enabled:
+            return 0.0
+        waited = 0.0
+        while True:
+            wait = self._try_take(tokens)
+            if wait <= 0:
+                break
+            time.sleep(wait)
+            waited += wait
+        with self._lock:
+            self.stats["acquired"] += 1
+            self.stats["waited_s"] += waited
+        return waited
+
+    def penalize(self, retry_after=None):
+        """429 seen: pause the bucket (Retry-After if given) and halve the effective rate."""
+        if not self.enabled:
+            if retry_after:
+                time.sleep(retry_after)
+            return
+        with self._state() as st:
+            now = time.time()
+            st["factor"] = max(MIN_FACTOR, st["factor"] * 0.5)
+            pause = retry_after if retry_after else 1.0 / (self.rate * st["factor"])
+            st["blocked_until"] = max(st["blocked_until"], now + pause)
+            st["tokens"] = 0.0
+            st["updated"] = now
+            self._factor_seen = st["factor"]
+        self.stats["throttled"] += 1
+        logger.warning(f"[RateLimit] {self.name}: 429, pausing {pause:.1f}s, rate now "
+                       f"{self.rate * self._factor_seen:.2f}/s")
+
+    def success(self):
+        """Call after a non-429 response; recovers the rate after a back-off."""
+        if not self.enabled or self._factor_seen >= 1.0:
+            return
+        with self._state() as st:
+            st["factor"] = min(1.0, st["factor"] + RECOVERY_STEP)
+            self._factor_seen = st["factor"]
+
+    def _try_take(self, tokens):
+        """Takes tokens if available (returns 0), else returns the seconds to wait."""
+        with self._state() as st:
+            now = time.time()
+            self._factor_seen = st["factor"]
+            if now < st["blocked_until"]:
+                return st["blocked_until"] - now
+            rate = self.rate * st["factor"]
+            st["tokens"] = min(self.burst, st["tokens"] + max(0.0, now - st["updated"]) * rate)
+            st["updated"] = now
+            if st["tokens"] >= tokens:
+                st["tokens"] -= tokens
+                return 0.0
+            return (tokens - st["tokens"]) / rate
+
+    @contextmanager
+    def _state(self):
+        with self._lock:
+            if self._conn is None:
+                yield self._local
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT tokens, updated, factor, blocked_until FROM buckets WHERE name = ?", (self.name,)
+                ).fetchone()
+                st = dict(zip(("tokens", "updated", "factor", "blocked_until"), row)) if row else \
+                    {"tokens": self.burst, "updated": time.time(), "factor": 1.0, "blocked_until": 0.0}
+                yield st
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (name, tokens, updated, factor, blocked_until) VALUES (?, ?, ?, ?, ?)",
+                    (self.name, st["tokens"], st["updated"], st["factor"], st["blocked_until"]),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+
+_connections = {}
+_connections_lock = threading.Lock()
+
+
+def _connection(path):
+    """One SQLite connection (and lock) per state file per process."""
+    with _connections_lock:
+        if path not in _connections:
+            if path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS buckets (
+                    name TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    factor REAL NOT NULL DEFAULT 1.0,
+                    blocked_until REAL NOT NULL DEFAULT 0
+                )
+            """)
+            _connections[path] = (conn, threading.Lock())
+        return _connections[path]
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name, rate=None, burst=None):
+    """
+    Process-wide bucket for an upstream (shared across processes via DEFAULT_STATE_PATH).
+    Passing rate/burst reconfigures it for this process; rate=0 turns it off.
+    """
+    with _limiters_lock:
+        bucket = _limiters.get(name)
+        if bucket is None:
+            default_rate, default_burst = DEFAULT_LIMITS.get(name, (0, 1))
+            bucket = _limiters[name] = TokenBucket(
+                name, default_rate if rate is None else rate, burst or default_burst)
+        elif rate is not None:
+            bucket.configure(rate, burst)
+        return bucket
+
+
+def retry_after_seconds(response):
+    """Retry-After header (seconds form) of a response, or None."""
+    value = (getattr(response, "headers", None) or {}).get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def send_with_limits(name, send, retries=5):
+    """
+    Runs send() (returns a requests.Response) under the `name` bucket. On 429 the bucket
+    backs off (honouring Retry-After) and the call is retried, up to `retries` times.
+    Returns the last response.
+    """
+    bucket = get_limiter(name)
+    response = None
+    for _ in range(retries):
+        bucket.acquire()
+        response = send()
+        if response.status_code != 429:
+            bucket.success()
+            return response
+        bucket.penalize(retry_after_seconds(response))
+    return response
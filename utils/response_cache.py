@@ -0,0 +1,125 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_CACHE_PATH = os.getenv("SCOUT_CACHE_DB", os.path.join(PROJECT_ROOT, ".cache", "responses.sqlite3"))
+
+
+def normalize_params(params):
+    """
+    Canonical form of request parameters for cache keys.
+    Drops None values; the query text ("q") is case- and whitespace-insensitive.
+    """
+    clean = {}
+    for key, value in (params or {}).items():
+        if value is None:
+            continue
+        if key == "q" and isinstance(value, str):
+            value = " ".join(value.lower().split())
+        clean[key] = value
+    return clean
+
+
+def make_key(namespace, params):
+    """'serper:search' + {"q": "Jane  Doe"} -> sha256 hex (same for "jane doe")."""
+    blob = json.dumps(normalize_params(params), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{namespace}|{blob}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Persistent JSON response cache (SQLite, WAL) shared by every script on the machine.
+    Entries are stored with their fetch time; the TTL is applied on read, so different
+    callers can use different freshness for the same stored response.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                params TEXT NOT NULL,
+                body TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_ns ON responses(namespace, fetched_at)")
+        self._conn.commit()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "stores": 0}
+
+    def get(self, namespace, params, ttl):
+        """Returns the cached body if younger than ttl seconds (ttl=None: any age), else None."""
+        key = make_key(namespace, params)
+        with self._lock:
+            row = self._conn.execute("SELECT body, fetched_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            if ttl is not None and time.time() - row[1] > ttl:
+                self.stats["expired"] += 1
+                return None
+            self.stats["hits"] += 1
+        return json.loads(row[0])
+
+    def set(self, namespace, params, body):
+        key = make_key(namespace, params)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, namespace, params, body, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (key, namespace, json.dumps(normalize_params(params), sort_keys=True, default=str),
+                 json.dumps(body), time.time()),
+            )
+            self._conn.commit()
+            self.stats["stores"] += 1
+
+    def purge(self, namespace=None, older_than=None):
+        """Deletes entries (optionally by namespace / age in seconds). Returns rows removed."""
+        sql, args = "DELETE FROM responses WHERE 1=1", []
+        if namespace:
+            sql += " AND namespace = ?"
+            args.append(namespace)
+        if older_than is not None:
+            sql += " AND fetched_at < ?"
+            args.append(time.time() - older_than)
+        with self._lock:
+            cur = self._conn.execute(sql, args)
+            self._conn.commit()
+            return cur.rowcount
+
+    def summary(self):
+        """Hit/miss counters for this process plus stored entries per namespace."""
+        with self._lock:
+            rows = self._conn.execute("SELECT namespace, COUNT(*) FROM responses GROUP BY namespace").fetchall()
+            lookups = self.stats["hits"] + self.stats["misses"] + self.stats["expired"]
+            return {
+                **self.stats,
+                "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+                "entries": dict(rows),
+            }
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache():
+    """Process-wide ResponseCache at DEFAULT_CACHE_PATH."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
@@ -1,44 +1,161 @@
 import os
+import copy
 import requests
-import json
 import logging
-from modules.circuit_breaker import track_api_cost
+import threading
+from requests.adapters import HTTPAdapter
+from utils.response_cache import get_default_cache, make_key
+from utils.single_flight import SingleFlight
+from utils.rate_limiter import send_with_limits
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+SERPER_BASE_URL = "https://google.serper.dev"
+SERPER_COST_PER_QUERY = 0.001  # Approx $ per query
+
+# Cache freshness per endpoint (seconds). News goes stale fast; profile photos and
+# "who works where" results barely move.
+DEFAULT_TTLS = {
+    "search": 7 * 24 * 3600,
+    "news": 6 * 3600,
+    "images": 30 * 24 * 3600,
+    "places": 30 * 24 * 3600,
+}
+
+# SERPER_OFFLINE=1: serve from the cache only, never call the API (dev / replays)
+SERPER_OFFLINE = os.getenv("SERPER_OFFLINE", "").lower() in ("1", "true", "yes")
+
+
+class SerperOfflineMiss(RuntimeError):
+    """Offline mode and the response is not in the cache."""
+
+
+# Shared by every SerperClient in the process (baker engines, API, scripts):
+# identical requests in flight at the same time make one upstream call.
+serper_flight = SingleFlight("serper")
+
+
+class SerperClient:
+    """
+    One Serper client for every caller: pooled HTTP session plus the on-disk
+    ResponseCache keyed by endpoint and normalized parameters. Concurrent
+    identical cache misses are coalesced through `serper_flight`, and real
+    calls draw from the shared "serper" token bucket (429s back off and retry).
+
+    request() raises on HTTP/network errors (requests exceptions) and on an
+    offline cache miss; callers keep their own fallbacks.
+    """
+
+    def __init__(self, api_key=None, cache=None, ttls=None, offline=None, timeout=10,
+                 cost_tracker=None, cost_refund=None):
+        self.api_key = api_key or os.getenv("SERPER_API_KEY")
+        self.cache = cache if cache is not None else get_default_cache()
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.offline = SERPER_OFFLINE if offline is None else offline
+        self.timeout = timeout
+        self.cost_tracker = cost_tracker
+        self.cost_refund = cost_refund
+        self.calls = 0  # real API calls made by this client
+        self._calls_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+
+    def request(self, endpoint, params, ttl=None, use_cache=True, cost_tracker=None, cost_refund=None):
+        """
+        POST /<endpoint> with params. Cached responses younger than the endpoint
+        TTL (or `ttl`) are returned without a network call.
+        cost_tracker (or the client's) is charged for real API calls only, before
+        the call is sent; if it returns False (budget exhausted) nothing is sent.
+        If the call then fails unbilled (network error, 429 or 5xx), cost_refund
+        (or the client's) gets the charge back.
+        """
+        ttl = self.ttls.get(endpoint) if ttl is None else ttl
+        namespace = f"serper:{endpoint}"
+
+        if use_cache:
+            cached = self.cache.get(namespace, params, None if self.offline else ttl)
+            if cached is not None:
+                return cached
+        if self.offline:
+            raise SerperOfflineMiss(f"Serper offline: no cached response for {endpoint} {params}")
+        if not self.api_key:
+            raise RuntimeError("SERPER_API_KEY is not set")
+
+        def fetch():
+            tracker = cost_tracker or self.cost_tracker
+            refund = (cost_refund or self.cost_refund) if tracker else None
+            if tracker and tracker(SERPER_COST_PER_QUERY, "serper") is False:
+                raise RuntimeError("API budget exhausted (monthly hard cap)")
+            try:
+                response = send_with_limits("serper", lambda: self.session.post(
+                    f"{SERPER_BASE_URL}/{endpoint}", json=params,
+                    headers={"X-API-KEY": self.api_key}, timeout=self.timeout))
+            except Exception:
+                if refund:
+                    refund(SERPER_COST_PER_QUERY, "serper")
+                raise
+            with self._calls_lock:
+                self.calls += 1
+            if refund and (response.status_code == 429 or response.status_code >= 500):
+                refund(SERPER_COST_PER_QUERY, "serper")
+            response.raise_for_status()
+            data = response.json()
+            if use_cache:
+                self.cache.set(namespace, params, data)
+            return data
+
+        # Followers share the leader's response; hand each caller its own copy
+        return copy.deepcopy(serper_flight.do(make_key(namespace, params), fetch))
+
+    def search(self, q, **params):
+        return self.request("search", {"q": q, **params})
+
+    def news(self, q, **params):
+        return self.request("news", {"q": q, **params})
+
+    def images(self, q, **params):
+        return self.request("images", {"q": q, **params})
+
+    def stats(self):
+        return {"api_calls": self.calls, **self.cache.summary(), "single_flight": serper_flight.summary()}
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_serper_client():
+    """Process-wide SerperClient (shared session + cache)."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = SerperClient()
+        return _default_client
+
+
 def search_google(query, location="United States"):
     """
     Searches Google using Serper API.
     If SERPER_API_KEY is not set, returns MOCK DATA.
     """
-    api_key = os.getenv("SERPER_API_KEY")
-    
+    # Imported here: modules.circuit_breaker configures root logging on import,
+    # which the app-side SerperClient users must not inherit.
+    from modules.circuit_breaker import reserve_api_cost, refund_api_cost
+    client = get_serper_client()
+
     # --- MOCK MODE (If no key) ---
-    if not api_key:
+    if not client.api_key and not client.offline:
         logger.warning("No SERPER_API_KEY found. Using MOCK DATA.")
         return _get_mock_results(query)
 
     # --- REAL MODE ---
-    url = "https://google.serper.dev/search"
-    payload = json.dumps({
-        "q": query,
-        "location": location,
-        "num": 10
-    })
-    headers = {
-        'X-API-KEY': api_key,
-        'Content-Type': 'application/json'
-    }
-
     try:
-        response = requests.request("POST", url, headers=headers, data=payload)
-        response.raise_for_status()
-        
-        # Track Cost (Approx $0.001 per query)
-        track_api_cost(0.001)
-        
-        return response.json()
+        return client.request("search", {"q": query, "location": location, "num": 10},
+                              cost_tracker=reserve_api_cost, cost_refund=refund_api_cost)
     except Exception as e:
         logger.error(f"Serper API Error: {e}")
         return {"error": str(e), "organic": []}
@@ -47,28 +164,16 @@ def search_news(query, location="United States"):
     """
     Searches Google News using Serper API.
     """
-    api_key = os.getenv("SERPER_API_KEY")
-    
-    if not api_key:
+    from modules.circuit_breaker import reserve_api_cost, refund_api_cost
+    client = get_serper_client()
+
+    if not client.api_key and not client.offline:
         logger.warning("No SERPER_API_KEY found. Using MOCK NEWS.")
         return _get_mock_news(query)
 
-    url = "https://google.serper.dev/news"
-    payload = json.dumps({
-        "q": query,
-        "location": location,
-        "num": 10
-    })
-    headers = {
-        'X-API-KEY': api_key,
-        'Content-Type': 'application/json'
-    }
-
     try:
-        response = requests.request("POST", url, headers=headers, data=payload)
-        response.raise_for_status()
-        track_api_cost(0.001)
-        return response.json()
+        return client.request("news", {"q": query, "location": location, "num": 10},
+                              cost_tracker=reserve_api_cost, cost_refund=refund_api_cost)
     except Exception as e:
         logger.error(f"Serper API Error: {e}")
         return {"error": str(e), "news": []}
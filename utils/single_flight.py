@@ -0,0 +1,68 @@
+import threading
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Request coalescing: concurrent do(key, fn) calls with the same key share
+    one execution of fn. The first caller (leader) runs it; everyone arriving
+    while it is in flight waits and gets the same result (or the same exception).
+    Nothing is remembered after the call finishes -- caching is the caller's job.
+
+    fn must not call do() with its own key (it would wait on itself).
+    """
+
+    def __init__(self, name="single_flight"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.stats = {"calls": 0, "executed": 0, "collapsed": 0, "errors": 0}
+
+    def do(self, key, fn):
+        with self._lock:
+            self.stats["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats["executed"] += 1
+            else:
+                self.stats["collapsed"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self.stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def summary(self):
+        with self._lock:
+            return {**self.stats, "in_flight": len(self._calls)}
+
+    def log_summary(self):
+        s = self.summary()
+        logger.info(f"[{self.name}] {s['calls']} calls, {s['executed']} upstream, "
+                    f"{s['collapsed']} collapsed, {s['errors']} errors")
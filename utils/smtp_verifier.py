@@ -0,0 +1,279 @@
+import time
+import uuid
+import atexit
+import smtplib
+import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.single_flight import SingleFlight
+
+# Note: dnspython is required for MX lookup. If not present, verification reports it and callers fall back to search.
+try:
+    import dns.resolver
+except ImportError:
+    dns = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+NEGATIVE_MX_TTL = 300        # domains without MX records / failed lookups
+UNREACHABLE_TTL = 600        # MX hosts that refused or timed out (port 25 blocked, etc.)
+CATCH_ALL_TTL = 86400
+MAX_RCPT_PER_SESSION = 20    # RSET + fresh MAIL FROM after this many probes
+SESSION_IDLE_SECONDS = 60    # servers drop idle clients; reconnect rather than reuse
+MAX_SESSIONS_PER_HOST = 3    # concurrent probes per MX host (mail servers throttle floods)
+PROBE_WORKERS = 16
+
+
+def resolve_mx(domain):
+    """[mx hosts by preference], ttl seconds -- via dnspython."""
+    if not dns:
+        raise RuntimeError("DNS Lib Missing")
+    answer = dns.resolver.resolve(domain, 'MX')
+    records = sorted(answer, key=lambda r: r.preference)
+    return [str(r.exchange).rstrip('.') for r in records], answer.rrset.ttl
+
+
+class _Session:
+    def __init__(self, smtp):
+        self.smtp = smtp
+        self.rcpts = 0
+        self.mail_open = False
+        self.last_used = time.monotonic()
+
+
+class _HostPool:
+    def __init__(self, size):
+        self.slots = threading.BoundedSemaphore(size)
+        self.idle = []
+        self.sessions = []
+
+
+class SmtpVerifier:
+    """
+    SMTP mailbox verification with reuse:
+      - MX records are cached for their DNS TTL (failed lookups briefly),
+      - a few SMTP sessions per MX host (max_sessions_per_host), each reused for
+        many RCPT TO probes per MAIL FROM,
+      - catch-all domains are detected once (probe of a random mailbox) and cached,
+        since a 250 from them proves nothing,
+      - unreachable MX hosts are remembered so later addresses fail fast.
+
+    verify(email) -> (bool, reason), same contract as recon_agent.verify_email_smtp;
+    submit(email) runs it on the verifier's probe pool and returns a Future.
+    Thread-safe. Concurrent MX lookups and catch-all probes for a domain are coalesced.
+    """
+
+    def __init__(self, resolver=resolve_mx, port=25, timeout=3, mail_from="test@example.com", helo=None,
+                 max_sessions_per_host=MAX_SESSIONS_PER_HOST, probe_workers=PROBE_WORKERS):
+        self.resolver = resolver
+        self.port = port
+        self.timeout = timeout
+        self.mail_from = mail_from
+        self.helo = helo
+        self.max_sessions_per_host = max_sessions_per_host
+        self._lock = threading.Lock()
+        self._flight = SingleFlight("smtp_verifier")
+        self._executor = ThreadPoolExecutor(max_workers=probe_workers, thread_name_prefix="smtp")
+        self._mx = {}           # domain -> (hosts, expires_at, error)
+        self._catch_all = {}    # domain -> (bool, expires_at)
+        self._unreachable = {}  # host -> (error, expires_at)
+        self._pools = {}        # host -> _HostPool
+        self.stats = {"mx_lookups": 0, "connections": 0, "rcpt_probes": 0, "catch_all_probes": 0}
+
+    # --- DNS ---
+
+    def mx_hosts(self, domain):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._mx.get(domain)
+            if cached and cached[1] > now:
+                if cached[2]:
+                    raise RuntimeError(cached[2])
+                return cached[0]
+        return self._flight.do(f"mx:{domain}", lambda: self._resolve(domain))
+
+    def _resolve(self, domain):
+        now = time.monotonic()
+        try:
+            self._count("mx_lookups")
+            hosts, ttl = self.resolver(domain)
+            with self._lock:
+                self._mx[domain] = (hosts, now + max(ttl, 1), None)
+            return hosts
+        except Exception as e:
+            with self._lock:
+                self._mx[domain] = ([], now + NEGATIVE_MX_TTL, str(e))
+            raise
+
+    # --- Sessions ---
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _check_reachable(self, host):
+        with self._lock:
+            down = self._unreachable.get(host)
+        if down and down[1] > time.monotonic():
+            raise ConnectionError(down[0])
+
+    @contextmanager
+    def _checkout(self, host):
+        """An idle session for the host, waiting while max_sessions_per_host are busy."""
+        self._check_reachable(host)
+        with self._lock:
+            pool = self._pools.get(host)
+            if pool is None:
+                pool = self._pools[host] = _HostPool(self.max_sessions_per_host)
+        pool.slots.acquire()
+        try:
+            with self._lock:
+                session = pool.idle.pop() if pool.idle else None
+                if session is None:
+                    session = _Session(None)
+                    pool.sessions.append(session)
+            try:
+                yield session
+            finally:
+                with self._lock:
+                    pool.idle.append(session)
+        finally:
+            pool.slots.release()
+
+    def _connect(self, host, session):
+        smtp = smtplib.SMTP(timeout=self.timeout)
+        try:
+            self._count("connections")
+            smtp.connect(host, self.port)
+            smtp.ehlo(self.helo)
+        except Exception as e:
+            try:
+                smtp.close()
+            except Exception:
+                pass
+            with self._lock:
+                self._unreachable[host] = (str(e), time.monotonic() + UNREACHABLE_TTL)
+            raise
+        session.smtp, session.rcpts, session.mail_open = smtp, 0, False
+
+    def _drop(self, session):
+        if session.smtp is not None:
+            try:
+                session.smtp.close()
+            except Exception:
+                pass
+        session.smtp, session.mail_open = None, False
+
+    def _rcpt(self, host, address):
+        """RCPT TO on one of the host's sessions. Returns (code, message)."""
+        with self._checkout(host) as session:
+            for attempt in range(2):
+                try:
+                    if session.smtp is None or time.monotonic() - session.last_used > SESSION_IDLE_SECONDS:
+                        self._drop(session)
+                        self._check_reachable(host)  # marked down while we waited
+                        self._connect(host, session)
+                    if session.rcpts >= MAX_RCPT_PER_SESSION and session.mail_open:
+                        session.smtp.rset()
+                        session.mail_open, session.rcpts = False, 0
+                    if not session.mail_open:
+                        code, message = session.smtp.mail(self.mail_from)
+                        if code != 250:
+                            return code, message
+                        session.mail_open = True
+                    self._count("rcpt_probes")
+                    code, message = session.smtp.rcpt(address)
+                    session.rcpts += 1
+                    session.last_used = time.monotonic()
+                    return code, message
+                except smtplib.SMTPServerDisconnected:
+                    # Server closed a reused session: reconnect once
+                    self._drop(session)
+                    if attempt:
+                        raise
+
+    def _probe(self, domain, address):
+        """(code, message) from the first reachable MX host of the domain."""
+        error = None
+        for host in self.mx_hosts(domain):
+            try:
+                return self._rcpt(host, address)
+            except Exception as e:
+                error = e
+        raise error or RuntimeError(f"No MX hosts for {domain}")
+
+    def is_catch_all(self, domain):
+        """True if the domain accepts a mailbox that cannot exist. Cached per domain."""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._catch_all.get(domain)
+            if cached and cached[1] > now:
+                return cached[0]
+        return self._flight.do(f"catch_all:{domain}", lambda: self._probe_catch_all(domain))
+
+    def _probe_catch_all(self, domain):
+        now = time.monotonic()
+        self._count("catch_all_probes")
+        code, _ = self._probe(domain, f"scout-probe-{uuid.uuid4().hex[:12]}@{domain}")
+        if 400 <= code < 500:
+            return False  # Temporary (greylisting): decide later, don't cache
+        with self._lock:
+            self._catch_all[domain] = (code == 250, now + CATCH_ALL_TTL)
+        return code == 250
+
+    # --- Public ---
+
+    def verify(self, email):
+        domain = email.split('@')[-1].lower()
+        try:
+            code, message = self._probe(domain, email)
+            if code != 250:
+                return False, f"SMTP Verify: Failed ({code})"
+            if self.is_catch_all(domain):
+                return False, "SMTP Verify: Catch-all domain (unverifiable)"
+            return True, "SMTP Verify: Passed"
+        except Exception as e:
+            if str(e) == "DNS Lib Missing":
+                return False, "DNS Lib Missing"
+            return False, f"SMTP Error/Block: {str(e)}"
+
+    def submit(self, email):
+        """verify(email) on the probe pool; returns a Future of (bool, reason)."""
+        return self._executor.submit(self.verify, email)
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            for session in pool.sessions:
+                if session.smtp is not None:
+                    try:
+                        session.smtp.quit()
+                    except Exception:
+                        pass
+                self._drop(session)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+_default_verifier = None
+_default_verifier_lock = threading.Lock()
+
+
+def get_smtp_verifier():
+    """Process-wide verifier (shared MX / catch-all caches and sessions)."""
+    global _default_verifier
+    with _default_verifier_lock:
+        if _default_verifier is None:
+            _default_verifier = SmtpVerifier()
+            atexit.register(_default_verifier.close)
+        return _default_verifier